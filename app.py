@@ -5,6 +5,7 @@ from __future__ import annotations
 
 from pathlib import Path
 import os
+import re
 
 # 環境変数の読み込み
 from dotenv import load_dotenv
@@ -23,10 +24,19 @@ from routes.employees import employees_bp
 from routes.history import history_bp
 from routes.users import users_bp
 from routes.dispatch import dispatch_bp
+from routes.reports import reports_bp
+from routes.events import events_bp
+from routes.departments import departments_bp
+from routes.metrics import metrics_bp
+from utils.change_events import register_change_event_sink
+from utils.compression import init_compression
+from utils.json_utils import init_json_provider
+from utils import query_profiler
+from utils.metrics import clear_dumps, init_metrics
 
 # Flaskアプリケーション初期化
 app = Flask(__name__)
-app.config['JSON_AS_ASCII'] = False  # 日本語をそのまま出力
+init_json_provider(app)  # orjson でシリアライズ（日本語はそのまま出力）
 app.config['SECRET_KEY'] = 'your-secret-key-change-this-in-production'  # セッション用の秘密鍵
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=7)  # セッション有効期限
 CORS(app)
@@ -48,6 +58,19 @@ app.register_blueprint(employees_bp)
 app.register_blueprint(history_bp)
 app.register_blueprint(users_bp)
 app.register_blueprint(dispatch_bp)
+app.register_blueprint(reports_bp)
+app.register_blueprint(events_bp)
+app.register_blueprint(departments_bp)
+app.register_blueprint(metrics_bp)
+
+# 在庫・注文状態の変更イベントを change_events に保存して全ワーカーのSSE接続へ配信
+register_change_event_sink()
+
+# リクエスト時間・SQL件数の計測（圧縮の時間も含めるため圧縮より先に登録する）
+init_metrics(app)
+
+# JSON・静的ファイルを gzip / brotli で圧縮（低速回線の拠点向け）
+init_compression(app)
 
 
 @app.route("/")
@@ -67,6 +90,15 @@ def login():
     return render_template("login.html")
 
 
+@app.route("/sw.js")
+def service_worker():
+    """サービスワーカー（メインページ全体を対象にするため /static ではなくルートで配信する）"""
+    response = send_from_directory(app.static_folder, "sw.js", max_age=0)
+    response.headers["Content-Type"] = "application/javascript; charset=utf-8"
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
 @app.route("/download/consumables-template")
 def download_consumables_template():
     """CSVテンプレートをダウンロード"""
@@ -141,13 +173,29 @@ def manual():
     return html
 
 
+# アップロード画像はUUIDのファイル名で保存し上書きしないため、ブラウザに長期間キャッシュさせる
+IMMUTABLE_UPLOAD_PATTERN = re.compile(r"^images/[0-9a-f]{32}\.[A-Za-z0-9]+$")
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
 @app.route("/uploads/<path:filename>")
 def uploaded_file(filename):
     """アップロードファイルを配信"""
-    return send_from_directory(app.config["UPLOAD_FOLDER"], filename)
+    if IMMUTABLE_UPLOAD_PATTERN.match(filename):
+        response = send_from_directory(app.config["UPLOAD_FOLDER"], filename, max_age=IMMUTABLE_MAX_AGE)
+        response.headers["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        return response
+    # PDFなど同じ名前で再生成されるファイルは毎回 Last-Modified / ETag で再検証する
+    response = send_from_directory(app.config["UPLOAD_FOLDER"], filename, max_age=0)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 
 if __name__ == "__main__":
+    # 前回の起動で書き出した計測値・SQLプロファイルを集計に含めない（gunicorn では on_starting で消す）
+    clear_dumps()
+    query_profiler.clear_dumps()
+
     # HTTPS対応（証明書を使用）
     cert_file = Path(__file__).parent / ".streamlit" / "cert.pem"
     key_file = Path(__file__).parent / ".streamlit" / "key.pem"
@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -31,6 +32,66 @@ SMTP_USER = os.getenv("SMTP_USER")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
 SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() in {"1", "true", "yes"}
 SMTP_FROM = os.getenv("SMTP_FROM") or SMTP_USER
+SMTP_TIMEOUT_SECONDS = int(os.getenv("SMTP_TIMEOUT_SECONDS", "20"))  # 接続・応答待ちの上限（SMTPサーバーの障害でリクエストを止めない）
+
+# 全文検索設定（MySQL FULLTEXT / ngramパーサー）
+FULLTEXT_SEARCH_ENABLED = os.getenv("FULLTEXT_SEARCH_ENABLED", "true").lower() in {"1", "true", "yes"}
+FULLTEXT_MIN_QUERY_LENGTH = int(os.getenv("FULLTEXT_MIN_QUERY_LENGTH", "2"))  # ngram_token_size と合わせる
+
+# 消費予測・発注点の設定（scripts/maintenance/run_forecast.py）
+FORECAST_HISTORY_DAYS = int(os.getenv("FORECAST_HISTORY_DAYS", "90"))  # 予測に使う出庫実績の日数
+FORECAST_SMA_DAYS = int(os.getenv("FORECAST_SMA_DAYS", "28"))  # 移動平均の期間
+FORECAST_EWMA_ALPHA = float(os.getenv("FORECAST_EWMA_ALPHA", "0.2"))  # 指数平滑の平滑化係数
+FORECAST_SERVICE_FACTOR = float(os.getenv("FORECAST_SERVICE_FACTOR", "1.65"))  # 安全係数（欠品許容率 約5%）
+FORECAST_REVIEW_DAYS = int(os.getenv("FORECAST_REVIEW_DAYS", "14"))  # 1回の発注で賄う日数
+DEFAULT_LEAD_TIME_DAYS = int(os.getenv("DEFAULT_LEAD_TIME_DAYS", "7"))  # 購入先未設定時のリードタイム
+
+# 変更イベント配信（SSE）設定
+EVENTS_POLL_INTERVAL = float(os.getenv("EVENTS_POLL_INTERVAL", "1.0"))  # change_events の確認間隔（秒、ワーカーごとに1スレッドで確認）
+EVENTS_STREAM_MAX_SECONDS = int(os.getenv("EVENTS_STREAM_MAX_SECONDS", "55"))  # 1接続の最大時間（ブラウザが自動で再接続）
+EVENTS_HEARTBEAT_SECONDS = int(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))  # 無通信時のキープアライブ間隔
+EVENTS_MAX_STREAMS_PER_WORKER = int(os.getenv("EVENTS_MAX_STREAMS_PER_WORKER", "4"))  # 1ワーカーで保持する接続数の上限（GUNICORN_THREADS より少なくする）
+EVENTS_FALLBACK_RETRY_SECONDS = int(os.getenv("EVENTS_FALLBACK_RETRY_SECONDS", "10"))  # 接続を保持できない場合の再接続間隔
+EVENTS_RETENTION_HOURS = int(os.getenv("EVENTS_RETENTION_HOURS", "24"))  # change_events の保持時間
+
+# 在庫一覧の差分同期（/api/inventory?updated_since=...）設定
+INVENTORY_SYNC_OVERLAP_SECONDS = int(os.getenv("INVENTORY_SYNC_OVERLAP_SECONDS", "5"))  # 同期トークンを巻き戻す秒数（コミット遅れの取りこぼし防止）
+INVENTORY_SYNC_TOMBSTONE_DAYS = int(os.getenv("INVENTORY_SYNC_TOMBSTONE_DAYS", "30"))  # 削除記録の保持日数（これより古いトークンは全件を返す）
+
+# マスターデータ（購入先・従業員・部署）のキャッシュ設定
+REFERENCE_CACHE_URL = os.getenv("REFERENCE_CACHE_URL", "")  # 例: redis://localhost:6379/0（未設定ならプロセス内キャッシュ）
+REFERENCE_CACHE_PREFIX = os.getenv("REFERENCE_CACHE_PREFIX", "syomohin")  # Redisのキーの接頭辞
+REFERENCE_CACHE_TTL_SECONDS = int(os.getenv("REFERENCE_CACHE_TTL_SECONDS", "300"))  # 有効期間（秒）
+REFERENCE_CACHE_MAX_ENTRIES = int(os.getenv("REFERENCE_CACHE_MAX_ENTRIES", "1024"))  # プロセス内キャッシュの最大件数
+
+# レスポンス圧縮設定（brotli パッケージがあれば br、なければ gzip）
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in {"1", "true", "yes"}
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # これより小さいレスポンスは圧縮しない（バイト）
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))  # 1（速い）〜9（高圧縮）
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))  # 0（速い）〜11（高圧縮）
+
+# 計測（/metrics・Server-Timing）設定
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in {"1", "true", "yes"}
+METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "true").lower() in {"1", "true", "yes"}  # レスポンスに処理時間の内訳を付ける
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")  # Authorization: Bearer <トークン> を付けると METRICS_ALLOWED_IPS 以外からも /metrics を参照できる
+METRICS_ALLOWED_IPS = os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1")  # トークンなしで /metrics を参照できる送信元（カンマ区切り、CIDR可。空にするとトークンが必須）
+METRICS_DIR = Path(os.getenv("METRICS_DIR", str(Path(tempfile.gettempdir()) / "syomohin-metrics")))  # ワーカーごとの計測値の書き出し先（起動時に消す実行時のファイル。同じサーバーで複数起動する場合は分ける）
+METRICS_DUMP_SECONDS = int(os.getenv("METRICS_DUMP_SECONDS", "15"))  # ワーカーごとの計測値を書き出す間隔（0で書き出さず、/metrics は応答したワーカーの値のみ）
+
+# SQLプロファイラー・スロークエリログ設定（scripts/maintenance/query_profile_report.py）
+QUERY_PROFILER_ENABLED = os.getenv("QUERY_PROFILER_ENABLED", "false").lower() in {"1", "true", "yes"}
+QUERY_SLOW_MS = float(os.getenv("QUERY_SLOW_MS", "500"))  # これ以上かかったSQLを EXPLAIN と一緒にログへ出す
+QUERY_PROFILE_EXPLAIN = os.getenv("QUERY_PROFILE_EXPLAIN", "true").lower() in {"1", "true", "yes"}
+QUERY_PROFILE_DIR = Path(os.getenv("QUERY_PROFILE_DIR", str(BASE_DIR / "data" / "query_profile")))
+QUERY_PROFILE_DUMP_SECONDS = int(os.getenv("QUERY_PROFILE_DUMP_SECONDS", "60"))  # ワーカーごとの集計を書き出す間隔（0で書き出さない）
+
+# QRラベルシート作成設定（/api/consumables/labels）
+QR_LABEL_MAX_LABELS = int(os.getenv("QR_LABEL_MAX_LABELS", "10000"))  # 1回に作成できるラベル数の上限
+QR_LABEL_CACHE_SIZE = int(os.getenv("QR_LABEL_CACHE_SIZE", "20000"))  # QRコードの描画命令をコードごとに保持する件数
+QR_LABEL_WORKERS = int(os.getenv("QR_LABEL_WORKERS", "0"))  # QRコードを作るプロセス数（0でCPU数（最大4）、1でプロセスを使わない）
+
+# 入出庫のまとめて送信設定（/api/movements/batch、出庫・入庫画面の送信待ちの同期）
+MOVEMENT_BATCH_MAX_ITEMS = int(os.getenv("MOVEMENT_BATCH_MAX_ITEMS", "500"))  # 1回に送信できる入出庫の件数の上限
 
 # SQL文
 CONSUMABLE_INSERT_SQL = """
@@ -38,12 +99,12 @@ CONSUMABLE_INSERT_SQL = """
         code, order_code, name, category, unit,
         stock_quantity, safety_stock, unit_price, order_unit,
         supplier_id, storage_location, image_path, note,
-        order_status, shortage_status
+        order_status, shortage_status, needs_reorder
     ) VALUES (
         :code, :order_code, :name, :category, :unit,
         :stock_quantity, :safety_stock, :unit_price, :order_unit,
         :supplier_id, :storage_location, :image_path, :note,
-        :order_status, :shortage_status
+        :order_status, :shortage_status, :needs_reorder
     )
 """
 
@@ -5,6 +5,8 @@ SQLAlchemy + PyMySQL を使用
 from __future__ import annotations
 
 import os
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
 import pandas as pd
@@ -12,6 +14,8 @@ from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import scoped_session, sessionmaker
 
+from utils.query_profiler import install_query_profiler
+
 # .envファイルを読み込む
 BASE_DIR = Path(__file__).resolve().parent
 ENV_PATH = BASE_DIR / ".env"
@@ -32,22 +36,81 @@ class DatabaseManager:
 
         # MySQL接続URL
         db_url = f"mysql+pymysql://{user}:{password}@{host}:{port}/{dbname}?charset=utf8mb4"
-        self.engine = create_engine(db_url, echo=False, future=True)
+        self.engine = create_engine(
+            db_url,
+            echo=False,
+            future=True,
+            # gthread ワーカーのスレッド数に合わせた接続プール
+            pool_size=int(os.getenv("INVENTORY_DB_POOL_SIZE", "8")),
+            max_overflow=int(os.getenv("INVENTORY_DB_MAX_OVERFLOW", "4")),
+            pool_timeout=int(os.getenv("INVENTORY_DB_POOL_TIMEOUT", "10")),  # 空き接続を待つ上限（秒）
+            pool_pre_ping=True,
+            pool_recycle=3600,  # MySQL の wait_timeout で切断された接続を使わない
+            connect_args={
+                "connect_timeout": int(os.getenv("INVENTORY_DB_CONNECT_TIMEOUT", "10")),
+                # 応答のないクエリでスレッドを占有し続けない
+                "read_timeout": int(os.getenv("INVENTORY_DB_READ_TIMEOUT", "60")),
+                "write_timeout": int(os.getenv("INVENTORY_DB_WRITE_TIMEOUT", "60")),
+            },
+        )
+        # QUERY_PROFILER_ENABLED のときSQLをフィンガープリント別に集計する
+        install_query_profiler(self.engine)
 
         # セッションファクトリ（scoped_sessionでスレッドセーフ）
         self.SessionLocal = scoped_session(
             sessionmaker(bind=self.engine, autocommit=False, autoflush=False)
         )
+        # トランザクション用（execute_query などがスレッドローカルのセッションを閉じても影響を受けない）
+        self.TransactionSession = sessionmaker(bind=self.engine, autocommit=False, autoflush=False)
 
     def get_session(self):
         """新しいセッションを取得"""
         return self.SessionLocal()
 
+    @contextmanager
+    def transaction(self):
+        """
+        複数のSQLを1つのトランザクションで実行する
+
+        正常終了でコミット、例外発生時はロールバックして例外を再送出する。
+
+        Example:
+            with db.transaction() as session:
+                session.execute(text("UPDATE ..."), {...})
+        """
+        session = self.TransactionSession()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
     def close(self):
         """セッションと接続を閉じる"""
         self.SessionLocal.remove()
         self.engine.dispose()
 
+    def _execute(self, session, query: str, params=None):
+        """パラメータ形式（辞書・リスト・タプル）を揃えてSQLを実行"""
+        if params:
+            # タプルをリストに変換して辞書形式に
+            if isinstance(params, (list, tuple)):
+                # プレースホルダーの数を数える
+                placeholder_count = query.count('%s')
+                if len(params) == placeholder_count:
+                    # パラメータを辞書形式に変換
+                    param_dict = {f'param{i}': v for i, v in enumerate(params)}
+                    # クエリのプレースホルダーを置換
+                    for i in range(len(params)):
+                        query = query.replace('%s', f':param{i}', 1)
+                    return session.execute(text(query), param_dict)
+                return session.execute(text(query))
+            return session.execute(text(query), params)
+        return session.execute(text(query))
+
     def execute_query(self, query: str, params=None) -> pd.DataFrame:
         """
         SELECTクエリを実行してDataFrameを返す
@@ -62,24 +125,7 @@ class DatabaseManager:
         session = self.get_session()
 
         try:
-            if params:
-                # タプルをリストに変換して辞書形式に
-                if isinstance(params, (list, tuple)):
-                    # プレースホルダーの数を数える
-                    placeholder_count = query.count('%s')
-                    if len(params) == placeholder_count:
-                        # パラメータを辞書形式に変換
-                        param_dict = {f'param{i}': v for i, v in enumerate(params)}
-                        # クエリのプレースホルダーを置換
-                        for i in range(len(params)):
-                            query = query.replace('%s', f':param{i}', 1)
-                        result = session.execute(text(query), param_dict)
-                    else:
-                        result = session.execute(text(query))
-                else:
-                    result = session.execute(text(query), params)
-            else:
-                result = session.execute(text(query))
+            result = self._execute(session, query, params)
 
             # 結果をDataFrameに変換
             rows = result.fetchall()
@@ -106,6 +152,41 @@ class DatabaseManager:
         finally:
             session.close()
 
+    def fetch_all(self, query: str, params=None) -> list[dict]:
+        """
+        SELECTクエリを実行して行を辞書のリストで返す
+
+        DataFrameを経由しないため、そのままJSONレスポンスにする一覧の取得に使う。
+        日時・Decimal・NULL は Python の値のまま返し、JSONへの変換は
+        アプリのJSONプロバイダー（utils.json_utils）が行う。
+
+        Args:
+            query: SQL文字列
+            params: パラメータ（辞書、リスト、またはタプル）
+
+        Returns:
+            list[dict]: 結果の行（エラー時は空のリスト）
+        """
+        session = self.get_session()
+
+        try:
+            result = self._execute(session, query, params)
+            return [dict(row) for row in result.mappings()]
+
+        except Exception as e:
+            try:
+                print(f"Query error: {e}")
+                print(f"Query: {query}")
+                print(f"Params: {params}")
+            except:
+                pass  # エンコーディングエラーを無視
+            import traceback
+            traceback.print_exc()
+            return []
+
+        finally:
+            session.close()
+
     def execute_update(self, query: str, params=None) -> int:
         """
         INSERT/UPDATE/DELETEを実行
@@ -120,24 +201,7 @@ class DatabaseManager:
         session = self.get_session()
 
         try:
-            if params:
-                # タプルをリストに変換して辞書形式に
-                if isinstance(params, (list, tuple)):
-                    # プレースホルダーの数を数える
-                    placeholder_count = query.count('%s')
-                    if len(params) == placeholder_count:
-                        # パラメータを辞書形式に変換
-                        param_dict = {f'param{i}': v for i, v in enumerate(params)}
-                        # クエリのプレースホルダーを置換
-                        for i in range(len(params)):
-                            query = query.replace('%s', f':param{i}', 1)
-                        result = session.execute(text(query), param_dict)
-                    else:
-                        result = session.execute(text(query))
-                else:
-                    result = session.execute(text(query), params)
-            else:
-                result = session.execute(text(query))
+            result = self._execute(session, query, params)
 
             session.commit()
             return result.rowcount
@@ -171,16 +235,30 @@ class DatabaseManager:
 
 # シングルトンインスタンス
 _db_manager = None
+_db_manager_lock = threading.Lock()
 
 
 def get_db_manager() -> DatabaseManager:
     """DatabaseManagerのシングルトンインスタンスを取得"""
     global _db_manager
     if _db_manager is None:
-        _db_manager = DatabaseManager()
+        # 複数スレッドから同時に呼ばれても接続プールを1つだけ作る
+        with _db_manager_lock:
+            if _db_manager is None:
+                _db_manager = DatabaseManager()
     return _db_manager
 
 
+def dispose_engine_after_fork() -> None:
+    """
+    fork後のワーカーで、親プロセスから引き継いだ接続プールを破棄する（gunicorn の post_fork から呼ぶ）
+
+    親プロセスのソケットは閉じず（close=False）、ワーカーは新しい接続を作る。
+    """
+    if _db_manager is not None:
+        _db_manager.engine.dispose(close=False)
+
+
 if __name__ == "__main__":
     # テスト実行
     print("=" * 60)
@@ -8,6 +8,9 @@ from email.mime.application import MIMEApplication
 from email.utils import formataddr
 import os
 
+from config import SMTP_TIMEOUT_SECONDS
+from utils.metrics import SMTP_SEND, timed
+
 
 class EmailSender:
     """メール送信クラス"""
@@ -80,7 +83,7 @@ class EmailSender:
 
         # メール送信
         try:
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
+            with timed(SMTP_SEND), smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=SMTP_TIMEOUT_SECONDS) as server:
                 server.starttls()  # TLS暗号化
                 server.login(self.smtp_user, self.smtp_password)
                 server.send_message(msg)
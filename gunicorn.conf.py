@@ -0,0 +1,76 @@
+"""
+gunicorn 設定ファイル
+
+実行方法: gunicorn -c gunicorn.conf.py app:app
+各設定は環境変数 GUNICORN_* で上書きできる。
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8504")
+
+# gthread: 1ワーカーで複数のリクエストを並行して処理する
+# （PDF作成・SMTP送信・CSV取込の待ち時間に、QR読み取りなど他のリクエストを止めない）
+# gevent を使う場合は GUNICORN_WORKER_CLASS=gevent（gevent のインストールが必要）
+# 変更イベントのSSE（/api/events/stream）は1接続で1スレッドを保持するため、gthread か gevent が必要。
+# sync ワーカーでは接続を保持せず、EVENTS_FALLBACK_RETRY_SECONDS ごとの短いポーリングになる。
+# 1ワーカーで保持する接続は EVENTS_MAX_STREAMS_PER_WORKER まで（threads より少なくし、残りを他のリクエストに使う）
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+# ワーカー数はCPU数 + 1（pandas / OpenCV のメモリを考慮して上限を設ける）
+_max_workers = int(os.getenv("GUNICORN_MAX_WORKERS", "8"))
+workers = int(os.getenv("GUNICORN_WORKERS", str(min(multiprocessing.cpu_count() + 1, _max_workers))))
+
+# pandas / OpenCV で増えたメモリを解放するため、一定数のリクエストを処理したワーカーを入れ替える
+# （全ワーカーが同時に再起動しないよう件数にばらつきを付ける）
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+# マスターで1回だけアプリを読み込み、ワーカーはforkで引き継ぐ（ワーカーの起動・再起動が速くなる）
+preload_app = True
+
+# タイムアウト（秒）
+# timeout はワーカーが応答しなくなったと判断して再起動するまでの時間。gthread ではリクエストの
+# 処理中もワーカーが生存を通知するため、個々の処理時間は処理ごとの上限で抑える:
+#   SMTP送信: SMTP_TIMEOUT_SECONDS / DBクエリ: INVENTORY_DB_READ_TIMEOUT /
+#   DB接続の空き待ち: INVENTORY_DB_POOL_TIMEOUT / SSE: EVENTS_STREAM_MAX_SECONDS
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# HTTPS（証明書がない場合はHTTPで起動）
+certfile = os.getenv("GUNICORN_CERTFILE", "/app/certs/syomohin.crt")
+keyfile = os.getenv("GUNICORN_KEYFILE", "/app/certs/syomohin.key")
+if not (os.path.exists(certfile) and os.path.exists(keyfile)):
+    certfile = None
+    keyfile = None
+
+
+def on_starting(server):
+    """前回の起動で書き出した計測値（/metrics）とSQLプロファイルを引き継がない"""
+    from utils import metrics, query_profiler
+
+    metrics.clear_dumps()
+    query_profiler.clear_dumps()
+
+
+def post_fork(server, worker):
+    """preload で親プロセスに作られたDB接続をワーカーで使わない"""
+    from database_manager import dispose_engine_after_fork
+
+    dispose_engine_after_fork()
+
+
+def worker_exit(server, worker):
+    """終了するワーカーの最新の計測値を書き出す"""
+    from utils.metrics import dump_metrics
+
+    dump_metrics()
+
+
+def child_exit(server, worker):
+    """終了したワーカーの計測値を全ワーカーの合計（archive.json）へ移す"""
+    from utils.metrics import archive_worker
+
+    archive_worker(worker.pid)
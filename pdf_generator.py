@@ -10,8 +10,12 @@ from reportlab.lib import colors
 from reportlab.platypus import Table, TableStyle, Paragraph
 from reportlab.lib.styles import ParagraphStyle
 from datetime import datetime
+from xml.sax.saxutils import escape
 import os
 
+from utils.metrics import PDF_RENDER, timed
+from utils.pdf_utils import FONT_REGISTRATION_LOCK
+
 
 def _last_name(full_name: str) -> str:
     """姓名からスペース区切りの先頭（姓）だけを返す"""
@@ -23,6 +27,20 @@ def _last_name(full_name: str) -> str:
 class PurchaseOrderGenerator:
     """注文書PDF生成クラス"""
 
+    # 明細テーブルのヘッダーとカラム幅（合計178mm、A4幅に収まるように調整）
+    ITEM_HEADERS = ['No', '発注\nコード', '商品名・仕様', '数量', '単位', '単価', '金額', '納期', '裏議書No', '備考']
+    ITEM_COL_WIDTHS = [10 * mm, 18 * mm, 45 * mm, 12 * mm, 12 * mm, 18 * mm, 18 * mm, 15 * mm, 15 * mm, 15 * mm]
+    # 折り返して表示する列（商品名・仕様、備考）
+    WRAPPED_COLUMNS = (2, 9)
+    # セルの余白（左右はreportlabの既定値、上下はテーブルスタイルで指定）
+    CELL_PADDING_X = 6
+    CELL_PADDING_Y = 3
+
+    # 明細テーブルの上端（ページ上端から）と下端（ページ下端から、フッターの上）
+    FIRST_PAGE_TABLE_TOP = 115 * mm
+    NEXT_PAGE_TABLE_TOP = 28 * mm
+    TABLE_BOTTOM = 22 * mm
+
     def __init__(self):
         self.width, self.height = A4
         self.margin = 15 * mm
@@ -30,12 +48,22 @@ class PurchaseOrderGenerator:
         self._register_font()
 
     def _register_font(self):
+        """日本語フォントを登録する（複数スレッドから同時にPDFを作成しても1回だけ登録する）"""
+        # 既に登録済みの場合はスキップ
+        if 'Japanese' in pdfmetrics.getRegisteredFontNames():
+            self.font_name = 'Japanese'
+            return
+
+        with FONT_REGISTRATION_LOCK:
+            self._find_and_register_font()
+
+    def _find_and_register_font(self):
         """
         日本語フォントを登録する。
         ts_pm_all_v2プロジェクトのフォント検索ロジックを参考に、
         様々な環境でフォントを見つけられるようにする。
         """
-        # 既に登録済みの場合はスキップ
+        # 待っている間に他のスレッドが登録した場合はスキップ
         if 'Japanese' in pdfmetrics.getRegisteredFontNames():
             self.font_name = 'Japanese'
             return
@@ -122,34 +150,109 @@ class PurchaseOrderGenerator:
         """
         注文書PDFを生成
 
+        明細が1ページに収まらない場合は複数ページに分け、各ページにヘッダー行と
+        前ページからの繰越（数量・金額の累計）を表示する。
+
         Args:
             order_data: 注文書マスター情報（dict）
             items: 注文書明細リスト（list of dict）
-            output_path: 出力ファイルパス
+            output_path: 出力ファイルパス（またはファイルオブジェクト）
         """
         if self.font_name == 'Helvetica':
             print("警告: 日本語フォントが利用できないため、PDFが文字化けする可能性があります。")
 
-        c = canvas.Canvas(output_path, pagesize=A4)
-
-        # タイトル
-        self._draw_title(c)
-
-        # ヘッダー部分（購入先情報と自社情報）
-        self._draw_header(c, order_data)
-
-        # 承認欄
-        self._draw_approval_section(c, order_data)
-
-        # 明細テーブル
-        self._draw_items_table(c, items)
+        wrap_style = self._wrap_style()
+
+        # 1回目: 各行の高さだけを求めてページ割りを決める（総ページ数をフッターに表示するため）
+        row_heights = [self._item_row_height(item, wrap_style) for item in items]
+        header_height = self._fixed_row_height(self.ITEM_HEADERS, 7)
+        summary_height = self._fixed_row_height(['合計'], 8)
+        pages = self._paginate(row_heights, header_height, summary_height)
+
+        # 2回目: ページごとにテーブルを作って描画する（保持するのは1ページ分の行だけ）
+        c = canvas.Canvas(output_path, pagesize=A4, pageCompression=1)
+        carried = None
+        for page_number, (start, end) in enumerate(pages, 1):
+            if page_number == 1:
+                # タイトル・ヘッダー部分（購入先情報と自社情報）・承認欄
+                self._draw_title(c)
+                self._draw_header(c, order_data)
+                self._draw_approval_section(c, order_data)
+                table_top = self.height - self.FIRST_PAGE_TABLE_TOP
+            else:
+                self._draw_continuation_header(c, order_data)
+                table_top = self.height - self.NEXT_PAGE_TABLE_TOP
+
+            # 明細テーブル
+            carried = self._draw_items_table(
+                c,
+                items[start:end],
+                first_index=start + 1,
+                row_heights=[header_height] + ([summary_height] if carried else []) + row_heights[start:end] + [summary_height],
+                table_top=table_top,
+                carried=carried,
+                is_last_page=page_number == len(pages),
+                wrap_style=wrap_style,
+            )
 
-        # フッター（ページ番号など）
-        self._draw_footer(c, order_data)
+            # フッター（注文書番号・ページ番号）
+            self._draw_footer(c, order_data, page_number, len(pages))
+            c.showPage()
 
         c.save()
         return output_path
 
+    def _wrap_style(self):
+        """折り返しスタイル"""
+        return ParagraphStyle(
+            'wrap', fontName=self.font_name, fontSize=7, leading=9, wordWrap='CJK'
+        )
+
+    def _fixed_row_height(self, row, font_size):
+        """ヘッダー行・合計行など折り返しのない行の高さ"""
+        lines = max(str(value).count('\n') + 1 for value in row)
+        return lines * font_size * 1.2 + 2 * self.CELL_PADDING_Y
+
+    def _item_row_height(self, item, wrap_style):
+        """明細行の高さ（折り返す列の高さの最大値）"""
+        height = wrap_style.leading
+        for column, key in zip(self.WRAPPED_COLUMNS, ('name', 'note')):
+            paragraph = Paragraph(self._paragraph_text(item.get(key)), wrap_style)
+            _, paragraph_height = paragraph.wrap(self.ITEM_COL_WIDTHS[column] - 2 * self.CELL_PADDING_X, self.height)
+            height = max(height, paragraph_height)
+        return height + 2 * self.CELL_PADDING_Y
+
+    @staticmethod
+    def _paragraph_text(value, default=''):
+        """Paragraph のマークアップとして解釈されないようにエスケープ"""
+        return escape(str(value)) if value else default
+
+    def _paginate(self, row_heights, header_height, summary_height):
+        """明細行をページに割り当て、ページごとの (開始, 終了) の添字を返す"""
+        pages = []
+        start = 0
+        while True:
+            first_page = not pages
+            table_top = self.FIRST_PAGE_TABLE_TOP if first_page else self.NEXT_PAGE_TABLE_TOP
+            # ヘッダー行・繰越行（2ページ目以降）・合計（繰越）行の分を除いた高さ
+            available = self.height - table_top - self.TABLE_BOTTOM - header_height - summary_height
+            if not first_page:
+                available -= summary_height
+
+            end = start
+            used = 0
+            while end < len(row_heights) and used + row_heights[end] <= available:
+                used += row_heights[end]
+                end += 1
+            # 1行だけでページに収まらない場合もその行を配置して進める
+            if end == start and end < len(row_heights):
+                end += 1
+
+            pages.append((start, end))
+            start = end
+            if start >= len(row_heights):
+                return pages
+
     def _draw_title(self, c):
         """タイトルを描画"""
         c.setFont(self.font_name, 24)
@@ -258,24 +361,36 @@ class PurchaseOrderGenerator:
         table.wrapOn(c, self.width, self.height)
         table.drawOn(c, right_x, y_start - 23 * mm)
 
-    def _draw_items_table(self, c, items):
-        """明細テーブルを描画"""
-        y_start = self.height - 115 * mm
+    def _draw_continuation_header(self, c, order_data):
+        """2ページ目以降のヘッダー（購入先と注文書番号）を描画"""
+        y = self.height - 18 * mm
+        c.setFont(self.font_name, 12)
+        supplier_name = order_data.get('supplier_name', '購入先名')
+        c.drawString(self.margin, y, f"注文書（続き）  {supplier_name} 御中")
 
-        # 折り返しスタイル
-        wrap_style = ParagraphStyle(
-            'wrap', fontName=self.font_name, fontSize=7, leading=9, wordWrap='CJK'
-        )
+        c.setFont(self.font_name, 9)
+        c.drawRightString(self.width - self.margin, y, f"注文書番号: {order_data.get('order_number', '')}")
 
-        # ヘッダー
-        headers = ['No', '発注\nコード', '商品名・仕様', '数量', '単位', '単価', '金額', '納期', '裏議書No', '備考']
+    def _draw_items_table(self, c, items, first_index, row_heights, table_top, carried, is_last_page, wrap_style):
+        """
+        1ページ分の明細テーブルを描画し、このページまでの数量・金額の累計を返す
+
+        Args:
+            items: このページの明細
+            first_index: このページの先頭の明細の番号（1始まり）
+            row_heights: ヘッダー行・繰越行・明細行・合計行の高さ
+            table_top: テーブル上端のY座標
+            carried: 前ページまでの (数量, 金額) の累計（1ページ目は None）
+            is_last_page: 最終ページなら合計行、それ以外は次頁への繰越行を付ける
+        """
+        total_quantity, total_amount = carried or (0, 0)
 
         # データ行を作成
-        table_data = [headers]
-        total_quantity = 0
-        total_amount = 0
+        table_data = [self.ITEM_HEADERS]
+        if carried:
+            table_data.append(['前頁より繰越', '', '', str(total_quantity), '', '', f"{int(total_amount):,}", '', '', ''])
 
-        for idx, item in enumerate(items, 1):
+        for idx, item in enumerate(items, first_index):
             quantity = item.get('quantity', 0)
             amount = item.get('total_amount', 0)
             total_quantity += quantity
@@ -284,20 +399,20 @@ class PurchaseOrderGenerator:
             row = [
                 str(idx),
                 item.get('order_code', ''),
-                Paragraph(item.get('name', ''), wrap_style),   # 自動折り返し
+                Paragraph(self._paragraph_text(item.get('name')), wrap_style),   # 自動折り返し
                 str(quantity),
                 item.get('unit', ''),
                 f"{int(item.get('unit_price', 0)):,}" if item.get('unit_price') else '',
                 f"{int(amount):,}" if amount else '',
                 item.get('deadline', ''),
                 '',
-                Paragraph(item.get('note', '') or '-', wrap_style)  # 自動折り返し
+                Paragraph(self._paragraph_text(item.get('note'), '-'), wrap_style)  # 自動折り返し
             ]
             table_data.append(row)
 
-        # 合計行を追加
+        # 合計行（最終ページ以外は次ページへの繰越）を追加
         total_row = [
-            '合計',  # No列に合計
+            '合計' if is_last_page else '次頁へ繰越',
             '',
             '',
             str(total_quantity),
@@ -310,14 +425,10 @@ class PurchaseOrderGenerator:
         ]
         table_data.append(total_row)
 
-        # カラム幅（合計178mm、A4幅に収まるように調整）
-        col_widths = [10 * mm, 18 * mm, 45 * mm, 12 * mm, 12 * mm, 18 * mm, 18 * mm, 15 * mm, 15 * mm, 15 * mm]
-
         # 最後の行番号（合計行）
         last_row = len(table_data) - 1
 
-        table = Table(table_data, colWidths=col_widths, repeatRows=1)
-        table.setStyle(TableStyle([
+        style = [
             ('FONT', (0, 0), (-1, -1), self.font_name, 7),
             ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
             ('ALIGN', (0, 0), (-1, 0), 'CENTER'),  # ヘッダー中央揃え
@@ -328,26 +439,38 @@ class PurchaseOrderGenerator:
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
             ('FONTSIZE', (0, 0), (-1, 0), 7),  # ヘッダーフォントサイズ
             ('FONTSIZE', (0, 1), (-1, -1), 7),  # データフォントサイズ
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            # 合計行のスタイル
+            ('BOTTOMPADDING', (0, 0), (-1, -1), self.CELL_PADDING_Y),
+            ('TOPPADDING', (0, 0), (-1, -1), self.CELL_PADDING_Y),
+            # 合計行のスタイル（見出しは No〜商品名の列を結合）
+            ('SPAN', (0, last_row), (2, last_row)),
             ('ALIGN', (0, last_row), (0, last_row), 'CENTER'),  # 合計テキスト中央揃え
             ('BACKGROUND', (0, last_row), (-1, last_row), colors.lightgrey),  # 合計行背景色
             ('FONT', (0, last_row), (-1, last_row), self.font_name, 8),  # 合計行フォントサイズ
-        ]))
+        ]
+        if carried:
+            style += [
+                ('SPAN', (0, 1), (2, 1)),
+                ('ALIGN', (0, 1), (0, 1), 'CENTER'),
+                ('BACKGROUND', (0, 1), (-1, 1), colors.whitesmoke),
+                ('FONT', (0, 1), (-1, 1), self.font_name, 8),
+            ]
+
+        # 行の高さはページ割りで求めた値を使う（ページ割りと描画結果を一致させる）
+        table = Table(table_data, colWidths=self.ITEM_COL_WIDTHS, rowHeights=row_heights)
+        table.setStyle(TableStyle(style))
 
-        # テーブルの高さを計算して配置
         table_width, table_height = table.wrap(self.width, self.height)
-        table.drawOn(c, self.margin, y_start - table_height)
+        table.drawOn(c, self.margin, table_top - table_height)
+        return total_quantity, total_amount
 
-    def _draw_footer(self, c, order_data):
+    def _draw_footer(self, c, order_data, page_number=1, total_pages=1):
         """フッターを描画"""
         c.setFont(self.font_name, 8)
         footer_text = f"注文書番号: {order_data.get('order_number', '')}"
         c.drawString(self.margin, 15 * mm, footer_text)
 
         # 右下にページ番号
-        c.drawRightString(self.width - self.margin, 15 * mm, "1 / 1")
+        c.drawRightString(self.width - self.margin, 15 * mm, f"{page_number} / {total_pages}")
 
 
 def generate_purchase_order_pdf(order_data, items, output_dir="uploads/purchase_orders"):
@@ -395,7 +518,8 @@ def generate_purchase_order_pdf(order_data, items, output_dir="uploads/purchase_
     output_path = os.path.join(output_dir, filename)
 
     # PDF生成
-    generator = PurchaseOrderGenerator()
-    generator.generate_purchase_order(order_data, items, output_path)
+    with timed(PDF_RENDER):
+        generator = PurchaseOrderGenerator()
+        generator.generate_purchase_order(order_data, items, output_path)
 
     return output_path
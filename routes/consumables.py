@@ -4,10 +4,11 @@
 from __future__ import annotations
 
 import csv
+from datetime import datetime
 from io import TextIOWrapper
 from uuid import uuid4
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, make_response, request
 from werkzeug.utils import secure_filename
 
 from config import (
@@ -15,10 +16,20 @@ from config import (
     CSV_REQUIRED_FIELDS,
     IMAGES_FOLDER,
     ALLOWED_IMAGE_EXTENSIONS,
+    QR_LABEL_MAX_LABELS,
 )
 from database_manager import get_db_manager
-from utils.csv_utils import resolve_csv_field, normalize_csv_row, parse_int, parse_float, resolve_supplier_id
-from utils.stock_utils import calculate_shortage_status
+from utils.csv_utils import (
+    resolve_csv_field,
+    normalize_csv_row,
+    parse_int,
+    parse_float,
+    resolve_supplier_id,
+    get_supplier_id_map,
+)
+from utils import event_bus
+from utils.stock_utils import NEEDS_REORDER_SQL, calculate_needs_reorder, calculate_shortage_status
+from utils.sync_utils import record_deletion
 from utils.permission_utils import require_page_permission
 
 consumables_bp = Blueprint("consumables", __name__)
@@ -92,10 +103,11 @@ def import_consumables_csv():
             return jsonify({"success": False, "error": f"必須列が不足しています: {missing}"}), 400
 
         db = get_db_manager()
-        supplier_cache: dict[str, int | None] = {}
         inserted = 0
         skipped: list[dict[str, str | int]] = []
         row_errors: list[dict[str, str | int]] = []
+        # 購入先名 → ID の対応表は取込の最初に1回だけ取得する
+        supplier_ids = get_supplier_id_map(db)
 
         for idx, raw_row in enumerate(rows, start=2):
             normalized = normalize_csv_row(raw_row)
@@ -120,7 +132,7 @@ def import_consumables_csv():
             safety_stock = parse_int(normalized.get("safety_stock"), 0)
             unit_price = parse_float(normalized.get("unit_price"), 0.0)
             order_unit = parse_int(normalized.get("order_unit"), 1)
-            supplier_id = resolve_supplier_id(db, normalized, supplier_cache)
+            supplier_id = resolve_supplier_id(db, normalized, supplier_ids)
 
             order_status = normalized.get("order_status") or "未発注"
             shortage_status = normalized.get("shortage_status")
@@ -143,6 +155,7 @@ def import_consumables_csv():
                 "note": normalized.get("note") or "",
                 "order_status": order_status,
                 "shortage_status": shortage_status,
+                "needs_reorder": calculate_needs_reorder(stock_quantity, safety_stock),
             }
 
             db.execute_update(CONSUMABLE_INSERT_SQL, params)
@@ -261,6 +274,7 @@ def create_consumable():
                 "note": data.get("note", ""),
                 "order_status": "未発注",
                 "shortage_status": shortage_status,
+                "needs_reorder": calculate_needs_reorder(stock_quantity, safety_stock),
             },
         )
         return jsonify({"success": True, "message": "消耗品を登録しました"})
@@ -345,6 +359,9 @@ def update_consumable(consumable_id):
             auto_status = calculate_shortage_status(new_stock_value, new_safety_value)
             update_fields.append("shortage_status = :shortage_status")
             params["shortage_status"] = auto_status
+        if stock_updated or safety_updated:
+            # 発注要否は stock_quantity / safety_stock の更新後の値で再計算する
+            update_fields.append(f"needs_reorder = {NEEDS_REORDER_SQL}")
 
         # 画像ファイルの処理
         if "image" in request.files:
@@ -364,6 +381,23 @@ def update_consumable(consumable_id):
         query = f"UPDATE consumables SET {', '.join(update_fields)} WHERE id = :id"
         db.execute_update(query, params)
 
+        if stock_updated or safety_updated:
+            updated = db.execute_query(
+                "SELECT id, code, name, stock_quantity, shortage_status, needs_reorder FROM consumables WHERE id = :id",
+                {"id": consumable_id},
+            )
+            if not updated.empty:
+                row = updated.iloc[0]
+                event_bus.publish(event_bus.STOCK_CHANGED, {
+                    "consumable_id": int(row["id"]),
+                    "code": row["code"],
+                    "name": row["name"],
+                    "movement_type": None,
+                    "stock_quantity": int(row["stock_quantity"] or 0),
+                    "shortage_status": row["shortage_status"],
+                    "needs_reorder": bool(row["needs_reorder"]),
+                })
+
         return jsonify({"success": True, "message": "消耗品情報を更新しました"})
 
     except Exception as e:
@@ -388,6 +422,7 @@ def delete_consumable(consumable_id):
             "DELETE FROM consumables WHERE id = :id",
             {"id": consumable_id},
         )
+        record_deletion(db, "consumables", consumable_id)
 
         return jsonify({"success": True, "message": "消耗品を削除しました"})
 
@@ -421,3 +456,68 @@ def upload_consumable_image():
         return jsonify({"success": True, "path": relative_path, "url": _build_image_url(relative_path)})
     except Exception as exc:
         return jsonify({"success": False, "error": str(exc)}), 500
+
+
+@consumables_bp.route("/api/consumables/labels", methods=["POST"])
+@require_page_permission("消耗品管理", "view")
+def generate_consumable_labels():
+    """
+    消耗品のQRラベルシート（A4のPDF）を作成するAPI
+
+    リクエスト（JSON）:
+        ids: 消耗品IDのリスト（all=true の場合は全消耗品）
+        columns / rows: 1ページの列数・行数（既定 3列 × 8行）
+        margin_mm / gap_mm: 用紙の余白・ラベルの間隔（mm）
+    """
+    # ReportLab は読み込みに時間がかかるため、ラベル作成時に読み込む
+    from utils.qr_label_utils import LabelGrid, render_label_sheets
+
+    try:
+        payload = request.get_json(silent=True) or {}
+        ids = payload.get("ids") or []
+        if not isinstance(ids, list) or (not ids and not payload.get("all")):
+            return jsonify({"success": False, "error": "ids または all=true を指定してください"}), 400
+
+        try:
+            ids = [int(consumable_id) for consumable_id in ids]
+            grid = LabelGrid(
+                columns=int(payload.get("columns", LabelGrid.columns)),
+                rows=int(payload.get("rows", LabelGrid.rows)),
+                margin_mm=float(payload.get("margin_mm", LabelGrid.margin_mm)),
+                gap_mm=float(payload.get("gap_mm", LabelGrid.gap_mm)),
+            )
+        except (TypeError, ValueError):
+            return jsonify({"success": False, "error": "ids・面付けには数値を指定してください"}), 400
+        try:
+            grid.validate()
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        if len(ids) > QR_LABEL_MAX_LABELS:
+            return jsonify({"success": False, "error": f"ラベルは{QR_LABEL_MAX_LABELS}件まで作成できます"}), 400
+
+        db = get_db_manager()
+        query = "SELECT id, code, name, storage_location FROM consumables"
+        params = {"limit": QR_LABEL_MAX_LABELS + 1}
+        if ids:
+            placeholders = ",".join([f":id{i}" for i in range(len(ids))])
+            query += f" WHERE id IN ({placeholders})"
+            params.update({f"id{i}": consumable_id for i, consumable_id in enumerate(ids)})
+        query += " ORDER BY code LIMIT :limit"
+
+        labels = db.fetch_all(query, params)
+        if not labels:
+            return jsonify({"success": False, "error": "消耗品が見つかりません"}), 404
+        if len(labels) > QR_LABEL_MAX_LABELS:
+            return jsonify({"success": False, "error": f"ラベルは{QR_LABEL_MAX_LABELS}件まで作成できます"}), 400
+
+        pdf_bytes = render_label_sheets(labels, grid)
+
+        response = make_response(pdf_bytes)
+        response.headers["Content-Type"] = "application/pdf"
+        response.headers["Content-Disposition"] = (
+            f'attachment; filename="qr_labels_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf"'
+        )
+        return response
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
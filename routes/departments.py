@@ -0,0 +1,50 @@
+"""
+部署マスターAPIルート
+"""
+from __future__ import annotations
+
+from flask import Blueprint, jsonify, request
+
+from database_manager import get_db_manager
+from utils.department_utils import list_departments
+from utils.http_cache import conditional_get, current_resource_version
+
+departments_bp = Blueprint("departments", __name__)
+
+
+@departments_bp.route("/api/departments", methods=["GET"])
+@conditional_get(("departments", "id", True))
+def get_departments():
+    """
+    部署の一覧を取得するAPI
+
+    q を指定すると部署名の前方一致で絞り込む（部署名の一意インデックスを使用）。
+    """
+    try:
+        q = request.args.get("q", "").strip()
+        try:
+            limit = min(max(int(request.args.get("limit", 50)), 1), 500)
+        except ValueError:
+            return jsonify({"success": False, "error": "limitは数値で指定してください"}), 400
+
+        db = get_db_manager()
+        if not q:
+            items = list_departments(db, version=current_resource_version())
+        else:
+            # LIKE のワイルドカードをエスケープして前方一致
+            escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            df = db.execute_query(
+                f"""
+                SELECT id, name
+                FROM departments
+                WHERE name LIKE :prefix
+                ORDER BY name
+                LIMIT {limit}
+                """,
+                {"prefix": f"{escaped}%"},
+            )
+            items = [{"id": int(row["id"]), "name": row["name"]} for _, row in df.iterrows()]
+
+        return jsonify({"success": True, "data": items, "count": len(items)})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
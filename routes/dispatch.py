@@ -9,7 +9,7 @@ import pandas as pd
 import os
 
 from database_manager import get_db_manager
-from pdf_generator import generate_purchase_order_pdf
+from utils.change_events import publish_consumable_order_status, publish_dispatch_order_changed
 from email_sender import send_purchase_order_email
 from permission_helper import (
     can_create_dispatch_order,
@@ -54,18 +54,9 @@ def get_pending_orders():
             WHERE o.status IN ('依頼中', '発注準備')
             ORDER BY o.requested_date DESC
         """
-        df = db.execute_query(query)
+        rows = db.fetch_all(query)
 
-        # Timestamp列を文字列に変換（NULL値を考慮）
-        if "requested_date" in df.columns and not df.empty:
-            df["requested_date"] = df["requested_date"].apply(
-                lambda x: x.strftime("%Y-%m-%d %H:%M:%S") if pd.notna(x) else None
-            )
-
-        # NaTをNoneに変換
-        df = df.where(df.notna(), None)
-
-        return jsonify({"success": True, "data": df.to_dict(orient="records")})
+        return jsonify({"success": True, "data": rows})
     except Exception as exc:
         return jsonify({"success": False, "error": str(exc)}), 500
 
@@ -104,6 +95,7 @@ def update_order_status(order_id: int):
                     "UPDATE consumables SET order_status = '却下' WHERE id = :id",
                     {"id": consumable_id}
                 )
+                publish_consumable_order_status(db, [consumable_id])
 
         return jsonify({"success": True, "message": f"ステータスを「{new_status}」に更新しました"})
     except Exception as exc:
@@ -217,13 +209,9 @@ def get_dispatch_items():
             WHERE o.status = '発注準備'
             ORDER BY s.name, o.name
         """
-        df = db.execute_query(query)
-
-        # NaTをNoneに変換
-        df = df.where(df.notna(), None)
+        items = db.fetch_all(query)
 
         # 購入先別にグループ化
-        items = df.to_dict(orient="records")
         grouped = {}
         for item in items:
             supplier_id = item["supplier_id"]
@@ -407,6 +395,9 @@ def create_dispatch_order():
                     "deadline": str(item["deadline"]) if pd.notna(item["deadline"]) else "",
                     "note": str(item["note"]) if pd.notna(item["note"]) else ""
                 })
+
+            from pdf_generator import generate_purchase_order_pdf  # ReportLab はPDF作成時に読み込む
+
             pdf_path = generate_purchase_order_pdf(order_data_for_pdf, items_for_pdf)
         except Exception as pdf_error:
             print(f"PDF生成エラー: {pdf_error}")
@@ -473,6 +464,8 @@ def create_dispatch_order():
                 }
             )
 
+        publish_dispatch_order_changed(db, dispatch_order_id)
+
         return jsonify({
             "success": True,
             "message": "注文書を作成しました",
@@ -520,51 +513,19 @@ def get_dispatch_orders():
             WHERE do.status != '入庫済み'
             ORDER BY do.created_at DESC
         """
-        df = db.execute_query(query)
-
-        # Timestamp列を文字列に変換（NULL値を考慮）
-        if "created_at" in df.columns and not df.empty:
-            df["created_at"] = df["created_at"].apply(
-                lambda x: x.strftime("%Y-%m-%d %H:%M:%S") if pd.notna(x) else None
-            )
-        if "sent_at" in df.columns and not df.empty:
-            df["sent_at"] = df["sent_at"].apply(
-                lambda x: x.strftime("%Y-%m-%d %H:%M:%S") if pd.notna(x) else None
-            )
-        if "reviewed_at" in df.columns and not df.empty:
-            df["reviewed_at"] = df["reviewed_at"].apply(
-                lambda x: x.strftime("%Y-%m-%d %H:%M:%S") if pd.notna(x) else None
-            )
-        if "approved_at" in df.columns and not df.empty:
-            df["approved_at"] = df["approved_at"].apply(
-                lambda x: x.strftime("%Y-%m-%d %H:%M:%S") if pd.notna(x) else None
-            )
-
-        # NaTをNoneに変換
-        df = df.where(df.notna(), None)
+        orders = db.fetch_all(query)
 
         # 各注文書の商品情報を取得
-        orders = df.to_dict(orient="records")
-
-        # NaN値をNoneに変換（JSONシリアライズ対策）
-        import math
         for order in orders:
-            for key, value in list(order.items()):
-                if isinstance(value, float) and math.isnan(value):
-                    order[key] = None
-
-            order_id = order['id']
-            items_df = db.execute_query(
+            order['items'] = db.fetch_all(
                 """
                 SELECT name, quantity, unit
                 FROM dispatch_order_items
                 WHERE dispatch_order_id = :order_id
                 ORDER BY name
                 """,
-                {"order_id": order_id}
+                {"order_id": order['id']}
             )
-            items_df = items_df.where(items_df.notna(), None)
-            order['items'] = items_df.to_dict(orient="records")
 
         # ユーザーの権限情報を取得
         user_id = session.get("user_id")
@@ -586,7 +547,7 @@ def get_dispatch_order_detail(order_id: int):
         db = get_db_manager()
 
         # 注文書マスター情報
-        order_df = db.execute_query(
+        order_rows = db.fetch_all(
             """
             SELECT
                 do.id, do.order_number, do.supplier_id, do.supplier_name, do.total_items, do.total_amount,
@@ -599,24 +560,13 @@ def get_dispatch_order_detail(order_id: int):
             {"id": order_id}
         )
 
-        if order_df.empty:
+        if not order_rows:
             return jsonify({"success": False, "error": "注文書が見つかりません"}), 404
 
-        # Timestamp列を文字列に変換（NULL値を考慮）
-        if "created_at" in order_df.columns:
-            order_df["created_at"] = order_df["created_at"].apply(
-                lambda x: x.strftime("%Y-%m-%d %H:%M:%S") if pd.notna(x) else None
-            )
-        if "sent_at" in order_df.columns:
-            order_df["sent_at"] = order_df["sent_at"].apply(
-                lambda x: x.strftime("%Y-%m-%d %H:%M:%S") if pd.notna(x) else None
-            )
-
-        order_df = order_df.where(order_df.notna(), None)
-        order_data = order_df.iloc[0].to_dict()
+        order_data = order_rows[0]
 
         # 注文書明細
-        items_df = db.execute_query(
+        order_data["items"] = db.fetch_all(
             """
             SELECT
                 id, consumable_id, code, name, quantity, unit,
@@ -628,9 +578,6 @@ def get_dispatch_order_detail(order_id: int):
             {"dispatch_order_id": order_id}
         )
 
-        items_df = items_df.where(items_df.notna(), None)
-        order_data["items"] = items_df.to_dict(orient="records")
-
         return jsonify({"success": True, "data": order_data})
     except Exception as exc:
         return jsonify({"success": False, "error": str(exc)}), 500
@@ -685,30 +632,28 @@ def _get_or_generate_pdf(order_id: int):
 
     # 当日の同一購入先の注文書数を計算（この注文書が何番目か）
     created_at = order_data.get('created_at')
-    if created_at:
-        if hasattr(created_at, 'date'):
-            order_date = created_at.date()
-        else:
-            try:
-                from datetime import datetime as dt
-                order_date = dt.fromisoformat(str(created_at)).date()
-            except:
-                order_date = datetime.now().date()
-    else:
-        order_date = datetime.now().date()
+    if created_at is not None and not hasattr(created_at, 'date'):
+        try:
+            created_at = datetime.fromisoformat(str(created_at))
+        except ValueError:
+            created_at = None
+    if created_at is None or pd.isna(created_at):
+        created_at = datetime.now()
+    # 注文書作成時の today_start と同じ基準（created_at の日の0時）で範囲検索する
+    day_start = created_at.replace(hour=0, minute=0, second=0, microsecond=0)
 
     # その日の0時から現在の注文書の作成時刻までの同一購入先の注文書数を取得
     daily_count_df = db.execute_query(
         """
         SELECT COUNT(*) as count FROM dispatch_orders
         WHERE supplier_id = :supplier_id
-        AND DATE(created_at) = :order_date
+        AND created_at >= :day_start
         AND created_at <= :created_at
         """,
         {
             "supplier_id": order_data.get('supplier_id'),
-            "order_date": order_date,
-            "created_at": created_at if created_at else datetime.now()
+            "day_start": day_start,
+            "created_at": created_at
         }
     )
     daily_count = int(daily_count_df.iloc[0]["count"]) if not daily_count_df.empty else 1
@@ -728,6 +673,8 @@ def _get_or_generate_pdf(order_id: int):
         "approved_at": order_data.get('approved_at')
     }
     items = items_df.to_dict(orient="records")
+    from pdf_generator import generate_purchase_order_pdf  # ReportLab はPDF作成時に読み込む
+
     pdf_path = generate_purchase_order_pdf(order_data_for_pdf, items)
 
     # 再生成したPDFパスをデータベースに保存
@@ -919,6 +866,9 @@ def send_dispatch_order(order_id: int):
             {"order_id": order_id, "ordered_date": datetime.now()}
         )
 
+        publish_dispatch_order_changed(db, order_id)
+        publish_consumable_order_status(db, dispatch_order_id=order_id)
+
         return jsonify({
             "success": True,
             "message": f"注文書を {email} に送信しました"
@@ -964,6 +914,7 @@ def delete_dispatch_order(order_id: int):
             "DELETE FROM dispatch_orders WHERE id = :order_id",
             {"order_id": order_id}
         )
+        publish_dispatch_order_changed(db, order_id, deleted=True)
 
         return jsonify({
             "success": True,
@@ -1030,6 +981,7 @@ def review_dispatch_order(order_id: int):
                 "order_id": order_id
             }
         )
+        publish_dispatch_order_changed(db, order_id)
 
         return jsonify({
             "success": True,
@@ -1095,6 +1047,7 @@ def approve_dispatch_order(order_id: int):
                 "order_id": order_id
             }
         )
+        publish_dispatch_order_changed(db, order_id)
 
         return jsonify({
             "success": True,
@@ -9,6 +9,9 @@ from flask import Blueprint, jsonify, request
 from werkzeug.security import generate_password_hash
 
 from database_manager import get_db_manager
+from utils import cache
+from utils.department_utils import ensure_department
+from utils.http_cache import conditional_get, current_resource_version
 from utils.permission_utils import require_page_permission
 
 employees_bp = Blueprint("employees", __name__)
@@ -22,14 +25,20 @@ def _normalize_employee_code(code: str, width: int = 6) -> str:
 
 
 @employees_bp.route("/api/employees", methods=["GET"])
+@conditional_get(("employees", "updated_at", True))
 def get_employees():
     """従業員一覧を取得するAPI"""
     try:
         db = get_db_manager()
-        df = db.execute_query(
-            "SELECT id, code, name, department, email, role, created_at FROM employees ORDER BY code"
+        data = cache.cached(
+            cache.EMPLOYEES,
+            "list",
+            lambda: db.execute_query(
+                "SELECT id, code, name, department, email, role, created_at FROM employees ORDER BY code"
+            ).to_dict(orient="records"),
+            version=current_resource_version(),
         )
-        return jsonify({"success": True, "data": df.to_dict(orient="records")})
+        return jsonify({"success": True, "data": data})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -60,24 +69,29 @@ def get_employee_by_code(employee_code):
         normalized = _normalize_employee_code(employee_code)
 
         db = get_db_manager()
-        if normalized != employee_code:
-            df = db.execute_query(
-                """
-                SELECT id, code, name, department, email, role
-                FROM employees
-                WHERE code = :code OR code = :normalized_code
-                """,
-                {"code": employee_code, "normalized_code": normalized},
-            )
-        else:
-            df = db.execute_query(
-                "SELECT id, code, name, department, email, role FROM employees WHERE code = :code",
-                {"code": employee_code},
-            )
-        if df.empty:
+
+        def load_employee():
+            if normalized != employee_code:
+                df = db.execute_query(
+                    """
+                    SELECT id, code, name, department, email, role
+                    FROM employees
+                    WHERE code = :code OR code = :normalized_code
+                    """,
+                    {"code": employee_code, "normalized_code": normalized},
+                )
+            else:
+                df = db.execute_query(
+                    "SELECT id, code, name, department, email, role FROM employees WHERE code = :code",
+                    {"code": employee_code},
+                )
+            return df.to_dict(orient="records")[0] if not df.empty else None
+
+        # 社員証の読み取りのたびに呼ばれるためキャッシュする（ワーカー間で無効化を共有できる Redis がある場合のみ）
+        data = cache.cached(cache.EMPLOYEES, f"code:{employee_code}", load_employee)
+        if data is None:
             return jsonify({"success": False, "error": "従業員が見つかりません"}), 404
 
-        data = df.to_dict(orient="records")[0]
         return jsonify({"success": True, "data": data})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -107,7 +121,8 @@ def add_employee():
         password = data.get("password", "").strip()
         password_hash = generate_password_hash(password) if password else None
 
-        # 従業員を登録
+        # 従業員を登録（部署は部署マスターにも登録）
+        ensure_department(db, data.get("department", ""))
         db.execute_update(
             """
             INSERT INTO employees (code, name, department, email, password, role)
@@ -123,6 +138,7 @@ def add_employee():
             },
         )
 
+        cache.invalidate(cache.EMPLOYEES)
         return jsonify({"success": True, "message": "従業員を登録しました"})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -152,6 +168,7 @@ def update_employee(employee_id):
         if "department" in data:
             update_fields.append("department = :department")
             params["department"] = data["department"]
+            ensure_department(db, data["department"])
 
         if "email" in data:
             update_fields.append("email = :email")
@@ -174,6 +191,7 @@ def update_employee(employee_id):
         query = f"UPDATE employees SET {', '.join(update_fields)} WHERE id = :id"
         db.execute_update(query, params)
 
+        cache.invalidate(cache.EMPLOYEES)
         return jsonify({"success": True, "message": "従業員情報を更新しました"})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -194,6 +212,7 @@ def delete_employee(employee_id):
         # 削除実行
         db.execute_update("DELETE FROM employees WHERE id = :id", {"id": employee_id})
 
+        cache.invalidate(cache.EMPLOYEES)
         return jsonify({"success": True, "message": "従業員を削除しました"})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -254,7 +273,8 @@ def import_employees_csv():
                 password = str(row.get("パスワード", "")).strip()
                 password_hash = generate_password_hash(password) if password else None
 
-                # 従業員を登録
+                # 従業員を登録（部署は部署マスターにも登録）
+                ensure_department(db, row.get("部署", ""))
                 db.execute_update(
                     """
                     INSERT INTO employees (code, name, department, email, password, role)
@@ -276,6 +296,9 @@ def import_employees_csv():
                 skipped += 1
                 continue
 
+        if inserted:
+            cache.invalidate(cache.EMPLOYEES)
+
         return jsonify(
             {
                 "success": True,
@@ -0,0 +1,106 @@
+"""
+変更イベント配信APIルート（Server-Sent Events）
+"""
+from __future__ import annotations
+
+import time
+
+from flask import Blueprint, Response, jsonify, request
+
+import config
+from database_manager import get_db_manager
+from utils.change_events import change_event_hub, fetch_events_since, latest_event_id
+from utils.json_utils import dumps
+
+events_bp = Blueprint("events", __name__)
+
+
+def _format_sse(event: dict) -> str:
+    data = dumps(event["data"])
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+def _can_hold_stream() -> bool:
+    """
+    接続を保持しても他のリクエストを止めないサーバーか.
+
+    gunicorn の sync ワーカー（1ワーカー1リクエスト）で接続を保持すると、開いている画面の数だけ
+    ワーカーが埋まり、QR読み取りなど他のリクエストが処理されなくなる。gthread（gunicorn.conf.py の既定）・
+    gevent・開発サーバー（threaded）以外では接続を保持しない。
+    """
+    if request.environ.get("wsgi.multithread"):
+        return True
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("threading")
+
+
+@events_bp.route("/api/events/stream", methods=["GET"])
+def stream_events():
+    """
+    在庫・注文状態・注文書の変更をSSEで配信するAPI
+
+    change_events の確認はプロセスごとに1つのスレッド（ChangeEventHub）で行い、各接続はその結果を待つ。
+    接続は1スレッドを EVENTS_STREAM_MAX_SECONDS 秒まで保持するため、gthread または gevent ワーカーで動かす。
+    sync ワーカーの場合と、1ワーカーの接続数が EVENTS_MAX_STREAMS_PER_WORKER に達している場合は、
+    未配信のイベントだけを返してすぐに閉じ、ブラウザに EVENTS_FALLBACK_RETRY_SECONDS 秒後に再接続させる。
+    """
+    try:
+        db = get_db_manager()
+
+        # 再接続時はブラウザが Last-Event-ID を送るので、その続きから配信する
+        last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+        try:
+            last_event_id = int(last_event_id) if last_event_id else latest_event_id(db)
+        except ValueError:
+            return jsonify({"success": False, "error": "Last-Event-ID が不正です"}), 400
+
+        can_hold = _can_hold_stream()
+
+        def generate(cursor: int):
+            # 接続の登録は送信を始めてから行う（送信前に切断された場合に登録が残らないように）
+            if not (can_hold and change_event_hub.open(config.EVENTS_MAX_STREAMS_PER_WORKER)):
+                # 接続を保持しない場合は未配信のイベントだけを返して閉じる（短い間隔のポーリングと同じ）
+                yield f"retry: {config.EVENTS_FALLBACK_RETRY_SECONDS * 1000}\n\n"
+                for event in fetch_events_since(db, cursor):
+                    yield _format_sse(event)
+                return
+
+            try:
+                started = time.monotonic()
+                last_sent = started
+                yield f"retry: {int(config.EVENTS_POLL_INTERVAL * 1000)}\n\n"
+
+                # ワーカーのスレッドを占有し続けないよう、一定時間で接続を閉じてブラウザに再接続させる
+                while time.monotonic() - started < config.EVENTS_STREAM_MAX_SECONDS:
+                    timeout = min(
+                        config.EVENTS_HEARTBEAT_SECONDS - (time.monotonic() - last_sent),
+                        config.EVENTS_STREAM_MAX_SECONDS - (time.monotonic() - started),
+                    )
+                    events = change_event_hub.wait(cursor, max(timeout, 0))
+                    if events is None:
+                        # 確認用のバッファより古い位置からの再接続
+                        events = fetch_events_since(db, cursor)
+                    for event in events:
+                        cursor = event["id"]
+                        yield _format_sse(event)
+                    if events:
+                        last_sent = time.monotonic()
+                    elif time.monotonic() - last_sent >= config.EVENTS_HEARTBEAT_SECONDS:
+                        yield ": keepalive\n\n"
+                        last_sent = time.monotonic()
+            finally:
+                change_event_hub.close()
+
+        return Response(
+            generate(last_event_id),
+            mimetype="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no",
+            },
+        )
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
@@ -3,13 +3,20 @@
 """
 from __future__ import annotations
 
-import pandas as pd
 from flask import Blueprint, jsonify, request
 
 from database_manager import get_db_manager
+from utils.date_utils import build_date_range_clause
+from utils.department_utils import find_department_id, list_departments
+from utils.http_cache import conditional_get, current_resource_version
+from utils.movement_utils import MOVEMENT_INBOUND, MOVEMENT_OUTBOUND
+from utils.search_utils import build_text_search
 
 history_bp = Blueprint("history", __name__)
 
+# type パラメータと在庫移動台帳の移動種別の対応
+MOVEMENT_TYPES = {"outbound": MOVEMENT_OUTBOUND, "inbound": MOVEMENT_INBOUND}
+
 
 @history_bp.route("/api/history", methods=["GET"])
 def get_history():
@@ -23,136 +30,120 @@ def get_history():
         end_date = request.args.get("end_date", "")
         search_text = request.args.get("search_text", "")
         department = request.args.get("department", "")
-
-        results = []
-
-        # 出庫履歴を取得
-        if history_type in ["all", "outbound"]:
-            outbound_query = """
-                SELECT
-                    '出庫' AS type,
-                    code,
-                    name,
-                    quantity,
-                    employee_name,
-                    employee_department,
-                    unit_price,
-                    total_amount,
-                    note,
-                    outbound_date AS date
-                FROM outbound_history
-                WHERE 1=1
-            """
-            outbound_params = {}
-
-            if start_date:
-                outbound_query += " AND DATE(outbound_date) >= :start_date"
-                outbound_params["start_date"] = start_date
-
-            if end_date:
-                outbound_query += " AND DATE(outbound_date) <= :end_date"
-                outbound_params["end_date"] = end_date
-
-            if search_text:
-                outbound_query += " AND (name LIKE :search_text OR employee_name LIKE :search_text)"
-                outbound_params["search_text"] = f"%{search_text}%"
-
-            if department:
-                outbound_query += " AND employee_department = :department"
-                outbound_params["department"] = department
-
-            outbound_df = db.execute_query(outbound_query, outbound_params)
-            if not outbound_df.empty:
-                results.append(outbound_df)
-
-        # 入庫履歴を取得
-        if history_type in ["all", "inbound"]:
-            inbound_query = """
-                SELECT
-                    '入庫' AS type,
-                    code,
-                    name,
-                    quantity,
-                    employee_name,
-                    employee_department,
-                    unit_price,
-                    total_amount,
-                    note,
-                    inbound_date AS date
-                FROM inbound_history
-                WHERE 1=1
-            """
-            inbound_params = {}
-
-            if start_date:
-                inbound_query += " AND DATE(inbound_date) >= :start_date"
-                inbound_params["start_date"] = start_date
-
-            if end_date:
-                inbound_query += " AND DATE(inbound_date) <= :end_date"
-                inbound_params["end_date"] = end_date
-
-            if search_text:
-                inbound_query += " AND (name LIKE :search_text OR employee_name LIKE :search_text)"
-                inbound_params["search_text"] = f"%{search_text}%"
-
-            if department:
-                inbound_query += " AND employee_department = :department"
-                inbound_params["department"] = department
-
-            inbound_df = db.execute_query(inbound_query, inbound_params)
-            if not inbound_df.empty:
-                results.append(inbound_df)
-
-        # 結果を結合してソート
-        if results:
-            combined_df = pd.concat(results, ignore_index=True)
-            combined_df = combined_df.sort_values(by="date", ascending=False)
-            combined_df = combined_df.head(1000)  # 最大1000件
-        else:
-            combined_df = pd.DataFrame()
+        department_id = request.args.get("department_id", "")
+
+        try:
+            date_clause, date_params = build_date_range_clause("moved_at", start_date, end_date)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        # 在庫移動台帳から入出庫をまとめて取得（最大1000件）
+        query = """
+            SELECT
+                CASE movement_type WHEN 'inbound' THEN '入庫' ELSE '出庫' END AS type,
+                code,
+                name,
+                ABS(quantity) AS quantity,
+                employee_name,
+                employee_department,
+                unit_price,
+                total_amount,
+                note,
+                moved_at AS date
+            FROM stock_movements
+            WHERE 1=1
+        """
+        params = {}
+
+        if history_type in MOVEMENT_TYPES:
+            query += " AND movement_type = :movement_type"
+            params["movement_type"] = MOVEMENT_TYPES[history_type]
+        elif history_type != "all":
+            return jsonify({"success": True, "data": [], "count": 0})
+
+        query += date_clause
+        params.update(date_params)
+
+        if search_text:
+            search_clause, search_params, _ = build_text_search(["name", "employee_name"], search_text)
+            query += f" AND {search_clause}"
+            params.update(search_params)
+
+        # 部署は部署IDのインデックスで絞り込む（部署名で指定された場合はIDに変換）
+        if department_id:
+            try:
+                department_id = int(department_id)
+            except ValueError:
+                return jsonify({"success": False, "error": "department_idは数値で指定してください"}), 400
+        elif department:
+            department_id = find_department_id(db, department)
+            if department_id is None:
+                return jsonify({"success": True, "data": [], "count": 0})
+        if department_id:
+            query += " AND department_id = :department_id"
+            params["department_id"] = department_id
+
+        query += " ORDER BY moved_at DESC, id DESC LIMIT 1000"
+
+        rows = db.fetch_all(query, params)
 
         return jsonify({
             "success": True,
-            "data": combined_df.to_dict(orient="records"),
-            "count": len(combined_df)
+            "data": rows,
+            "count": len(rows)
         })
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
-@history_bp.route("/api/history/departments", methods=["GET"])
-def get_departments():
-    """履歴から部署の一覧を取得するAPI"""
+@history_bp.route("/api/history/consumables/<int:consumable_id>", methods=["GET"])
+def get_consumable_movements(consumable_id: int):
+    """消耗品ごとの入出庫の推移を取得するAPI"""
     try:
         db = get_db_manager()
+        limit = min(max(request.args.get("limit", 200, type=int), 1), 1000)
+
+        rows = db.fetch_all(
+            f"""
+            SELECT
+                id,
+                movement_type,
+                quantity,
+                stock_after,
+                employee_name,
+                employee_department,
+                total_amount,
+                note,
+                moved_at AS date
+            FROM stock_movements
+            WHERE consumable_id = :consumable_id
+            ORDER BY moved_at DESC, id DESC
+            LIMIT {limit}
+            """,
+            {"consumable_id": consumable_id},
+        )
 
-        # 出庫履歴から部署を取得
-        outbound_query = """
-            SELECT DISTINCT employee_department
-            FROM outbound_history
-            WHERE employee_department IS NOT NULL AND employee_department != ''
-        """
-        outbound_df = db.execute_query(outbound_query)
+        return jsonify({
+            "success": True,
+            "data": rows,
+            "count": len(rows)
+        })
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
 
-        # 入庫履歴から部署を取得
-        inbound_query = """
-            SELECT DISTINCT employee_department
-            FROM inbound_history
-            WHERE employee_department IS NOT NULL AND employee_department != ''
-        """
-        inbound_df = db.execute_query(inbound_query)
 
-        # 結合してユニークな部署リストを作成
-        departments = set()
-        if not outbound_df.empty:
-            departments.update(outbound_df["employee_department"].tolist())
-        if not inbound_df.empty:
-            departments.update(inbound_df["employee_department"].tolist())
+@history_bp.route("/api/history/departments", methods=["GET"])
+@conditional_get(("departments", "id", True))
+def get_departments():
+    """部署の一覧を取得するAPI（履歴の絞り込み用）"""
+    try:
+        db = get_db_manager()
+        items = list_departments(db, version=current_resource_version())
 
         return jsonify({
             "success": True,
-            "departments": sorted(list(departments))
+            "departments": [item["name"] for item in items],
+            "items": items
         })
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -5,37 +5,57 @@ from __future__ import annotations
 
 import base64
 import re
-from datetime import timedelta
-
-JST = timedelta(hours=9)
-
-def _to_jst_date(ts) -> str | None:
-    """UTC datetimeをJST日付文字列(YYYY-MM-DD)に変換"""
-    if not pd.notna(ts):
-        return None
-    return (ts + JST).strftime('%Y-%m-%d')
-
-import cv2
-import numpy as np
-import pandas as pd
 from flask import Blueprint, jsonify, request
-from PIL import Image
 from io import BytesIO
 
+from config import MOVEMENT_BATCH_MAX_ITEMS
 from database_manager import get_db_manager
-from utils.stock_utils import calculate_shortage_status
+from utils.change_events import publish_dispatch_order_changed
+from utils.columnar import COLUMNAR, to_columnar
+from utils.date_utils import to_jst_date
+from utils.http_cache import conditional_get
+from utils.metrics import QR_DECODE, timed
+from utils.movement_utils import (
+    MOVEMENT_INBOUND,
+    MOVEMENT_OUTBOUND,
+    MOVEMENT_TYPE_LABELS,
+    MovementBatchError,
+    MovementError,
+    record_movement,
+    record_movement_batch,
+)
+from utils.search_utils import build_text_search
+from utils.sync_utils import (
+    changed_consumable_ids,
+    current_sync_token,
+    deleted_consumable_ids,
+    is_sync_token_expired,
+    parse_sync_token,
+)
 
 inventory_bp = Blueprint("inventory", __name__)
 
+# format=columnar で辞書符号化する列（種類が少なく同じ値が繰り返される列）
+INVENTORY_DICTIONARY_COLUMNS = ("カテゴリ", "単位", "注文状態", "欠品状態", "購入先")
+
+# QRラベルの正規形（消耗品コードのみ、utils.qr_label_utils.label_payload）
+CANONICAL_QR_CODE = re.compile(r"[A-Za-z0-9](?:[A-Za-z0-9_.\-]*[A-Za-z0-9])?")
+
 
 def decode_qr_from_image(image_bytes: bytes) -> str | None:
     """画像からQRコードを読み取る"""
+    # OpenCV・Pillow は読み込みに時間がかかるため、QR読み取りの初回に読み込む
+    import cv2
+    import numpy as np
+    from PIL import Image
+
     try:
-        image = Image.open(BytesIO(image_bytes)).convert("RGB")
-        rgb_array = np.array(image)
-        bgr_array = cv2.cvtColor(rgb_array, cv2.COLOR_RGB2BGR)
-        detector = cv2.QRCodeDetector()
-        data, points, _ = detector.detectAndDecode(bgr_array)
+        with timed(QR_DECODE):
+            image = Image.open(BytesIO(image_bytes)).convert("RGB")
+            rgb_array = np.array(image)
+            bgr_array = cv2.cvtColor(rgb_array, cv2.COLOR_RGB2BGR)
+            detector = cv2.QRCodeDetector()
+            data, points, _ = detector.detectAndDecode(bgr_array)
         return data or None
     except Exception:
         return None
@@ -48,6 +68,10 @@ def normalize_qr_code_value(raw_value: str) -> str:
 
     value = raw_value.strip()
 
+    # QRラベルシートで作成した正規形はそのまま返す（以下の形式の解析を省く）
+    if CANONICAL_QR_CODE.fullmatch(value):
+        return value
+
     # 誤って作成された複合形式:
     # 「管理番号：<消耗品コード> 品名：...」から消耗品コードだけを抽出
     match = re.search(r"管理番号\s*[：:]\s*(.*?)\s*品名", value, flags=re.DOTALL)
@@ -79,9 +103,119 @@ def normalize_qr_code_value(raw_value: str) -> str:
     return re.sub(r"\s+", "", value)
 
 
+def _group_by_consumable(rows: list[dict], build_row) -> dict[int, list[dict]]:
+    """明細を消耗品IDごとのリストにまとめる（並び順はクエリの順を維持）"""
+    grouped: dict[int, list[dict]] = {}
+    for row in rows:
+        grouped.setdefault(int(row["consumable_id"]), []).append(build_row(row))
+    return grouped
+
+
+def _attach_item_details(db, items: list[dict]) -> list[dict]:
+    """在庫一覧の各品目に注文依頼・発注済み注文・入庫履歴の明細を付与する"""
+    if not items:
+        return items
+
+    consumable_ids = [item["id"] for item in items]
+    placeholders = ",".join([f":id{i}" for i in range(len(consumable_ids))])
+    id_params = {f"id{i}": cid for i, cid in enumerate(consumable_ids)}
+
+    details = [
+        (
+            "依頼中注文",
+            "pending orders",
+            f"""
+                SELECT
+                    o.consumable_id,
+                    o.requested_date AS 依頼日,
+                    o.requester_name AS 依頼者,
+                    o.quantity AS 依頼数量,
+                    o.deadline AS 納期,
+                    o.ordered_date AS 注文日,
+                    o.status AS ステータス
+                FROM orders o
+                WHERE o.consumable_id IN ({placeholders})
+                ORDER BY o.requested_date DESC
+            """,
+            lambda order: {
+                "依頼日": to_jst_date(order["依頼日"]),
+                "依頼者": order["依頼者"],
+                "依頼数量": int(order["依頼数量"] or 0),
+                "納期": order["納期"],
+                "注文日": to_jst_date(order["注文日"]),
+            },
+        ),
+        (
+            "発注済み注文",
+            "completed orders",
+            f"""
+                SELECT
+                    o.consumable_id,
+                    o.ordered_date AS 注文日,
+                    o.quantity AS 注文数量,
+                    o.deadline AS 納期
+                FROM orders o
+                WHERE o.consumable_id IN ({placeholders})
+                AND o.status = '発注済'
+                ORDER BY o.ordered_date DESC
+            """,
+            lambda order: {
+                "注文日": to_jst_date(order["注文日"]),
+                "注文数量": int(order["注文数量"] or 0),
+                "納期": order["納期"],
+            },
+        ),
+        (
+            "入庫詳細",
+            "inbound details",
+            f"""
+                SELECT
+                    ih.consumable_id,
+                    ih.inbound_date AS 入庫日,
+                    ih.quantity AS 数量,
+                    ih.employee_name AS 入庫者,
+                    ih.inbound_type AS 入庫種別
+                FROM inbound_history ih
+                WHERE ih.consumable_id IN ({placeholders})
+                ORDER BY ih.inbound_date DESC
+            """,
+            lambda detail: {
+                "入庫日": to_jst_date(detail["入庫日"]),
+                "数量": int(detail["数量"] or 0),
+                "入庫者": detail["入庫者"],
+                "入庫種別": detail["入庫種別"],
+            },
+        ),
+    ]
+
+    for column, label, query, build_row in details:
+        try:
+            grouped = _group_by_consumable(db.fetch_all(query, id_params), build_row)
+        except Exception as e:
+            print(f"Error fetching {label}: {e}")
+            # エラーが発生しても、空の配列を設定
+            grouped = {}
+        for item in items:
+            item[column] = grouped.get(int(item["id"]), [])
+
+    return items
+
+
 @inventory_bp.route("/api/inventory")
+@conditional_get(
+    ("consumables", "updated_at", True),
+    ("suppliers", "updated_at", False),
+    ("orders", "updated_at", True),
+    ("inbound_history", "updated_at", False),
+)
 def get_inventory():
-    """在庫データを取得するAPI"""
+    """
+    在庫データを取得するAPI
+
+    updated_since に前回の sync_token を指定すると、それ以降に変更された品目（data）と
+    削除・条件外になった品目のID（deleted_ids）だけを返す。
+    format=columnar を指定すると data を列指向の形式（utils.columnar）で返す。
+    """
     try:
         db = get_db_manager()
 
@@ -90,6 +224,24 @@ def get_inventory():
         search_text = request.args.get("search_text", "").strip()
         order_status = request.args.get("order_status", "").strip()
         shortage_status = request.args.get("shortage_status", "").strip()
+        updated_since = request.args.get("updated_since", "").strip()
+        response_format = request.args.get("format", "").strip()
+
+        if response_format not in ("", COLUMNAR):
+            return jsonify({"success": False, "error": f"formatが不正です: {response_format}"}), 400
+
+        since = None
+        if updated_since:
+            try:
+                since = parse_sync_token(updated_since)
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+            # 削除記録が残っていない古いトークンは全件取得に切り替える
+            if is_sync_token_expired(since):
+                since = None
+
+        # 次回の差分取得用トークン（データ取得より前の時刻にする）
+        sync_token = current_sync_token(db)
 
         # ベースクエリ
         query = """
@@ -115,6 +267,17 @@ def get_inventory():
         """
         params = {}
 
+        changed_ids = []
+        if since is not None:
+            changed_ids = changed_consumable_ids(db, since)
+            if changed_ids:
+                id_placeholders = ",".join([f":changed{i}" for i in range(len(changed_ids))])
+                query += f" AND c.id IN ({id_placeholders})"
+                params.update({f"changed{i}": cid for i, cid in enumerate(changed_ids)})
+            else:
+                # 変更なし（列構成を保つため空の結果を取得）
+                query += " AND 1 = 0"
+
         # フィルター条件を追加
         if qr_code:
             compact_qr_code = re.sub(r"[-\s]", "", qr_code)
@@ -129,9 +292,11 @@ def get_inventory():
             params["compact_qr_code"] = compact_qr_code
             params["qr_code_prefix"] = f"{qr_code}%"
 
+        relevance_expr = None
         if search_text:
-            query += " AND c.name LIKE :search_text"
-            params["search_text"] = f"%{search_text}%"
+            search_clause, search_params, relevance_expr = build_text_search(["c.name"], search_text)
+            query += f" AND {search_clause}"
+            params.update(search_params)
 
         if order_status and order_status != "すべて":
             query += " AND c.order_status = :order_status"
@@ -141,147 +306,40 @@ def get_inventory():
             query += " AND c.shortage_status = :shortage_status"
             params["shortage_status"] = shortage_status
 
-        query += " ORDER BY c.code"
+        # 全文検索時は関連度順、それ以外はコード順
+        if relevance_expr:
+            query += f" ORDER BY {relevance_expr} DESC, c.code"
+        else:
+            query += " ORDER BY c.code"
 
-        # データ取得
-        df = db.execute_query(query, params)
+        # データ取得（DataFrameを経由せず行をそのままJSONにする）
+        items = db.fetch_all(query, params)
 
         # 全件数取得
         total_df = db.execute_query("SELECT COUNT(*) as total FROM consumables")
         total = int(total_df.iloc[0]["total"]) if not total_df.empty else 0
 
-        # 各商品の依頼中の注文情報を取得
-        if not df.empty:
-            try:
-                consumable_ids = df['id'].tolist()
-                placeholders = ','.join([f':id{i}' for i in range(len(consumable_ids))])
-                order_params = {f'id{i}': cid for i, cid in enumerate(consumable_ids)}
-
-                orders_query = f"""
-                    SELECT
-                        o.consumable_id,
-                        o.requested_date AS 依頼日,
-                        o.requester_name AS 依頼者,
-                        o.quantity AS 依頼数量,
-                        o.deadline AS 納期,
-                        o.ordered_date AS 注文日,
-                        o.status AS ステータス
-                    FROM orders o
-                    WHERE o.consumable_id IN ({placeholders})
-                    ORDER BY o.requested_date DESC
-                """
-
-                orders_df = db.execute_query(orders_query, order_params)
-
-                # 商品ごとに注文情報をグループ化
-                orders_dict = {}
-                if not orders_df.empty:
-                    for _, order in orders_df.iterrows():
-                        consumable_id = int(order['consumable_id'])
-                        if consumable_id not in orders_dict:
-                            orders_dict[consumable_id] = []
-                        orders_dict[consumable_id].append({
-                            '依頼日': _to_jst_date(order['依頼日']),
-                            '依頼者': str(order['依頼者']) if pd.notna(order['依頼者']) else None,
-                            '依頼数量': int(order['依頼数量']) if pd.notna(order['依頼数量']) else 0,
-                            '納期': str(order['納期']) if pd.notna(order['納期']) else None,
-                            '注文日': _to_jst_date(order['注文日'])
-                        })
-
-                # データフレームに注文情報を追加
-                df['依頼中注文'] = df['id'].apply(lambda x: orders_dict.get(int(x), []))
-            except Exception as e:
-                print(f"Error fetching pending orders: {e}")
-                # エラーが発生しても、空の配列を設定
-                df['依頼中注文'] = [[] for _ in range(len(df))]
-
-            # 発注済みの注文情報も取得
-            try:
-                completed_orders_query = f"""
-                    SELECT
-                        o.consumable_id,
-                        o.ordered_date AS 注文日,
-                        o.quantity AS 注文数量,
-                        o.deadline AS 納期
-                    FROM orders o
-                    WHERE o.consumable_id IN ({placeholders})
-                    AND o.status = '発注済'
-                    ORDER BY o.ordered_date DESC
-                """
-
-                completed_orders_df = db.execute_query(completed_orders_query, order_params)
-
-                # 商品ごとに発注情報をグループ化
-                completed_orders_dict = {}
-                if not completed_orders_df.empty:
-                    for _, order in completed_orders_df.iterrows():
-                        consumable_id = int(order['consumable_id'])
-                        if consumable_id not in completed_orders_dict:
-                            completed_orders_dict[consumable_id] = []
-                        completed_orders_dict[consumable_id].append({
-                            '注文日': _to_jst_date(order['注文日']),
-                            '注文数量': int(order['注文数量']) if pd.notna(order['注文数量']) else 0,
-                            '納期': str(order['納期']) if pd.notna(order['納期']) else None
-                        })
-
-                # データフレームに発注情報を追加
-                df['発注済み注文'] = df['id'].apply(lambda x: completed_orders_dict.get(int(x), []))
-            except Exception as e:
-                print(f"Error fetching completed orders: {e}")
-                # エラーが発生しても、空の配列を設定
-                df['発注済み注文'] = [[] for _ in range(len(df))]
-
-            # 入庫済み注文の入庫詳細を取得
-            try:
-                inbound_details_query = f"""
-                    SELECT
-                        ih.consumable_id,
-                        ih.inbound_date AS 入庫日,
-                        ih.quantity AS 数量,
-                        ih.employee_name AS 入庫者,
-                        ih.inbound_type AS 入庫種別
-                    FROM inbound_history ih
-                    WHERE ih.consumable_id IN ({placeholders})
-                    ORDER BY ih.inbound_date DESC
-                """
-
-                inbound_details_df = db.execute_query(inbound_details_query, order_params)
-
-                # 商品ごとに入庫詳細をグループ化
-                inbound_details_dict = {}
-                if not inbound_details_df.empty:
-                    for _, detail in inbound_details_df.iterrows():
-                        consumable_id = int(detail['consumable_id'])
-                        if consumable_id not in inbound_details_dict:
-                            inbound_details_dict[consumable_id] = []
-                        inbound_details_dict[consumable_id].append({
-                            '入庫日': _to_jst_date(detail['入庫日']),
-                            '数量': int(detail['数量']) if pd.notna(detail['数量']) else 0,
-                            '入庫者': str(detail['入庫者']) if pd.notna(detail['入庫者']) else None,
-                            '入庫種別': str(detail['入庫種別']) if pd.notna(detail['入庫種別']) else None
-                        })
-
-                # データフレームに入庫詳細を追加
-                df['入庫詳細'] = df['id'].apply(lambda x: inbound_details_dict.get(int(x), []))
-            except Exception as e:
-                print(f"Error fetching inbound details: {e}")
-                # エラーが発生しても、空の配列を設定
-                df['入庫詳細'] = [[] for _ in range(len(df))]
-        else:
-            # データフレームが空の場合も、カラムを追加
-            df['依頼中注文'] = []
-            df['発注済み注文'] = []
-            df['入庫詳細'] = []
+        # 各商品の注文依頼・発注済み注文・入庫履歴を付与
+        items = _attach_item_details(db, items)
+
+        response = {
+            "success": True,
+            "data": to_columnar(items, INVENTORY_DICTIONARY_COLUMNS) if response_format == COLUMNAR else items,
+            "format": response_format or "records",
+            "total": total,
+            "filtered": len(items),
+            "sync_token": sync_token,
+            "delta": since is not None,
+        }
+        if since is not None:
+            # 削除された品目と、変更によってフィルター条件に合わなくなった品目
+            returned_ids = {int(item["id"]) for item in items}
+            deleted_ids = set(deleted_consumable_ids(db, since))
+            deleted_ids.update(cid for cid in changed_ids if cid not in returned_ids)
+            response["deleted_ids"] = sorted(deleted_ids)
 
         # JSON形式で返す
-        return jsonify(
-            {
-                "success": True,
-                "data": df.to_dict(orient="records"),
-                "total": total,
-                "filtered": len(df),
-            }
-        )
+        return jsonify(response)
 
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -319,6 +377,7 @@ def decode_qr():
 
 
 @inventory_bp.route("/api/filter-options")
+@conditional_get(cache_control="private, max-age=3600")
 def get_filter_options():
     """フィルターの選択肢を取得するAPI"""
     try:
@@ -357,59 +416,33 @@ def create_outbound():
             return jsonify({"success": False, "error": "必須パラメータが不足しています"}), 400
 
         # 消耗品情報を取得
-        item_df = db.execute_query(
-            "SELECT id, name, stock_quantity, safety_stock, unit_price FROM consumables WHERE code = :code",
-            {"code": code},
-        )
+        item_df = db.execute_query("SELECT id FROM consumables WHERE code = :code", {"code": code})
 
         if item_df.empty:
             return jsonify({"success": False, "error": "商品が見つかりません"}), 404
 
-        item = item_df.iloc[0]
-        consumable_id = int(item["id"])
-        current_stock = int(item["stock_quantity"])
-        safety_stock = int(item["safety_stock"]) if item["safety_stock"] is not None else 0
-        unit_price = float(item["unit_price"]) if item["unit_price"] else 0
-
-        # 在庫チェック
-        if current_stock < quantity:
-            return jsonify({"success": False, "error": "在庫が不足しています"}), 400
-
-        # 出庫履歴を登録
-        total_amount = quantity * unit_price
-        db.execute_update(
-            """
-            INSERT INTO outbound_history (
-                consumable_id, code, name, quantity, employee_name, employee_department,
-                unit_price, total_amount, note, outbound_date
-            ) VALUES (
-                :consumable_id, :code, :name, :quantity, :employee_name, :employee_department,
-                :unit_price, :total_amount, :note, NOW()
-            )
-            """,
-            {
-                "consumable_id": consumable_id,
-                "code": code,
-                "name": item["name"],
-                "quantity": quantity,
-                "employee_name": person,
-                "employee_department": data.get("department", ""),
-                "unit_price": unit_price,
-                "total_amount": total_amount,
-                "note": data.get("note", ""),
-            },
+        # 出庫履歴・在庫移動台帳・在庫数を1トランザクションで更新
+        movement = record_movement(
+            db,
+            movement_type=MOVEMENT_OUTBOUND,
+            consumable_id=int(item_df.iloc[0]["id"]),
+            quantity=quantity,
+            employee_name=person,
+            employee_department=data.get("department", ""),
+            note=data.get("note", ""),
         )
 
-        # 在庫数を減らす
-        new_stock = current_stock - quantity
-        new_status = calculate_shortage_status(new_stock, safety_stock)
-        db.execute_update(
-            "UPDATE consumables SET stock_quantity = :stock, shortage_status = :status WHERE id = :id",
-            {"stock": new_stock, "status": new_status, "id": consumable_id},
-        )
-
-        return jsonify({"success": True, "message": "出庫を記録しました", "new_stock": new_stock})
+        return jsonify({
+            "success": True,
+            "message": "出庫を記録しました",
+            "code": movement["code"],
+            "new_stock": movement["new_stock"],
+            "shortage_status": movement["shortage_status"],
+            "order_status": movement["order_status"],
+        })
 
+    except MovementError as e:
+        return jsonify({"success": False, "error": str(e)}), e.status_code
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -430,55 +463,284 @@ def create_inbound():
             return jsonify({"success": False, "error": "必須パラメータが不足しています"}), 400
 
         # 消耗品情報を取得
-        item_df = db.execute_query(
-            "SELECT id, name, stock_quantity, safety_stock, unit_price FROM consumables WHERE code = :code",
-            {"code": code},
-        )
+        item_df = db.execute_query("SELECT id FROM consumables WHERE code = :code", {"code": code})
 
         if item_df.empty:
             return jsonify({"success": False, "error": "商品が見つかりません"}), 404
 
-        item = item_df.iloc[0]
-        consumable_id = int(item["id"])
-        current_stock = int(item["stock_quantity"])
-        safety_stock = int(item["safety_stock"]) if item["safety_stock"] is not None else 0
-        unit_price = float(item["unit_price"]) if item["unit_price"] else 0
+        # 入庫履歴・在庫移動台帳を登録し、在庫数を増やして注文状態を「入庫済み」に更新
+        movement = record_movement(
+            db,
+            movement_type=MOVEMENT_INBOUND,
+            consumable_id=int(item_df.iloc[0]["id"]),
+            quantity=quantity,
+            employee_name=person,
+            employee_department=data.get("department", ""),
+            note=data.get("note", ""),
+            inbound_type=data.get("inbound_type", "手動"),
+            order_status="入庫済み",
+        )
 
-        # 入庫履歴を登録
-        total_amount = quantity * unit_price
-        db.execute_update(
-            """
-            INSERT INTO inbound_history (
-                consumable_id, code, name, quantity, employee_name, employee_department,
-                unit_price, total_amount, note, inbound_type, inbound_date
-            ) VALUES (
-                :consumable_id, :code, :name, :quantity, :employee_name, :employee_department,
-                :unit_price, :total_amount, :note, :inbound_type, NOW()
-            )
-            """,
+        return jsonify({
+            "success": True,
+            "message": "入庫を記録しました",
+            "code": movement["code"],
+            "new_stock": movement["new_stock"],
+            "shortage_status": movement["shortage_status"],
+            "order_status": movement["order_status"],
+        })
+
+    except MovementError as e:
+        return jsonify({"success": False, "error": str(e)}), e.status_code
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+def _resolve_consumables(db, codes: list[str]) -> dict[str, dict]:
+    """消耗品コードを1回のクエリで消耗品（id・code・stock_quantity）に変換する（キーは casefold したコード）"""
+    codes = list(dict.fromkeys(code for code in codes if code))
+    if not codes:
+        return {}
+    placeholders = ",".join([f":code{i}" for i in range(len(codes))])
+    rows = db.fetch_all(
+        f"SELECT id, code, stock_quantity FROM consumables WHERE code IN ({placeholders})",
+        {f"code{i}": code for i, code in enumerate(codes)},
+    )
+    return {str(row["code"]).casefold(): row for row in rows}
+
+
+def _build_batch_movement(entry: dict, consumables: dict[str, dict]) -> tuple[dict | None, str | None]:
+    """まとめて送信された1件を record_movement_batch の引数に変換する（不正な場合はエラーメッセージを返す）"""
+    movement_type = entry.get("type")
+    if movement_type not in MOVEMENT_TYPE_LABELS:
+        return None, f"不正な移動種別です: {movement_type}"
+
+    code = normalize_qr_code_value(str(entry.get("code") or ""))
+    person = str(entry.get("person") or "").strip()
+    department = str(entry.get("department") or "").strip()
+    inbound_type = str(entry.get("inbound_type") or "手動")
+    if not code or not person or not entry.get("quantity"):
+        return None, "必須パラメータが不足しています"
+    # 履歴テーブルの桁数（employee_name / employee_department は VARCHAR(100)、inbound_type は VARCHAR(20)）
+    if len(person) > 100 or len(department) > 100:
+        return None, "担当者名・部署は100文字以内で指定してください"
+    if len(inbound_type) > 20:
+        return None, "入庫種別は20文字以内で指定してください"
+    try:
+        quantity = int(entry["quantity"])
+    except (TypeError, ValueError):
+        return None, "数量は1以上で指定してください"
+    if quantity <= 0:
+        return None, "数量は1以上で指定してください"
+
+    consumable = consumables.get(code.casefold())
+    if consumable is None:
+        return None, f"商品が見つかりません: {code}"
+
+    movement = {
+        "client_id": entry.get("client_id"),
+        "movement_type": movement_type,
+        "consumable_id": int(consumable["id"]),
+        "quantity": quantity,
+        "employee_name": person,
+        "employee_department": department,
+        "note": str(entry.get("note") or ""),
+    }
+    if movement_type == MOVEMENT_INBOUND:
+        # /api/inbound と同じく注文状態を「入庫済み」に更新
+        movement["inbound_type"] = inbound_type
+        movement["order_status"] = "入庫済み"
+    return movement, None
+
+
+def _batch_result(result: dict) -> dict:
+    """record_movement_batch の結果を /api/outbound・/api/inbound と同じ項目名で返す"""
+    response = {"status": result["status"], "success": result["status"] in ("applied", "duplicate")}
+    if result.get("client_id"):
+        response["client_id"] = result["client_id"]
+    if result["status"] == "applied":
+        response.update(
             {
-                "consumable_id": consumable_id,
-                "code": code,
-                "name": item["name"],
-                "quantity": quantity,
-                "employee_name": person,
-                "employee_department": data.get("department", ""),
-                "unit_price": unit_price,
-                "total_amount": total_amount,
-                "note": data.get("note", ""),
-                "inbound_type": data.get("inbound_type", "手動"),
-            },
+                "code": result["code"],
+                "new_stock": result["new_stock"],
+                "shortage_status": result["shortage_status"],
+                "order_status": result["order_status"],
+            }
         )
+    elif result["status"] == "duplicate":
+        # 記録済み（再送）の場合は記録した時点の在庫数を返す
+        response.update({"code": result["code"], "new_stock": result["stock_after"]})
+    elif result["status"] == "cancelled":
+        response["error"] = "他の明細を記録できないため記録しませんでした"
+    else:
+        response["error"] = result["error"]
+    return response
+
+
+@inventory_bp.route("/api/movements/batch", methods=["POST"])
+def create_movement_batch():
+    """
+    端末に貯めた入出庫をまとめて記録するAPI（出庫・入庫画面の送信待ちの同期）
+
+    リクエスト（JSON）:
+        movements: 入出庫のリスト。各要素は client_id（端末で採番した一意のID）・
+                   type（inbound / outbound）・code・quantity・person・department・note
+
+    1つのトランザクションで記録し、入出庫ごとの結果（applied / duplicate / error）を送信順に返す。
+    記録済みの client_id は記録し直さずに duplicate を返すため、通信が途切れた場合はそのまま再送できる。
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        entries = data.get("movements")
+        if not isinstance(entries, list) or not entries:
+            return jsonify({"success": False, "error": "movements を指定してください"}), 400
+        if len(entries) > MOVEMENT_BATCH_MAX_ITEMS:
+            return jsonify(
+                {"success": False, "error": f"1回に送信できる入出庫は{MOVEMENT_BATCH_MAX_ITEMS}件までです"}
+            ), 400
+        for entry in entries:
+            client_id = entry.get("client_id") if isinstance(entry, dict) else None
+            if not isinstance(client_id, str) or not 0 < len(client_id) <= 64:
+                return jsonify({"success": False, "error": "client_id（64文字以内）を指定してください"}), 400
 
-        # 在庫数を増やし、注文状態を「入庫済み」に更新
-        new_stock = current_stock + quantity
-        new_status = calculate_shortage_status(new_stock, safety_stock)
-        db.execute_update(
-            "UPDATE consumables SET stock_quantity = :stock, shortage_status = :status, order_status = :order_status WHERE id = :id",
-            {"stock": new_stock, "status": new_status, "order_status": "入庫済み", "id": consumable_id},
+        db = get_db_manager()
+        consumables = _resolve_consumables(
+            db, [normalize_qr_code_value(str(entry.get("code") or "")) for entry in entries]
         )
 
-        return jsonify({"success": True, "message": "入庫を記録しました", "new_stock": new_stock})
+        results: list[dict | None] = [None] * len(entries)
+        movements, positions = [], []
+        for index, entry in enumerate(entries):
+            movement, error = _build_batch_movement(entry, consumables)
+            if error:
+                results[index] = {"client_id": entry["client_id"], "status": "error", "error": error}
+            else:
+                movements.append(movement)
+                positions.append(index)
+
+        if movements:
+            for index, result in zip(positions, record_movement_batch(db, movements)):
+                results[index] = result
+
+        statuses = [result["status"] for result in results]
+        return jsonify({
+            "success": True,
+            "results": [_batch_result(result) for result in results],
+            "applied": statuses.count("applied"),
+            "duplicates": statuses.count("duplicate"),
+            "failed": statuses.count("error"),
+        })
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+def _cart_response(entries: list[dict], results: list[dict], error: str | None = None):
+    """
+    カートの明細ごとの結果を明細の順に返す（error を指定した場合はすべて取り消した結果として 409 を返す）
+
+    applied・failed・cancelled の件数の合計は明細の件数になる。
+    """
+    lines = []
+    for number, (entry, result) in enumerate(zip(entries, results), start=1):
+        line = {"line": number, "code": entry["code"]}
+        line.update(_batch_result(result))
+        lines.append(line)
+
+    body = {
+        "success": error is None,
+        "results": lines,
+        "applied": sum(result["status"] == "applied" for result in results),
+        "failed": sum(result["status"] == "error" for result in results),
+        "cancelled": sum(result["status"] == "cancelled" for result in results),
+    }
+    if error:
+        body["error"] = error
+        return jsonify(body), 409
+    return jsonify(body)
+
+
+@inventory_bp.route("/api/movements/cart", methods=["POST"])
+def create_movement_cart():
+    """
+    1人分の複数品目の出庫・入庫をまとめて記録するAPI（カート）
+
+    リクエスト（JSON）:
+        type: outbound / inbound
+        person / department / note: 出庫者（入庫者）・部署・備考（明細に note があれば明細の備考を使う）
+        lines: 明細のリスト（code・quantity・note）
+        mode: all（既定、1件でも記録できなければすべて記録しない） / partial（記録できる明細だけ記録する）
+
+    コードは1回のクエリで消耗品に変換し、出庫は同じ品目の明細を合計して在庫数を先に確認する。
+    記録は1つのトランザクションで行い、明細ごとの結果を明細の順に返す。
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        movement_type = data.get("type")
+        mode = data.get("mode") or "all"
+        lines = data.get("lines")
+        person = str(data.get("person") or "").strip()
+
+        if movement_type not in MOVEMENT_TYPE_LABELS:
+            return jsonify({"success": False, "error": f"不正な移動種別です: {movement_type}"}), 400
+        if mode not in ("all", "partial"):
+            return jsonify({"success": False, "error": "mode は all または partial を指定してください"}), 400
+        if not isinstance(lines, list) or not lines or not person:
+            return jsonify({"success": False, "error": "必須パラメータが不足しています"}), 400
+        if not all(isinstance(line, dict) for line in lines):
+            return jsonify({"success": False, "error": "lines の各明細は code・quantity で指定してください"}), 400
+        if len(lines) > MOVEMENT_BATCH_MAX_ITEMS:
+            return jsonify(
+                {"success": False, "error": f"1回に記録できる明細は{MOVEMENT_BATCH_MAX_ITEMS}件までです"}
+            ), 400
+
+        entries = [
+            {
+                "type": movement_type,
+                "code": normalize_qr_code_value(str(line.get("code") or "")),
+                "quantity": line.get("quantity"),
+                "person": person,
+                "department": data.get("department", ""),
+                "note": line.get("note") or data.get("note", ""),
+                "inbound_type": data.get("inbound_type"),
+            }
+            for line in lines
+        ]
+        db = get_db_manager()
+        consumables = _resolve_consumables(db, [entry["code"] for entry in entries])
+
+        # 明細を検証する（在庫数はトランザクション内でロックしてから確定する）
+        remaining_stock = {int(row["id"]): int(row["stock_quantity"] or 0) for row in consumables.values()}
+        results: list[dict | None] = [None] * len(entries)
+        movements, positions = [], []
+        for index, entry in enumerate(entries):
+            movement, error = _build_batch_movement(entry, consumables)
+            if movement and movement_type == MOVEMENT_OUTBOUND:
+                consumable_id = movement["consumable_id"]
+                if movement["quantity"] > remaining_stock[consumable_id]:
+                    error = f"在庫が不足しています（在庫 {remaining_stock[consumable_id]}）"
+                else:
+                    remaining_stock[consumable_id] -= movement["quantity"]
+            if error:
+                results[index] = {"status": "error", "error": error}
+            else:
+                movements.append(movement)
+                positions.append(index)
+
+        if mode == "all" and len(movements) < len(entries):
+            results = [result or {"status": "cancelled"} for result in results]
+            return _cart_response(entries, results, "記録できない明細があるため、すべての明細を記録しませんでした")
+
+        # mode=all の場合はここまで来た時点ですべての明細が movements に入っている（結果は明細の順）
+        if movements:
+            try:
+                recorded = record_movement_batch(db, movements, all_or_nothing=mode == "all")
+            except MovementBatchError as e:
+                return _cart_response(entries, e.results, str(e))
+            for index, result in zip(positions, recorded):
+                results[index] = result
+
+        return _cart_response(entries, results)
 
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -525,52 +787,20 @@ def create_dispatch_inbound():
                 quantity = int(item["quantity"])
                 unit_price = float(item["unit_price"]) if item["unit_price"] else 0
 
-                # 消耗品の現在情報を取得
-                consumable_df = db.execute_query(
-                    "SELECT stock_quantity, safety_stock FROM consumables WHERE id = :id",
-                    {"id": consumable_id}
-                )
-
-                if consumable_df.empty:
-                    errors.append(f"{name}({code}): 商品が見つかりません")
-                    continue
-
-                consumable = consumable_df.iloc[0]
-                current_stock = int(consumable["stock_quantity"])
-                safety_stock = int(consumable["safety_stock"]) if consumable["safety_stock"] is not None else 0
-
-                # 入庫履歴を登録
-                total_amount = quantity * unit_price
-                db.execute_update(
-                    """
-                    INSERT INTO inbound_history (
-                        consumable_id, code, name, quantity, employee_name, employee_department,
-                        unit_price, total_amount, note, inbound_type, inbound_date
-                    ) VALUES (
-                        :consumable_id, :code, :name, :quantity, :employee_name, :employee_department,
-                        :unit_price, :total_amount, :note, :inbound_type, NOW()
-                    )
-                    """,
-                    {
-                        "consumable_id": consumable_id,
-                        "code": code,
-                        "name": name,
-                        "quantity": quantity,
-                        "employee_name": person,
-                        "employee_department": data.get("department", ""),
-                        "unit_price": unit_price,
-                        "total_amount": total_amount,
-                        "note": data.get("note", f"注文書一括入庫（注文書ID: {dispatch_order_id}）"),
-                        "inbound_type": "注文書",
-                    }
-                )
-
-                # 在庫数を増やし、注文状態を「入庫済み」に更新
-                new_stock = current_stock + quantity
-                new_status = calculate_shortage_status(new_stock, safety_stock)
-                db.execute_update(
-                    "UPDATE consumables SET stock_quantity = :stock, shortage_status = :status, order_status = :order_status WHERE id = :id",
-                    {"stock": new_stock, "status": new_status, "order_status": "入庫済み", "id": consumable_id}
+                # 入庫履歴・在庫移動台帳を登録し、在庫数を増やして注文状態を「入庫済み」に更新
+                record_movement(
+                    db,
+                    movement_type=MOVEMENT_INBOUND,
+                    consumable_id=consumable_id,
+                    quantity=quantity,
+                    employee_name=person,
+                    employee_department=data.get("department", ""),
+                    note=data.get("note", f"注文書一括入庫（注文書ID: {dispatch_order_id}）"),
+                    code=code,
+                    name=name,
+                    unit_price=unit_price,
+                    inbound_type="注文書",
+                    order_status="入庫済み",
                 )
 
                 inbound_count += 1
@@ -608,6 +838,7 @@ def create_dispatch_inbound():
             """,
             {"order_id": dispatch_order_id}
         )
+        publish_dispatch_order_changed(db, int(dispatch_order_id))
 
         message = f"{inbound_count}件の商品を入庫しました"
         if errors:
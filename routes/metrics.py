@@ -0,0 +1,80 @@
+"""
+計測値（Prometheus形式）・SQLプロファイルAPIルート
+"""
+from __future__ import annotations
+
+import hmac
+import ipaddress
+from functools import lru_cache
+
+from flask import Blueprint, Response, jsonify, request
+
+import config
+from utils import query_profiler
+from utils.metrics import render_metrics
+from utils.permission_utils import require_page_permission
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@lru_cache(maxsize=4)
+def _allowed_networks(value: str) -> tuple:
+    return tuple(ipaddress.ip_network(item.strip(), strict=False) for item in value.split(",") if item.strip())
+
+
+def _metrics_allowed() -> bool:
+    """METRICS_TOKEN のトークンを付けたリクエストか、METRICS_ALLOWED_IPS からのリクエストだけを許可する"""
+    if config.METRICS_TOKEN:
+        expected = f"Bearer {config.METRICS_TOKEN}"
+        if hmac.compare_digest(request.headers.get("Authorization", ""), expected):
+            return True
+
+    # リバースプロキシ経由の場合はプロキシのアドレスになる（プロキシ側で /metrics を公開しない）
+    try:
+        address = ipaddress.ip_address(request.remote_addr or "")
+    except ValueError:
+        return False
+    address = getattr(address, "ipv4_mapped", None) or address
+    return any(address in network for network in _allowed_networks(config.METRICS_ALLOWED_IPS))
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    """リクエスト時間・SQL件数・PDF/QR/SMTP処理時間を返すAPI（全ワーカーの合計）"""
+    if not _metrics_allowed():
+        return jsonify({"success": False, "error": "認証が必要です"}), 401
+
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+
+@metrics_bp.route("/api/admin/query-profile", methods=["GET"])
+@require_page_permission("ユーザー管理", "edit")
+def get_query_profile():
+    """
+    SQLのフィンガープリント別の集計（件数・合計・p95・最大）とスロークエリを返すAPI
+
+    クエリパラメータ:
+        scope: all（既定: 書き出し済みの全ワーカー + このワーカー） / worker（このワーカーのみ）
+        sort: total_ms（既定） / count / p95_ms / max_ms / avg_ms
+        top: 返すフィンガープリントの件数（既定50）
+    """
+    try:
+        if not config.QUERY_PROFILER_ENABLED:
+            return jsonify({"success": False, "error": "QUERY_PROFILER_ENABLED が無効です"}), 400
+
+        scope = request.args.get("scope", "all")
+        sort = request.args.get("sort", "total_ms")
+        if scope not in {"all", "worker"} or sort not in {"total_ms", "count", "p95_ms", "max_ms", "avg_ms"}:
+            return jsonify({"success": False, "error": "scope または sort の値が不正です"}), 400
+        top = request.args.get("top", 50, type=int)
+
+        snapshots = [query_profiler.snapshot()]
+        if scope == "all":
+            # このワーカーの最新の集計も書き出し、CLI のレポートと揃える
+            query_profiler.dump_report()
+            snapshots.extend(query_profiler.load_snapshots())
+
+        report = query_profiler.build_report(snapshots, sort=sort, top=top)
+        return jsonify({"success": True, "scope": scope, **report})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
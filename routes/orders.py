@@ -5,10 +5,15 @@ from __future__ import annotations
 
 import base64
 
+import pandas as pd
 from flask import Blueprint, jsonify, request, make_response
 
 from database_manager import get_db_manager
-from utils.pdf_utils import fetch_orders_for_pdf, render_order_pdf, persist_order_pdf
+from utils.change_events import publish_consumable_order_status
+from utils.date_utils import build_date_range_clause
+from utils.forecast_utils import suggest_order_quantity
+from utils.search_utils import build_text_search
+from utils.sync_utils import record_deletion
 from utils.email_utils import send_order_email
 
 orders_bp = Blueprint("orders", __name__)
@@ -88,6 +93,7 @@ def create_order():
             "UPDATE consumables SET order_status = :status WHERE id = :cid",
             {"status": "依頼中", "cid": consumable_id},
         )
+        publish_consumable_order_status(db, [consumable_id])
 
         return jsonify({"success": True, "message": "注文依頼を記録しました"})
 
@@ -151,16 +157,16 @@ def get_orders():
             params["requester"] = f"%{requester}%"
 
         if search_text:
-            query += " AND (o.code LIKE :search_text OR o.name LIKE :search_text)"
-            params["search_text"] = f"%{search_text}%"
+            search_clause, search_params, _ = build_text_search(["o.code", "o.name"], search_text)
+            query += f" AND {search_clause}"
+            params.update(search_params)
 
-        if date_from:
-            query += " AND DATE(o.requested_date) >= :date_from"
-            params["date_from"] = date_from
-
-        if date_to:
-            query += " AND DATE(o.requested_date) <= :date_to"
-            params["date_to"] = date_to
+        try:
+            date_clause, date_params = build_date_range_clause("o.requested_date", date_from, date_to)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        query += date_clause
+        params.update(date_params)
 
         allowed_sort_columns = ["requested_date", "status", "supplier_name", "requester_name", "total_amount"]
         if sort_by in allowed_sort_columns:
@@ -169,12 +175,12 @@ def get_orders():
         else:
             query += " ORDER BY o.requested_date DESC"
 
-        df = db.execute_query(query, params)
+        rows = db.fetch_all(query, params)
 
         return jsonify({
             "success": True,
-            "data": df.to_dict(orient="records"),
-            "count": len(df)
+            "data": rows,
+            "count": len(rows)
         })
 
     except Exception as e:
@@ -260,6 +266,8 @@ def update_order_status(order_id):
                 "UPDATE consumables SET order_status = '未発注' WHERE id = :id",
                 {"id": consumable_id},
             )
+        if new_status in ("発注済", "完了"):
+            publish_consumable_order_status(db, [consumable_id])
 
         return jsonify({"success": True, "message": "ステータスを更新しました"})
 
@@ -286,10 +294,12 @@ def delete_order(order_id):
         )
 
         consumable_id = int(existing.iloc[0]["consumable_id"])
+        record_deletion(db, "orders", order_id, consumable_id)
         db.execute_update(
             "UPDATE consumables SET order_status = '未発注' WHERE id = :id",
             {"id": consumable_id},
         )
+        publish_consumable_order_status(db, [consumable_id])
 
         return jsonify({"success": True, "message": "注文依頼を削除しました"})
 
@@ -299,32 +309,36 @@ def delete_order(order_id):
 
 @orders_bp.route("/api/check-low-stock")
 def check_low_stock():
-    """安全在庫を下回る商品をチェックするAPI"""
+    """発注点（消費予測がなければ安全在庫）を下回る商品をチェックするAPI"""
     try:
         db = get_db_manager()
 
         query = """
             SELECT
-                id,
-                code,
-                name,
-                stock_quantity,
-                safety_stock,
-                unit,
-                order_unit,
-                supplier_id
-            FROM consumables
-            WHERE stock_quantity <= safety_stock
-            AND order_status != '発注済'
-            ORDER BY (stock_quantity - safety_stock) ASC
+                c.id,
+                c.code,
+                c.name,
+                c.stock_quantity,
+                c.safety_stock,
+                c.unit,
+                c.order_unit,
+                c.supplier_id,
+                COALESCE(f.reorder_point, c.safety_stock) AS reorder_point,
+                f.daily_rate,
+                f.days_of_stock
+            FROM consumables c
+            LEFT JOIN consumable_forecasts f ON f.consumable_id = c.id
+            WHERE c.needs_reorder = 1
+            AND c.order_status != '発注済'
+            ORDER BY (c.stock_quantity - COALESCE(f.reorder_point, c.safety_stock)) ASC
         """
 
-        df = db.execute_query(query)
+        rows = db.fetch_all(query)
 
         return jsonify({
             "success": True,
-            "data": df.to_dict(orient="records"),
-            "count": len(df)
+            "data": rows,
+            "count": len(rows)
         })
 
     except Exception as e:
@@ -333,7 +347,7 @@ def check_low_stock():
 
 @orders_bp.route("/api/auto-create-orders", methods=["POST"])
 def auto_create_orders():
-    """安全在庫を下回る商品に対して自動で注文依頼を作成するAPI"""
+    """発注点を下回る商品に対して自動で注文依頼を作成するAPI"""
     try:
         data = request.get_json()
         requester = data.get("requester", "システム自動")
@@ -350,9 +364,12 @@ def auto_create_orders():
                 c.unit,
                 c.unit_price,
                 c.order_unit,
-                c.supplier_id
+                c.supplier_id,
+                f.reorder_point,
+                f.daily_rate
             FROM consumables c
-            WHERE c.stock_quantity <= c.safety_stock
+            LEFT JOIN consumable_forecasts f ON f.consumable_id = c.id
+            WHERE c.needs_reorder = 1
             AND c.order_status != '発注済'
         """
 
@@ -363,9 +380,10 @@ def auto_create_orders():
 
         created_count = 0
         for _, item in df.iterrows():
-            order_quantity = max(
-                int(item["order_unit"]),
-                int((item["safety_stock"] * 2 - item["stock_quantity"]) / item["order_unit"] + 1) * int(item["order_unit"])
+            reorder_point = int(item["reorder_point"]) if pd.notna(item["reorder_point"]) else None
+            daily_rate = float(item["daily_rate"]) if pd.notna(item["daily_rate"]) else None
+            order_quantity = suggest_order_quantity(
+                item["stock_quantity"], item["safety_stock"], item["order_unit"], reorder_point, daily_rate
             )
             total_amount = order_quantity * float(item["unit_price"]) if item["unit_price"] else 0
 
@@ -392,7 +410,10 @@ def auto_create_orders():
                     "deadline": "通常",
                     "requester_name": requester,
                     "supplier_id": item["supplier_id"],
-                    "note": f"自動発注依頼（在庫: {item['stock_quantity']}, 安全在庫: {item['safety_stock']}）",
+                    "note": (
+                        f"自動発注依頼（在庫: {item['stock_quantity']}, "
+                        f"発注点: {reorder_point if reorder_point is not None else item['safety_stock']}）"
+                    ),
                     "status": "依頼中",
                     "order_type": "自動",
                 },
@@ -405,6 +426,8 @@ def auto_create_orders():
 
             created_count += 1
 
+        publish_consumable_order_status(db, df["id"].tolist())
+
         return jsonify({
             "success": True,
             "message": f"{created_count}件の自動発注依頼を作成しました",
@@ -418,6 +441,9 @@ def auto_create_orders():
 @orders_bp.route("/api/generate-order-pdf", methods=["GET", "POST"])
 def generate_order_pdf():
     """注文書PDFを生成するAPI（ReportLab使用）"""
+    # ReportLab は読み込みに時間がかかるため、PDF作成時に読み込む
+    from utils.pdf_utils import fetch_orders_for_pdf, render_order_pdf, persist_order_pdf
+
     try:
         db = get_db_manager()
         payload = request.get_json(silent=True) or {} if request.method == "POST" else {}
@@ -465,6 +491,8 @@ def generate_order_pdf():
 @orders_bp.route("/api/orders/dispatch", methods=["POST"])
 def dispatch_orders():
     """注文書PDFの生成・保存・メール送信までを一括実行"""
+    from utils.pdf_utils import fetch_orders_for_pdf, render_order_pdf, persist_order_pdf
+
     try:
         payload = request.get_json() or {}
         order_ids = payload.get("order_ids", [])
@@ -510,6 +538,7 @@ def dispatch_orders():
                 "UPDATE consumables SET order_status = :status WHERE id = :cid",
                 {"status": consumable_status, "cid": consumable_id},
             )
+        publish_consumable_order_status(db, consumable_ids)
 
         email_payload = payload.get("email")
         email_sent = False
@@ -0,0 +1,130 @@
+"""
+集計レポートAPIルート
+"""
+from __future__ import annotations
+
+from flask import Blueprint, jsonify, request
+
+from database_manager import get_db_manager
+from utils.date_utils import parse_date
+from utils.movement_utils import MOVEMENT_INBOUND, MOVEMENT_OUTBOUND
+
+reports_bp = Blueprint("reports", __name__)
+
+# 期間ごとの集計キー（consumption_daily.stat_date はJST日付）
+PERIOD_FORMATS = {
+    "day": "%Y-%m-%d",
+    "month": "%Y-%m",
+    "year": "%Y",
+}
+
+# group_by ごとの (集計キー, 表示名) のSQL式
+GROUP_BY_COLUMNS = {
+    "department": ("cd.department", "cd.department"),
+    "category": ("COALESCE(c.category, '')", "COALESCE(c.category, '')"),
+    "supplier": ("COALESCE(c.supplier_id, 0)", "COALESCE(s.name, '')"),
+    "consumable": ("cd.consumable_id", "c.name"),
+}
+
+MOVEMENT_TYPES = {"outbound": MOVEMENT_OUTBOUND, "inbound": MOVEMENT_INBOUND}
+
+
+@reports_bp.route("/api/reports/consumption", methods=["GET"])
+def get_consumption_report():
+    """日次集計から入出庫の数量・金額を集計するAPI"""
+    try:
+        db = get_db_manager()
+
+        group_by = request.args.get("group_by", "period")  # period, department, category, supplier, consumable
+        period = request.args.get("period", "month")  # day, month, year
+        movement_type = request.args.get("type", "outbound")  # outbound, inbound, all
+        department = request.args.get("department", "")
+        category = request.args.get("category", "")
+        supplier_id = request.args.get("supplier_id", "")
+        if supplier_id and not supplier_id.isdigit():
+            return jsonify({"success": False, "error": "supplier_idは数値で指定してください"}), 400
+
+        if group_by == "period":
+            if period not in PERIOD_FORMATS:
+                return jsonify({"success": False, "error": f"不正な期間です: {period}"}), 400
+            key_expr = f"DATE_FORMAT(cd.stat_date, '{PERIOD_FORMATS[period]}')"
+            label_expr = key_expr
+            order_by = "group_key"
+        elif group_by in GROUP_BY_COLUMNS:
+            key_expr, label_expr = GROUP_BY_COLUMNS[group_by]
+            order_by = "quantity DESC"
+        else:
+            return jsonify({"success": False, "error": f"不正な集計単位です: {group_by}"}), 400
+
+        try:
+            start_date = parse_date(request.args.get("start_date", ""))
+            end_date = parse_date(request.args.get("end_date", ""))
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        query = f"""
+            SELECT
+                {key_expr} AS group_key,
+                MAX({label_expr}) AS label,
+                SUM(cd.quantity) AS quantity,
+                SUM(cd.amount) AS amount,
+                SUM(cd.movement_count) AS movement_count
+            FROM consumption_daily cd
+            JOIN consumables c ON cd.consumable_id = c.id
+            LEFT JOIN suppliers s ON c.supplier_id = s.id
+            WHERE 1=1
+        """
+        params = {}
+
+        if movement_type in MOVEMENT_TYPES:
+            query += " AND cd.movement_type = :movement_type"
+            params["movement_type"] = MOVEMENT_TYPES[movement_type]
+        elif movement_type != "all":
+            return jsonify({"success": False, "error": f"不正な種別です: {movement_type}"}), 400
+
+        if start_date:
+            query += " AND cd.stat_date >= :start_date"
+            params["start_date"] = start_date
+
+        if end_date:
+            query += " AND cd.stat_date <= :end_date"
+            params["end_date"] = end_date
+
+        if department:
+            query += " AND cd.department = :department"
+            params["department"] = department
+
+        if category:
+            query += " AND c.category = :category"
+            params["category"] = category
+
+        if supplier_id:
+            query += " AND c.supplier_id = :supplier_id"
+            params["supplier_id"] = int(supplier_id)
+
+        query += f" GROUP BY group_key ORDER BY {order_by}"
+
+        df = db.execute_query(query, params)
+
+        # 購入先・消耗品はID、それ以外は文字列をキーとする
+        key_type = int if group_by in ("supplier", "consumable") else str
+        data = []
+        for _, row in df.iterrows():
+            data.append({
+                "key": key_type(row["group_key"]),
+                "label": row["label"] if row["label"] is not None else "",
+                "quantity": int(row["quantity"] or 0),
+                "amount": float(row["amount"] or 0),
+                "count": int(row["movement_count"] or 0),
+            })
+
+        return jsonify({
+            "success": True,
+            "group_by": group_by,
+            "period": period if group_by == "period" else None,
+            "data": data,
+            "total_quantity": sum(item["quantity"] for item in data),
+            "total_amount": sum(item["amount"] for item in data),
+        })
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
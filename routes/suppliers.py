@@ -8,7 +8,11 @@ import io
 import pandas as pd
 from flask import Blueprint, jsonify, request
 
+import config
 from database_manager import get_db_manager
+from utils import cache
+from utils.csv_utils import parse_int
+from utils.http_cache import conditional_get, current_resource_version
 
 suppliers_bp = Blueprint("suppliers", __name__)
 
@@ -60,12 +64,20 @@ def _normalize_cell(value) -> str:
 
 
 @suppliers_bp.route("/api/suppliers")
+@conditional_get(("suppliers", "updated_at", True))
 def get_suppliers():
     """購入先一覧を取得するAPI"""
     try:
         db = get_db_manager()
-        df = db.execute_query("SELECT id, name, contact_person, phone, email, address, note FROM suppliers ORDER BY name")
-        return jsonify({"success": True, "data": df.to_dict(orient="records")})
+        data = cache.cached(
+            cache.SUPPLIERS,
+            "list",
+            lambda: db.execute_query(
+                "SELECT id, name, contact_person, phone, email, address, lead_time_days, note FROM suppliers ORDER BY name"
+            ).to_dict(orient="records"),
+            version=current_resource_version(),
+        )
+        return jsonify({"success": True, "data": data})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -76,7 +88,7 @@ def get_supplier(supplier_id):
     try:
         db = get_db_manager()
         df = db.execute_query(
-            "SELECT id, name, contact_person, phone, email, address, note FROM suppliers WHERE id = %s",
+            "SELECT id, name, contact_person, phone, email, address, lead_time_days, note FROM suppliers WHERE id = %s",
             (supplier_id,)
         )
         if df.empty:
@@ -111,18 +123,20 @@ def add_supplier():
 
         db = get_db_manager()
         db.execute_update(
-            """INSERT INTO suppliers (name, contact_person, phone, email, address, note)
-               VALUES (%s, %s, %s, %s, %s, %s)""",
+            """INSERT INTO suppliers (name, contact_person, phone, email, address, lead_time_days, note)
+               VALUES (%s, %s, %s, %s, %s, %s, %s)""",
             (
                 name,
                 data.get("contact_person", ""),
                 data.get("phone", ""),
                 data.get("email", ""),
                 data.get("address", ""),
+                parse_int(data.get("lead_time_days"), config.DEFAULT_LEAD_TIME_DAYS),
                 data.get("note", "")
             )
         )
 
+        cache.invalidate(cache.SUPPLIERS)
         return jsonify({"success": True, "message": "購入先を登録しました"})
     except Exception as e:
         import traceback
@@ -153,7 +167,8 @@ def update_supplier(supplier_id):
         # 更新実行
         db.execute_update(
             """UPDATE suppliers
-               SET name = %s, contact_person = %s, phone = %s, email = %s, address = %s, note = %s
+               SET name = %s, contact_person = %s, phone = %s, email = %s, address = %s,
+                   lead_time_days = COALESCE(%s, lead_time_days), note = %s
                WHERE id = %s""",
             (
                 name,
@@ -161,11 +176,13 @@ def update_supplier(supplier_id):
                 data.get("phone", ""),
                 data.get("email", ""),
                 data.get("address", ""),
+                parse_int(data.get("lead_time_days"), None),
                 data.get("note", ""),
                 supplier_id
             )
         )
 
+        cache.invalidate(cache.SUPPLIERS)
         return jsonify({"success": True, "message": "購入先を更新しました"})
     except Exception as e:
         import traceback
@@ -196,6 +213,7 @@ def delete_supplier(supplier_id):
         # 削除実行
         db.execute_update("DELETE FROM suppliers WHERE id = %s", (supplier_id,))
 
+        cache.invalidate(cache.SUPPLIERS)
         return jsonify({"success": True, "message": "購入先を削除しました"})
     except Exception as e:
         import traceback
@@ -286,6 +304,9 @@ def import_suppliers_csv():
                 row_errors.append(f"行{index + 2}: {str(exc)}")
                 skipped += 1
 
+        if inserted:
+            cache.invalidate(cache.SUPPLIERS)
+
         return jsonify(
             {
                 "success": True,
@@ -8,6 +8,7 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 
 from database_manager import get_db_manager
+from utils.http_cache import conditional_get
 
 users_bp = Blueprint("users", __name__)
 
@@ -60,18 +61,9 @@ def list_users():
             GROUP BY u.id, u.username, u.full_name, u.last_name, u.first_name, u.email, u.is_active, u.created_at, u.last_login
             ORDER BY u.username
         """
-        df = db.execute_query(query)
+        rows = db.fetch_all(query)
 
-        # Timestamp列を文字列に変換
-        if "created_at" in df.columns:
-            df["created_at"] = df["created_at"].dt.strftime("%Y-%m-%d %H:%M:%S")
-        if "last_login" in df.columns:
-            df["last_login"] = df["last_login"].dt.strftime("%Y-%m-%d %H:%M:%S")
-
-        # NaTをNoneに変換
-        df = df.where(df.notna(), None)
-
-        return jsonify({"success": True, "data": df.to_dict(orient="records")})
+        return jsonify({"success": True, "data": rows})
     except Exception as exc:
         return jsonify({"success": False, "error": str(exc)}), 500
 
@@ -338,11 +330,12 @@ def delete_user(user_id: int):
 
 
 @users_bp.route("/api/roles", methods=["GET"])
+@conditional_get(("roles", "id", True), cache_control="private, max-age=300")
 def list_roles():
     """ロール一覧を取得"""
     try:
         db = get_db_manager()
-        df = db.execute_query(
+        rows = db.fetch_all(
             """
             SELECT id, role_name, description, created_at
             FROM roles
@@ -360,14 +353,7 @@ def list_roles():
             """
         )
 
-        # Timestamp列を文字列に変換
-        if "created_at" in df.columns:
-            df["created_at"] = df["created_at"].dt.strftime("%Y-%m-%d %H:%M:%S")
-
-        # NaTをNoneに変換
-        df = df.where(df.notna(), None)
-
-        return jsonify({"success": True, "data": df.to_dict(orient="records")})
+        return jsonify({"success": True, "data": rows})
     except Exception as exc:
         return jsonify({"success": False, "error": str(exc)}), 500
 
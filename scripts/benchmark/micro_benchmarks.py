@@ -0,0 +1,318 @@
+"""
+PDF作成・QR読み取り・CSV取込の処理（CPU負荷の高い箇所）のマイクロベンチマーク
+
+データベース・HTTPを使わず、関数を直接呼び出して1回あたりの処理時間を計測する。
+各ベンチマークは --min-time 秒以上（最低 --min-rounds 回）繰り返し、最小・中央値・平均を表示する。
+
+  pdf.purchase_order[N]   PurchaseOrderGenerator.generate_purchase_order（明細 1 / 20 / 200 件）
+  pdf.render_order[N]     utils.pdf_utils.render_order_pdf（明細 1 / 20 / 200 件）
+  pdf.pages[N]            明細の件数に対する注文書PDFの作成時間・ページ数・メモリ使用量の最大値（10〜2000件）
+  qr.decode[...]          decode_qr_from_image（--qr-corpus のラベル写真、無ければ合成した画像を解像度別に）
+  qr.normalize            normalize_qr_code_value（読み取り結果の各形式）
+  qr.label_code           1コード分のQRラベルの描画命令の作成（キャッシュなし）
+  qr.label_sheets[5000]   QRラベルシート5,000枚分のPDF作成（QRコードはキャッシュ済み）
+  csv.rows[50000]         normalize_csv_row + parse_int / parse_float（50,000行のCSV、--csv で実ファイルも可）
+
+結果は scripts/benchmark/results/micro_<日時>.json に保存する。--compare に前回の結果を指定すると
+中央値の変化を表示し、--threshold を超えて遅くなっていれば終了コード 1 を返す。
+
+実行方法: python scripts/benchmark/micro_benchmarks.py [--only pdf qr] [--qr-corpus 写真のフォルダ] [--csv ファイル]
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT_DIR))
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+PDF_ITEM_COUNTS = (1, 20, 200)
+# 複数ページの注文書の作成時間が明細の件数に比例すること（メモリが増え続けないこと）を確認する件数
+PDF_SCALING_COUNTS = (10, 100, 500, 1000, 2000)
+# 合成するQR画像の解像度（スマートフォン・タブレットのカメラ画像を想定）
+QR_RESOLUTIONS = ((640, 480), (1280, 720), (1920, 1080), (3024, 4032))
+CSV_ROW_COUNT = 50_000
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp"}
+
+QR_SAMPLES = (
+    "MASINA-00172",
+    "  MASINA-00172\n",
+    "管理番号：MASINA-\n00172 品名：ベアリング 6204ZZ",
+    "code=KOGU-01234name=ドリル 5.0mm",
+    "6 MASINA-00178 日東 オイルシール",
+    "ANZEN 00031",
+)
+
+
+def measure(func, min_time: float, min_rounds: int) -> dict:
+    """func を繰り返し呼び出し、1回あたりの処理時間（ミリ秒）を集計する"""
+    func()  # ウォームアップ（フォント登録・ライブラリの読み込みを計測に含めない）
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_rounds or time.perf_counter() - started < min_time:
+        t0 = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return {
+        "rounds": len(timings),
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "stdev_ms": round(statistics.stdev(timings), 3) if len(timings) > 1 else 0.0,
+    }
+
+
+def measure_peak_memory(func) -> int:
+    """func を1回呼び出したときのメモリ使用量の最大値（KB）"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def sample_items(count: int, rng: random.Random) -> list[dict]:
+    items = []
+    for i in range(1, count + 1):
+        quantity = rng.randint(1, 50)
+        unit_price = round(rng.uniform(50, 30000), 2)
+        items.append(
+            {
+                "order_code": f"PO-MASINA-{i:05d}",
+                "code": f"MASINA-{i:05d}",
+                "name": f"ベアリング 6204ZZ 両側シール 高速回転用 サンプル品目{i}",
+                "quantity": quantity,
+                "unit": "個",
+                "unit_price": unit_price,
+                "total_amount": round(quantity * unit_price, 2),
+                "deadline": "通常",
+                "note": "至急" if i % 7 == 0 else "",
+            }
+        )
+    return items
+
+
+def pdf_benchmarks(rng: random.Random):
+    import pandas as pd
+
+    from pdf_generator import PurchaseOrderGenerator
+    from utils.pdf_utils import render_order_pdf
+
+    generator = PurchaseOrderGenerator()
+    order_data = {
+        "order_number": "PO-20250114-001",
+        "supplier_name": "ベンチ商事001",
+        "contact_person": "佐藤",
+        "created_by": "田中 太郎",
+        "created_at": datetime.now(),
+        "reviewed_by_name": "鈴木 一郎",
+        "reviewed_at": datetime.now(),
+    }
+    for count in PDF_ITEM_COUNTS:
+        items = sample_items(count, rng)
+        yield f"pdf.purchase_order[{count}]", lambda items=items: generator.generate_purchase_order(
+            order_data, items, io.BytesIO()
+        ), {}
+
+    for count in PDF_ITEM_COUNTS:
+        rows = pd.DataFrame(
+            [{**item, "supplier_name": "ベンチ商事001", "requester_name": "田中 太郎"} for item in sample_items(count, rng)]
+        )
+        yield f"pdf.render_order[{count}]", lambda rows=rows: render_order_pdf(rows, "ORD-BENCH", "備考"), {}
+
+    for count in PDF_SCALING_COUNTS:
+        items = sample_items(count, rng)
+
+        def render(items=items):
+            output = io.BytesIO()
+            generator.generate_purchase_order(order_data, items, output)
+            return output
+
+        pages = render().getvalue().count(b"/Type /Page\n")
+        yield f"pdf.pages[{count}]", render, {"lines": count, "pages": pages}
+
+
+def synthetic_qr_photos(rng: random.Random) -> list[tuple[str, bytes]]:
+    """QRコードのラベルを撮影した画像に近いもの（余白・縮小・ぼかし・ノイズ）を解像度別に作る"""
+    import cv2
+    import numpy as np
+
+    encoder = cv2.QRCodeEncoder_create()
+    matrix = encoder.encode("MASINA-00172")
+    photos = []
+    for width, height in QR_RESOLUTIONS:
+        canvas = np.full((height, width), 200, dtype=np.uint8)
+        side = min(width, height) // 3
+        label = cv2.resize(matrix, (side, side), interpolation=cv2.INTER_NEAREST)
+        top, left = (height - side) // 2, (width - side) // 3
+        canvas[top:top + side, left:left + side] = label
+        canvas = cv2.GaussianBlur(canvas, (5, 5), 0)
+        noise = np.random.default_rng(rng.randint(0, 2**32 - 1)).normal(0, 8, canvas.shape)
+        canvas = np.clip(canvas + noise, 0, 255).astype(np.uint8)
+        ok, jpeg = cv2.imencode(".jpg", cv2.cvtColor(canvas, cv2.COLOR_GRAY2BGR), [cv2.IMWRITE_JPEG_QUALITY, 85])
+        if ok:
+            photos.append((f"{width}x{height}", jpeg.tobytes()))
+    return photos
+
+
+def qr_benchmarks(rng: random.Random, corpus: str | None):
+    from routes.inventory import decode_qr_from_image, normalize_qr_code_value
+
+    if corpus:
+        paths = sorted(p for p in Path(corpus).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+        photos = [(path.name, path.read_bytes()) for path in paths]
+    else:
+        photos = synthetic_qr_photos(rng)
+
+    for label, image_bytes in photos:
+        if decode_qr_from_image(image_bytes) is None:
+            print(f"  警告: {label} のQRコードを読み取れません（読み取れない場合の時間を計測します）")
+        yield f"qr.decode[{label}]", lambda image_bytes=image_bytes: decode_qr_from_image(image_bytes), {}
+
+    yield "qr.normalize", lambda: [normalize_qr_code_value(value) for value in QR_SAMPLES], {}
+
+    from utils.qr_label_utils import LabelGrid, get_qr_drawing_ops, qr_drawing_ops, render_label_sheets
+
+    yield "qr.label_code", lambda: qr_drawing_ops(f"MASINA-{rng.randrange(100000):05d}"), {}
+    # QRコードはキャッシュ済みの状態（2回目以降の印刷）で計測する
+    labels = [
+        {"code": item["code"], "name": item["name"], "storage_location": f"棚{index % 40:02d}"}
+        for index, item in enumerate(sample_items(5000, rng))
+    ]
+    get_qr_drawing_ops([label["code"] for label in labels])
+    yield "qr.label_sheets[5000]", lambda: render_label_sheets(labels, LabelGrid()), {}
+
+
+def synthetic_csv(rng: random.Random, row_count: int) -> str:
+    """消耗品の取込CSV（日本語の見出し・桁区切りの数値・空欄を含む）を作る"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["コード", "発注コード", "品名", "カテゴリ", "単位", "在庫数", "安全在庫", "単価", "発注単位", "仕入先", "保管場所", "備考"])
+    for i in range(1, row_count + 1):
+        writer.writerow(
+            [
+                f" MASINA-{i:05d} ",
+                f"PO-MASINA-{i:05d}",
+                f"ベアリング 6204ZZ 品目{i}",
+                "機械部品",
+                "個",
+                f"{rng.randint(0, 5000):,}",
+                "" if i % 10 == 0 else str(rng.randint(5, 50)),
+                f"{rng.uniform(50, 30000):,.2f}",
+                str(rng.choice((1, 5, 10))),
+                f"ベンチ商事{rng.randint(1, 200):03d}",
+                f"棚{rng.randint(1, 40)}",
+                "",
+            ]
+        )
+    return buffer.getvalue()
+
+
+def csv_benchmarks(rng: random.Random, csv_path: str | None):
+    from utils.csv_utils import normalize_csv_row, parse_float, parse_int
+
+    if csv_path:
+        text = Path(csv_path).read_text(encoding="utf-8-sig")
+    else:
+        text = synthetic_csv(rng, CSV_ROW_COUNT)
+    rows = list(csv.DictReader(io.StringIO(text)))
+
+    def import_rows():
+        for row in rows:
+            normalized = normalize_csv_row(row)
+            parse_int(normalized.get("stock_quantity"))
+            parse_int(normalized.get("safety_stock"))
+            parse_int(normalized.get("order_unit"), 1)
+            parse_float(normalized.get("unit_price"))
+
+    yield f"csv.rows[{len(rows)}]", import_rows, {}
+
+
+def compare_results(current: dict, baseline_path: Path, threshold: float) -> list[str]:
+    """前回の結果と中央値を比較し、threshold（割合）を超えて遅くなったベンチマークを返す"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    print(f"\n前回の結果との比較（{baseline_path.name}）:")
+    regressions = []
+    for name, stats in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        change = (stats["median_ms"] - before["median_ms"]) / before["median_ms"]
+        worse = change > threshold
+        print(f"  {name:<32} {before['median_ms']:>10.3f} -> {stats['median_ms']:>10.3f} ms ({change:+.1%}){'  悪化' if worse else ''}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="PDF・QR・CSVの処理のマイクロベンチマーク")
+    parser.add_argument("--only", nargs="*", choices=("pdf", "qr", "csv"), help="計測するグループ")
+    parser.add_argument("--qr-corpus", help="QRコードのラベル写真のフォルダ（無ければ合成した画像を使う）")
+    parser.add_argument("--csv", help="計測に使うCSVファイル（無ければ50,000行を合成する）")
+    parser.add_argument("--min-time", type=float, default=1.0, help="ベンチマークごとの最低計測時間（秒）")
+    parser.add_argument("--min-rounds", type=int, default=5, help="ベンチマークごとの最低実行回数")
+    parser.add_argument("--seed", type=int, default=42, help="乱数のシード")
+    parser.add_argument("--output", help="結果のJSONファイル（既定: results/micro_<日時>.json）")
+    parser.add_argument("--compare", help="比較する前回の結果のJSONファイル")
+    parser.add_argument("--threshold", type=float, default=0.10, help="悪化とみなす変化の割合（既定: 0.10）")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    groups = {
+        "pdf": lambda: pdf_benchmarks(rng),
+        "qr": lambda: qr_benchmarks(rng, args.qr_corpus),
+        "csv": lambda: csv_benchmarks(rng, args.csv),
+    }
+
+    results = {}
+    for group, benchmarks in groups.items():
+        if args.only and group not in args.only:
+            continue
+        for name, func, extra in benchmarks():
+            stats = results[name] = {**measure(func, args.min_time, args.min_rounds), **extra}
+            detail = ""
+            if "lines" in extra:
+                stats["ms_per_line"] = round(stats["median_ms"] / extra["lines"], 3)
+                stats["peak_memory_kb"] = measure_peak_memory(func)
+                detail = f"  {extra['pages']} ページ  1行 {stats['ms_per_line']:.3f} ms  メモリ最大 {stats['peak_memory_kb']:,} KB"
+            print(
+                f"  {name:<32} 中央値 {stats['median_ms']:>10.3f} ms  最小 {stats['min_ms']:>10.3f} ms"
+                f"  （{stats['rounds']} 回）{detail}"
+            )
+
+    report = {
+        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": sys.version.split()[0],
+        "options": {"min_time": args.min_time, "min_rounds": args.min_rounds, "qr_corpus": args.qr_corpus, "csv": args.csv},
+        "results": results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"micro_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    # 確認
+    print(f"\nOK - 結果を保存しました: {output}")
+    if args.compare:
+        regressions = compare_results(report, Path(args.compare), args.threshold)
+        if regressions:
+            print(f"\nERROR - {len(regressions)} 件のベンチマークが {args.threshold:.0%} 以上遅くなっています: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
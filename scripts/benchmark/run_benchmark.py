@@ -0,0 +1,384 @@
+"""
+APIのレイテンシ・スループットを計測し、結果をJSONで保存する
+
+seed_database.py でデータを投入したデータベースに接続したアプリ（gunicorn -c gunicorn.conf.py app:app）
+に対して実行する。計測する内容:
+
+  エンドポイント別: /api/inventory・/api/history・/api/dispatch/orders・/api/outbound・
+                    注文書PDFの作成（/api/dispatch/orders/<id>/pdf）・QR読み取り（/api/decode-qr）
+  スキャナー端末:   --terminals 台の端末が「QR読み取り → 出庫登録」を --duration 秒間繰り返す
+
+結果は scripts/benchmark/results/benchmark_<日時>.json に保存する。--compare に前回（前のリリース）の
+結果を指定すると p95・スループットの変化を表示し、--threshold を超えて悪化していれば終了コード 1 を返す。
+
+実行方法:
+    python scripts/benchmark/run_benchmark.py --base-url http://localhost:8504 [--requests 200]
+        [--concurrency 8] [--terminals 20] [--duration 60] [--compare results/前回.json]
+"""
+import argparse
+import base64
+import gzip
+import http.client
+import json
+import math
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.cookies import SimpleCookie
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# 比較で扱う指標（値が大きいほど悪い / 小さいほど悪い）
+LOWER_IS_BETTER = ("p95_ms",)
+HIGHER_IS_BETTER = ("throughput_rps",)
+
+
+class Client:
+    """1端末分のHTTPクライアント（接続を使い回し、ログインのセッションCookieを保持する）"""
+
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.cookies = SimpleCookie()
+        self.conn = None
+
+    def _connect(self):
+        if self.scheme == "https":
+            import ssl
+
+            # 自己署名証明書（scripts/maintenance/generate_cert.py）でも計測できるよう検証しない
+            context = ssl._create_unverified_context()
+            return http.client.HTTPSConnection(self.netloc, timeout=self.timeout, context=context)
+        return http.client.HTTPConnection(self.netloc, timeout=self.timeout)
+
+    def request(self, method: str, path: str, payload=None) -> tuple[int, bytes]:
+        # ブラウザと同じく圧縮されたレスポンスを受け取る（展開の時間も計測に含める）
+        headers = {"Accept-Encoding": "gzip"}
+        body = None
+        if payload is not None:
+            body = json.dumps(payload).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{key}={morsel.value}" for key, morsel in self.cookies.items())
+
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = self._connect()
+            try:
+                self.conn.request(method, self.prefix + path, body=body, headers=headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # keep-alive の接続がサーバー側で閉じられていた場合は1回だけ接続し直す
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+
+        for header in response.headers.get_all("Set-Cookie") or []:
+            self.cookies.load(header)
+        if response.getheader("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+        return response.status, data
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+
+class Recorder:
+    """計測値をエンドポイント（処理）ごとに集める"""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.statuses: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def call(self, name: str, client: Client, method: str, path: str, payload=None) -> tuple[int, bytes]:
+        started = time.perf_counter()
+        try:
+            status, data = client.request(method, path, payload)
+        except Exception:
+            status, data = 0, b""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.latencies.setdefault(name, []).append(elapsed_ms)
+            statuses = self.statuses.setdefault(name, {})
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            if not 200 <= status < 300:
+                self.errors[name] = self.errors.get(name, 0) + 1
+        return status, data
+
+    def summary(self, name: str, wall_seconds: float) -> dict:
+        samples = sorted(self.latencies.get(name, []))
+        count = len(samples)
+        if not count:
+            return {"count": 0}
+
+        def percentile(ratio: float) -> float:
+            return round(samples[max(math.ceil(ratio * count) - 1, 0)], 2)
+
+        return {
+            "count": count,
+            "errors": self.errors.get(name, 0),
+            "statuses": self.statuses.get(name, {}),
+            "mean_ms": round(sum(samples) / count, 2),
+            "p50_ms": percentile(0.50),
+            "p90_ms": percentile(0.90),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(samples[-1], 2),
+            "throughput_rps": round(count / wall_seconds, 2) if wall_seconds else 0.0,
+        }
+
+
+def build_qr_images(codes: list[str], count: int) -> list[tuple[str, str]]:
+    """消耗品コードのQRコード画像（data URL）を作る（OpenCV が無ければQRの計測を省く）"""
+    try:
+        import cv2
+    except ImportError:
+        print("  OpenCV が無いためQR読み取りの計測を省きます")
+        return []
+
+    encoder = cv2.QRCodeEncoder_create()
+    images = []
+    for code in codes[:count]:
+        matrix = encoder.encode(code)
+        # カメラの撮影画像に近い大きさ・余白にする
+        image = cv2.resize(matrix, None, fx=12, fy=12, interpolation=cv2.INTER_NEAREST)
+        image = cv2.copyMakeBorder(image, 40, 40, 40, 40, cv2.BORDER_CONSTANT, value=255)
+        ok, png = cv2.imencode(".png", image)
+        if ok:
+            images.append((code, "data:image/png;base64," + base64.b64encode(png.tobytes()).decode("ascii")))
+    return images
+
+
+def login(client: Client, username: str, password: str) -> bool:
+    if not username:
+        return True
+    status, _ = client.request("POST", "/api/login", {"username": username, "password": password})
+    return status == 200
+
+
+def load_targets(client: Client) -> tuple[list[str], list[int]]:
+    """計測に使う消耗品コードと注文書IDを一覧APIから取得する"""
+    status, data = client.request("GET", "/api/inventory")
+    if status != 200:
+        raise RuntimeError(f"/api/inventory の取得に失敗しました（HTTP {status}）")
+    codes = [row["コード"] for row in json.loads(data).get("data", []) if row.get("コード")]
+
+    status, data = client.request("GET", "/api/dispatch/orders")
+    order_ids = [row["id"] for row in json.loads(data).get("data", [])] if status == 200 else []
+    return codes, order_ids
+
+
+def run_endpoint(recorder: Recorder, name: str, make_request, args) -> float:
+    """1つのエンドポイントを --concurrency 並列で --requests 回呼び出し、経過時間を返す"""
+    local = threading.local()
+    clients = []
+    clients_lock = threading.Lock()
+
+    def worker(index: int):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = Client(args.base_url, args.timeout)
+            login(client, args.username, args.password)
+            with clients_lock:
+                clients.append(client)
+        method, path, payload = make_request(index)
+        recorder.call(name, client, method, path, payload)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(worker, range(args.requests)))
+    elapsed = time.perf_counter() - started
+    for client in clients:
+        client.close()
+    return elapsed
+
+
+def run_scanners(recorder: Recorder, args, qr_images: list[tuple[str, str]], codes: list[str]) -> float:
+    """スキャナー端末を模擬し、各端末が「QR読み取り → 出庫登録」を繰り返す"""
+    deadline = time.perf_counter() + args.duration
+
+    def terminal(index: int):
+        rng = random.Random(index)
+        client = Client(args.base_url, args.timeout)
+        login(client, args.username, args.password)
+        try:
+            while time.perf_counter() < deadline:
+                if qr_images:
+                    code, image = rng.choice(qr_images)
+                    recorder.call("scanner.decode_qr", client, "POST", "/api/decode-qr", {"image": image})
+                else:
+                    code = rng.choice(codes)
+                recorder.call(
+                    "scanner.outbound",
+                    client,
+                    "POST",
+                    "/api/outbound",
+                    {"code": code, "quantity": 1, "person": f"端末{index:02d}", "department": "ベンチマーク", "note": "benchmark"},
+                )
+                if args.think_ms:
+                    time.sleep(rng.uniform(0.5, 1.5) * args.think_ms / 1000)
+        finally:
+            client.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.terminals) as executor:
+        list(executor.map(terminal, range(args.terminals)))
+    return time.perf_counter() - started
+
+
+def git_revision() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(current: dict, baseline_path: Path, threshold: float) -> list[str]:
+    """前回の結果と比較し、threshold（割合）を超えて悪化した指標を返す"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    print(f"\n前回の結果との比較（{baseline_path.name}、git {baseline.get('git_revision')}）:")
+    regressions = []
+    for name, stats in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before or not stats.get("count") or not before.get("count"):
+            continue
+        for key in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            old, new = before.get(key), stats.get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change > threshold if key in LOWER_IS_BETTER else change < -threshold
+            mark = "  悪化" if worse else ""
+            print(f"  {name:<24} {key:<15} {old:>10.2f} -> {new:>10.2f} ({change:+.1%}){mark}")
+            if worse:
+                regressions.append(f"{name} {key}")
+    return regressions
+
+
+def run_benchmark(args) -> int:
+    setup_client = Client(args.base_url, args.timeout)
+    if not login(setup_client, args.username, args.password):
+        print(f"ERROR - {args.username} でログインできません（seed_database.py の --password と合わせてください）")
+        return 1
+    codes, order_ids = load_targets(setup_client)
+    setup_client.close()
+    if not codes:
+        print("ERROR - 消耗品がありません。seed_database.py でデータを投入してください")
+        return 1
+
+    rng = random.Random(args.seed)
+    qr_images = build_qr_images(rng.sample(codes, min(len(codes), 50)), 50) if not args.skip_qr else []
+    # PDFは作成済みのファイルを返すため、毎回別の注文書を指定して作成時間を計測する
+    pdf_order_ids = rng.sample(order_ids, min(len(order_ids), args.requests))
+
+    endpoints = {
+        "inventory": lambda i: ("GET", "/api/inventory", None),
+        "inventory.columnar": lambda i: ("GET", "/api/inventory?format=columnar", None),
+        "history": lambda i: ("GET", "/api/history", None),
+        "dispatch_orders": lambda i: ("GET", "/api/dispatch/orders", None),
+        "outbound": lambda i: (
+            "POST",
+            "/api/outbound",
+            {"code": codes[i % len(codes)], "quantity": 1, "person": "ベンチマーク", "note": "benchmark"},
+        ),
+    }
+    if pdf_order_ids:
+        endpoints["dispatch_order_pdf"] = lambda i: ("GET", f"/api/dispatch/orders/{pdf_order_ids[i % len(pdf_order_ids)]}/pdf", None)
+    if qr_images:
+        endpoints["decode_qr"] = lambda i: ("POST", "/api/decode-qr", {"image": qr_images[i % len(qr_images)][1]})
+
+    recorder = Recorder()
+    results = {}
+    selected = set(args.only or endpoints)
+    for name, make_request in endpoints.items():
+        if name not in selected:
+            continue
+        elapsed = run_endpoint(recorder, name, make_request, args)
+        results[name] = recorder.summary(name, elapsed)
+        stats = results[name]
+        print(
+            f"  {name:<24} p50 {stats['p50_ms']:>8.1f} ms  p95 {stats['p95_ms']:>8.1f} ms"
+            f"  {stats['throughput_rps']:>7.1f} req/s  エラー {stats['errors']}"
+        )
+
+    if args.terminals > 0 and args.duration > 0:
+        print(f"\nスキャナー端末 {args.terminals} 台で {args.duration} 秒間計測します")
+        elapsed = run_scanners(recorder, args, qr_images, codes)
+        for name in ("scanner.decode_qr", "scanner.outbound"):
+            if name in recorder.latencies:
+                results[name] = recorder.summary(name, elapsed)
+                stats = results[name]
+                print(
+                    f"  {name:<24} p50 {stats['p50_ms']:>8.1f} ms  p95 {stats['p95_ms']:>8.1f} ms"
+                    f"  {stats['throughput_rps']:>7.1f} req/s  エラー {stats['errors']}"
+                )
+
+    report = {
+        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "git_revision": git_revision(),
+        "base_url": args.base_url,
+        "options": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "terminals": args.terminals,
+            "duration": args.duration,
+            "think_ms": args.think_ms,
+        },
+        "dataset": {"consumables": len(codes), "dispatch_orders": len(order_ids)},
+        "results": results,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    # 確認
+    print(f"\nOK - 結果を保存しました: {output}")
+    if args.compare:
+        regressions = compare_results(report, Path(args.compare), args.threshold)
+        if regressions:
+            print(f"\nERROR - {len(regressions)} 件の指標が {args.threshold:.0%} 以上悪化しています: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="APIのレイテンシ・スループットを計測")
+    parser.add_argument("--base-url", default="http://localhost:8504", help="アプリのURL")
+    parser.add_argument("--username", default="bench", help="ログインするユーザー（空文字でログインしない）")
+    parser.add_argument("--password", default="bench-password", help="パスワード")
+    parser.add_argument("--requests", type=int, default=200, help="エンドポイントごとのリクエスト数")
+    parser.add_argument("--concurrency", type=int, default=8, help="エンドポイントごとの同時リクエスト数")
+    parser.add_argument("--terminals", type=int, default=20, help="模擬するスキャナー端末の台数（0で省く）")
+    parser.add_argument("--duration", type=int, default=60, help="スキャナー端末の計測時間（秒）")
+    parser.add_argument("--think-ms", type=int, default=500, help="端末の操作間隔の平均（ミリ秒）")
+    parser.add_argument("--timeout", type=float, default=60, help="1リクエストのタイムアウト（秒）")
+    parser.add_argument("--only", nargs="*", help="計測するエンドポイント（inventory history など）")
+    parser.add_argument("--skip-qr", action="store_true", help="QR読み取りを計測しない")
+    parser.add_argument("--seed", type=int, default=42, help="乱数のシード")
+    parser.add_argument("--output", help="結果のJSONファイル（既定: results/benchmark_<日時>.json）")
+    parser.add_argument("--compare", help="比較する前回の結果のJSONファイル")
+    parser.add_argument("--threshold", type=float, default=0.10, help="悪化とみなす変化の割合（既定: 0.10）")
+    sys.exit(run_benchmark(parser.parse_args()))
@@ -0,0 +1,375 @@
+"""
+ベンチマーク用のデータベースに本番相当の件数のデータを投入する
+
+既定の件数: 消耗品 20,000 / 購入先 200 / 従業員 500 / 在庫移動台帳（入出庫履歴）500,000 / 注文書 5,000
+--scale で全体の件数を倍率で変更できる（例: --scale 0.1 で動作確認用の少量データ）。
+
+SQLite の互換モードは用意しない。一覧・履歴の検索は MySQL の FULLTEXT（ngramパーサー）、
+在庫の更新は ON DUPLICATE KEY UPDATE・SELECT ... FOR UPDATE などMySQL固有の構文を使うため、
+SQLite では本番と同じ実行計画・ロックの待ちを計測できない。ベンチマーク用のMySQLは
+scripts/benchmark/docker-compose.yml で起動する。
+
+投入先のテーブルのデータは削除される。誤って本番のデータベースに投入しないよう、
+データベース名が "_bench" で終わらない場合は --force が必要。
+
+実行方法:
+    docker compose -f scripts/benchmark/docker-compose.yml up -d
+    （環境変数 INVENTORY_DB_PORT=3307 / INVENTORY_DB_NAME=inventory_bench / INVENTORY_DB_PASSWORD=bench_password）
+    python scripts/benchmark/seed_database.py [--scale 1.0] [--seed 42]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from werkzeug.security import generate_password_hash
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT_DIR / "scripts" / "setup"))
+
+import migrate  # noqa: E402  scripts/setup/migrate.py（スキーマの作成と接続設定を共用）
+
+ROLES_FILE = ROOT_DIR / "scripts" / "setup" / "init_roles.sql"
+
+DEFAULT_COUNTS = {
+    "suppliers": 200,
+    "departments": 30,
+    "employees": 500,
+    "consumables": 20_000,
+    "movements": 500_000,
+    "dispatch_orders": 5_000,
+}
+BATCH_SIZE = 5_000
+HISTORY_DAYS = 730
+
+# 投入前に空にするテーブル（子テーブルから順に）
+SEEDED_TABLES = (
+    "dispatch_order_items",
+    "dispatch_orders",
+    "order_details",
+    "orders",
+    "stock_movements",
+    "outbound_history",
+    "inbound_history",
+    "consumption_daily",
+    "consumable_forecasts",
+    "change_events",
+    "deleted_records",
+    "attachments",
+    "consumables",
+    "employees",
+    "departments",
+    "suppliers",
+)
+
+CATEGORIES = (
+    ("MASINA", "機械部品", ("ベアリング", "Vベルト", "オイルシール", "チェーン", "カップリング")),
+    ("KOGU", "工具", ("ドリル", "エンドミル", "タップ", "砥石", "ビット")),
+    ("SEISO", "清掃用品", ("ウエス", "洗浄剤", "モップ", "ゴミ袋", "ブラシ")),
+    ("ANZEN", "安全用品", ("軍手", "保護メガネ", "耳栓", "マスク", "安全靴")),
+    ("JIMU", "事務用品", ("コピー用紙", "ボールペン", "ファイル", "ラベル", "トナー")),
+    ("DENKI", "電気部品", ("ヒューズ", "リレー", "端子", "ケーブル", "電池")),
+)
+UNITS = ("個", "箱", "本", "枚", "袋", "セット", "m")
+ORDER_STATUSES = ("", "", "", "依頼中", "発注準備", "発注済み", "入庫済み")
+DISPATCH_STATUSES = ("未送信", "確認済", "承認済", "送信済", "入庫済み", "キャンセル")
+LINES = ("第1ライン", "第2ライン", "第3ライン", "組立", "検査", "出荷")
+SURNAMES = ("佐藤", "鈴木", "高橋", "田中", "伊藤", "渡辺", "山本", "中村", "小林", "加藤")
+GIVEN_NAMES = ("太郎", "花子", "一郎", "次郎", "美咲", "健", "翔", "陽菜", "大輔", "愛")
+
+BENCH_USERNAME = "bench"
+
+
+def scaled_counts(scale: float) -> dict[str, int]:
+    return {name: max(int(count * scale), 1) for name, count in DEFAULT_COUNTS.items()}
+
+
+def insert_batches(cursor, sql: str, rows, label: str) -> int:
+    """行を BATCH_SIZE 件ずつ executemany（PyMySQL が複数行の INSERT にまとめる）で投入する"""
+    started = time.perf_counter()
+    batch = []
+    total = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            cursor.executemany(sql, batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        cursor.executemany(sql, batch)
+        total += len(batch)
+    print(f"  {label}: {total:,} 件（{time.perf_counter() - started:.1f} 秒）")
+    return total
+
+
+def truncate_tables(cursor):
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    for table in SEEDED_TABLES:
+        cursor.execute(f"TRUNCATE TABLE {table}")
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+
+
+def seed_masters(cursor, rng: random.Random, counts: dict[str, int]):
+    insert_batches(
+        cursor,
+        "INSERT INTO suppliers (id, name, contact_person, phone, email) VALUES (%s, %s, %s, %s, %s)",
+        (
+            (i, f"ベンチ商事{i:03d}", rng.choice(SURNAMES), f"03-0000-{i:04d}", f"supplier{i}@example.com")
+            for i in range(1, counts["suppliers"] + 1)
+        ),
+        "購入先",
+    )
+
+    departments = [f"製造{i}課" if i % 3 else f"保全{i}課" for i in range(1, counts["departments"] + 1)]
+    insert_batches(
+        cursor,
+        "INSERT INTO departments (id, name) VALUES (%s, %s)",
+        ((i, name) for i, name in enumerate(departments, start=1)),
+        "部署",
+    )
+
+    employees = []
+    for i in range(1, counts["employees"] + 1):
+        department_id = rng.randrange(len(departments))
+        employees.append((i, f"E{i:05d}", rng.choice(SURNAMES) + rng.choice(GIVEN_NAMES), departments[department_id], department_id + 1))
+    insert_batches(
+        cursor,
+        "INSERT INTO employees (id, code, name, department) VALUES (%s, %s, %s, %s)",
+        (row[:4] for row in employees),
+        "従業員",
+    )
+    return employees
+
+
+def build_consumables(rng: random.Random, counts: dict[str, int]) -> list[tuple]:
+    consumables = []
+    for i in range(1, counts["consumables"] + 1):
+        prefix, category, names = CATEGORIES[i % len(CATEGORIES)]
+        safety_stock = rng.randint(5, 50)
+        # 出庫のベンチマークで在庫切れにならないよう在庫は多めにする（一部は安全在庫以下）
+        stock = rng.randint(0, safety_stock) if rng.random() < 0.1 else rng.randint(500, 5000)
+        if stock == 0:
+            shortage = "欠品"
+        elif stock <= safety_stock:
+            shortage = "要注意"
+        else:
+            shortage = "在庫あり"
+        consumables.append(
+            (
+                i,
+                f"{prefix}-{i:05d}",
+                f"PO-{prefix}-{i:05d}",
+                f"{rng.choice(names)} {rng.choice('ABCDEFGH')}{rng.randint(1, 999)}",
+                category,
+                rng.choice(UNITS),
+                f"棚{rng.randint(1, 40)}-{rng.randint(1, 10)}",
+                stock,
+                safety_stock,
+                rng.choice((1, 5, 10, 50)),
+                rng.randint(1, counts["suppliers"]),
+                round(rng.uniform(50, 30000), 2),
+                rng.choice(ORDER_STATUSES),
+                shortage,
+                int(stock <= safety_stock),
+            )
+        )
+    return consumables
+
+
+def movement_rows(rng: random.Random, counts: dict[str, int], consumables: list[tuple], employees: list[tuple]):
+    """在庫移動台帳（出庫8割・入庫2割）を古い順に生成する"""
+    now = datetime.utcnow().replace(microsecond=0)
+    total = counts["movements"]
+    step = timedelta(days=HISTORY_DAYS) / total
+    started_at = now - timedelta(days=HISTORY_DAYS)
+    for i in range(1, total + 1):
+        item = rng.choice(consumables)
+        employee = rng.choice(employees)
+        is_inbound = rng.random() < 0.2
+        quantity = rng.randint(10, 100) if is_inbound else rng.randint(1, 10)
+        unit_price = item[11]
+        yield (
+            "inbound" if is_inbound else "outbound",
+            item[0],
+            item[1],
+            item[3],
+            quantity if is_inbound else -quantity,
+            item[7],
+            employee[0],
+            employee[2],
+            employee[3],
+            employee[4],
+            unit_price,
+            round(unit_price * quantity, 2),
+            "" if is_inbound else rng.choice(LINES),
+            "手動" if is_inbound else None,
+            "benchmark",
+            i,
+            started_at + step * i,
+        )
+
+
+def dispatch_rows(rng: random.Random, counts: dict[str, int], consumables: list[tuple]):
+    """注文書と明細（1件あたり1〜8明細、購入先の揃った品目）を生成する"""
+    by_supplier: dict[int, list[tuple]] = {}
+    for item in consumables:
+        by_supplier.setdefault(item[10], []).append(item)
+    supplier_ids = sorted(by_supplier)
+
+    now = datetime.utcnow().replace(microsecond=0)
+    orders = []
+    items = []
+    for i in range(1, counts["dispatch_orders"] + 1):
+        supplier_id = rng.choice(supplier_ids)
+        candidates = by_supplier[supplier_id]
+        lines = rng.sample(candidates, min(rng.randint(1, 8), len(candidates)))
+        created_at = now - timedelta(minutes=rng.randint(0, HISTORY_DAYS * 24 * 60))
+        total_amount = 0.0
+        for item in lines:
+            quantity = rng.randint(1, 20) * item[9]
+            amount = round(item[11] * quantity, 2)
+            total_amount += amount
+            items.append((i, item[0], item[1], item[2], item[3], quantity, item[5], item[11], amount, "通常"))
+        orders.append(
+            (
+                i,
+                f"PO-{created_at:%Y%m%d}-{i:05d}",
+                supplier_id,
+                f"ベンチ商事{supplier_id:03d}",
+                len(lines),
+                round(total_amount, 2),
+                rng.choice(DISPATCH_STATUSES),
+                "ベンチマーク",
+                created_at,
+            )
+        )
+    return orders, items
+
+
+def seed_bench_user(cursor, password: str):
+    """ベンチマークの負荷生成でログインするユーザー（システム管理者）を登録する"""
+    cursor.execute(
+        """
+        INSERT INTO users (username, password_hash, full_name, last_name, first_name, is_active, is_admin)
+        VALUES (%s, %s, 'ベンチマーク', 'ベンチマーク', '', 1, 1)
+        ON DUPLICATE KEY UPDATE password_hash = VALUES(password_hash), is_active = 1
+        """,
+        (BENCH_USERNAME, generate_password_hash(password)),
+    )
+    cursor.execute(
+        """
+        INSERT INTO user_roles (user_id, role_id)
+        SELECT u.id, r.id FROM users u JOIN roles r ON r.role_name = 'システム管理者'
+        WHERE u.username = %s
+          AND NOT EXISTS (SELECT 1 FROM user_roles ur WHERE ur.user_id = u.id AND ur.role_id = r.id)
+        """,
+        (BENCH_USERNAME,),
+    )
+
+
+def seed_database(scale: float, seed: int, password: str, force: bool):
+    dbname = os.getenv("INVENTORY_DB_NAME", "inventory_db")
+    if not dbname.endswith("_bench") and not force:
+        print(f"ERROR - データベース {dbname} はベンチマーク用ではありません（名前が _bench で終わらない）")
+        print("  投入先のデータは削除されます。続ける場合は --force を指定してください")
+        return
+
+    counts = scaled_counts(scale)
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    conn = migrate.get_connection()
+    try:
+        # スキーマを最新にする（init.sql + migrations/）
+        migrate.run_migrations(conn)
+        with conn.cursor() as cursor:
+            for statement in migrate.split_sql_statements(ROLES_FILE.read_text(encoding="utf-8")):
+                cursor.execute(statement)
+        conn.commit()
+
+        print(f"データを投入します（{dbname}、倍率 {scale}）")
+        with conn.cursor() as cursor:
+            truncate_tables(cursor)
+            # 大量投入の間は一意制約・外部キーの確認を省く（投入するデータは整合している）
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+            cursor.execute("SET UNIQUE_CHECKS = 0")
+
+            employees = seed_masters(cursor, rng, counts)
+            consumables = build_consumables(rng, counts)
+            insert_batches(
+                cursor,
+                """
+                INSERT INTO consumables (
+                    id, code, order_code, name, category, unit, storage_location, stock_quantity,
+                    safety_stock, order_unit, supplier_id, unit_price, order_status, shortage_status, needs_reorder
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                consumables,
+                "消耗品",
+            )
+            conn.commit()
+
+            insert_batches(
+                cursor,
+                """
+                INSERT INTO stock_movements (
+                    movement_type, consumable_id, code, name, quantity, stock_after, employee_id,
+                    employee_name, employee_department, department_id, unit_price, total_amount, note,
+                    inbound_type, source_table, source_id, moved_at
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                movement_rows(rng, counts, consumables, employees),
+                "在庫移動台帳",
+            )
+            conn.commit()
+
+            orders, items = dispatch_rows(rng, counts, consumables)
+            insert_batches(
+                cursor,
+                """
+                INSERT INTO dispatch_orders (
+                    id, order_number, supplier_id, supplier_name, total_items, total_amount, status, created_by, created_at
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                orders,
+                "注文書",
+            )
+            insert_batches(
+                cursor,
+                """
+                INSERT INTO dispatch_order_items (
+                    dispatch_order_id, consumable_id, code, order_code, name, quantity, unit, unit_price, total_amount, deadline
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                items,
+                "注文書明細",
+            )
+
+            seed_bench_user(cursor, password)
+            cursor.execute("SET UNIQUE_CHECKS = 1")
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+        conn.commit()
+
+        # 実行計画が実際の件数に基づくよう統計情報を更新
+        with conn.cursor() as cursor:
+            cursor.execute("ANALYZE TABLE consumables, stock_movements, dispatch_orders, dispatch_order_items, suppliers")
+            cursor.fetchall()
+    finally:
+        conn.close()
+
+    # 確認
+    print(f"\nOK - 投入が完了しました（{time.perf_counter() - started:.1f} 秒）")
+    print(f"  ログイン: {BENCH_USERNAME} / --password で指定したパスワード")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ベンチマーク用のデータを投入")
+    parser.add_argument("--scale", type=float, default=1.0, help="件数の倍率（既定: 1.0）")
+    parser.add_argument("--seed", type=int, default=42, help="乱数のシード（同じ値なら同じデータになる）")
+    parser.add_argument("--password", default="bench-password", help=f"ユーザー {BENCH_USERNAME} のパスワード")
+    parser.add_argument("--force", action="store_true", help="データベース名が _bench で終わらなくても投入する")
+    args = parser.parse_args()
+    seed_database(args.scale, args.seed, args.password, args.force)
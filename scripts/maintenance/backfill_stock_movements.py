@@ -0,0 +1,63 @@
+"""
+既存の入出庫履歴（inbound_history / outbound_history）を在庫移動台帳（stock_movements）に取り込む
+
+source_table + source_id の一意キーで重複を防ぐため、何度実行しても安全。
+移動後の在庫数（stock_after）は過去分を復元できないため NULL のままとする。
+"""
+from database_manager import get_db_manager
+
+BACKFILL_QUERIES = {
+    "outbound_history": """
+        INSERT IGNORE INTO stock_movements (
+            movement_type, consumable_id, code, name, quantity,
+            employee_id, employee_name, employee_department, department_id, unit_price, total_amount, note,
+            inbound_type, source_table, source_id, moved_at
+        )
+        SELECT
+            'outbound', consumable_id, code, name, -quantity,
+            employee_id, employee_name, employee_department, department_id, unit_price, total_amount, note,
+            NULL, 'outbound_history', id, outbound_date
+        FROM outbound_history
+    """,
+    "inbound_history": """
+        INSERT IGNORE INTO stock_movements (
+            movement_type, consumable_id, code, name, quantity,
+            employee_id, employee_name, employee_department, department_id, unit_price, total_amount, note,
+            inbound_type, source_table, source_id, moved_at
+        )
+        SELECT
+            'inbound', consumable_id, code, name, quantity,
+            employee_id, employee_name, employee_department, department_id, unit_price, total_amount, note,
+            inbound_type, 'inbound_history', id, inbound_date
+        FROM inbound_history
+    """,
+}
+
+
+def backfill_stock_movements():
+    db = get_db_manager()
+
+    try:
+        for table, query in BACKFILL_QUERIES.items():
+            inserted = db.execute_update(query)
+            print(f"OK - {table} から {inserted} 件を取り込みました")
+
+        # 確認
+        result = db.execute_query(
+            """
+            SELECT source_table, COUNT(*) AS count
+            FROM stock_movements
+            GROUP BY source_table
+            """
+        )
+        print("\n取り込み後の件数:")
+        print("=" * 60)
+        for _, row in result.iterrows():
+            print(f"  {row['source_table']}: {row['count']} 件")
+
+    except Exception as e:
+        print(f"ERROR - {e}")
+
+
+if __name__ == "__main__":
+    backfill_stock_movements()
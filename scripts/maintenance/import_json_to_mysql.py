@@ -10,6 +10,8 @@ from pathlib import Path
 import pymysql
 from dotenv import load_dotenv
 
+from utils.stock_utils import REFRESH_NEEDS_REORDER_SQL
+
 # .envファイルから環境変数を読み込み
 load_dotenv()
 
@@ -117,6 +119,8 @@ def import_consumables():
                 except Exception as e:
                     print(f"[WARN] データ登録エラー [{item.get('コード', 'N/A')}]: {e}")
 
+            # 在庫数・安全在庫を取り込んだため発注要否を再計算
+            cursor.execute(REFRESH_NEEDS_REORDER_SQL)
             conn.commit()
             print(f"[OK] {success_count}件の消耗品を登録しました")
 
@@ -11,6 +11,8 @@ import openpyxl
 import pymysql
 from dotenv import load_dotenv
 
+from utils.stock_utils import REFRESH_NEEDS_REORDER_SQL
+
 # .envファイルから環境変数を読み込み
 load_dotenv()
 
@@ -126,6 +128,8 @@ def import_consumables(xlsx_path: Path):
                 except Exception as e:
                     print(f"  [WARN] 登録エラー [{code}]: {e}")
 
+            # 在庫数・安全在庫を取り込んだため発注要否を再計算
+            cursor.execute(REFRESH_NEEDS_REORDER_SQL)
             conn.commit()
 
             if skipped_items:
@@ -0,0 +1,90 @@
+"""
+アプリ起動時のモジュール読み込み時間を計測する
+
+python -X importtime で app を読み込み、パッケージごとの読み込み時間（自己時間の合計）と
+時間のかかったモジュール（累積時間）を表示する。gunicorn のワーカー起動が遅いときの調査用。
+OpenCV・ReportLab など初回利用時に読み込むライブラリが起動時に読み込まれていれば警告する。
+
+実行方法: python scripts/maintenance/profile_startup.py [--top 20] [--module app]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+
+# 起動時には読み込まず、初回利用時に読み込むライブラリ
+LAZY_PACKAGES = ("cv2", "PIL", "reportlab", "markdown")
+
+
+def run_importtime(module: str) -> tuple[subprocess.CompletedProcess, float]:
+    """別プロセスで -X importtime を付けてモジュールを読み込む"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BASE_DIR), env.get("PYTHONPATH")]))
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    return result, time.perf_counter() - started
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """importtime の出力を (モジュール名, 自己時間[us], 累積時間[us]) のリストにする"""
+    rows = []
+    for line in stderr.splitlines():
+        # 形式: "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def profile_startup(module: str, top: int):
+    result, elapsed = run_importtime(module)
+    rows = parse_importtime(result.stderr)
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        print(f"ERROR - {module} の読み込みに失敗しました")
+        print("\n".join(errors[-10:]))
+        return
+
+    total_us = next((cumulative for name, _self, cumulative in rows if name == module), 0)
+    print(f"OK - import {module}: {total_us / 1000:.1f} ms（インタープリター起動を含むプロセス全体 {elapsed:.2f} 秒）")
+
+    by_package: dict[str, int] = defaultdict(int)
+    for name, self_us, _cumulative in rows:
+        by_package[name.split(".")[0]] += self_us
+
+    print(f"\nパッケージ別の読み込み時間（上位{top}件）:")
+    for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {package:<32} {self_us / 1000:8.1f} ms")
+
+    print(f"\n累積時間の長いモジュール（上位{top}件）:")
+    for name, _self_us, cumulative_us in sorted(rows, key=lambda row: row[2], reverse=True)[:top]:
+        print(f"  {name:<48} {cumulative_us / 1000:8.1f} ms")
+
+    # 確認
+    loaded = sorted(package for package in LAZY_PACKAGES if package in by_package)
+    if loaded:
+        print(f"\n警告: 初回利用時に読み込む想定のライブラリが起動時に読み込まれています: {', '.join(loaded)}")
+    else:
+        print(f"\n  起動時に読み込まれていないこと: {', '.join(LAZY_PACKAGES)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="起動時のモジュール読み込み時間を計測")
+    parser.add_argument("--module", default="app", help="読み込むモジュール（既定: app）")
+    parser.add_argument("--top", type=int, default=20, help="表示する件数")
+    args = parser.parse_args()
+    profile_startup(args.module, args.top)
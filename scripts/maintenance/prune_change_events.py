@@ -0,0 +1,32 @@
+"""
+配信済みの古い変更イベント（change_events）を削除する
+
+SSE の再接続で必要になるのは直近のイベントだけのため、
+EVENTS_RETENTION_HOURS（既定24時間）より古いものを削除する。cron などで定期実行する。
+"""
+import config
+from database_manager import get_db_manager
+
+
+def prune_change_events():
+    db = get_db_manager()
+
+    try:
+        deleted = db.execute_update(
+            "DELETE FROM change_events WHERE created_at < NOW() - INTERVAL :hours HOUR",
+            {"hours": config.EVENTS_RETENTION_HOURS},
+        )
+        print(f"OK - {config.EVENTS_RETENTION_HOURS}時間より古い変更イベントを {deleted} 件削除しました")
+
+        # 確認
+        result = db.execute_query("SELECT COUNT(*) AS count, MIN(created_at) AS oldest FROM change_events")
+        if not result.empty:
+            row = result.iloc[0]
+            print(f"  残り: {row['count']} 件（最古: {row['oldest']}）")
+
+    except Exception as e:
+        print(f"ERROR - {e}")
+
+
+if __name__ == "__main__":
+    prune_change_events()
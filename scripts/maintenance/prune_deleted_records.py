@@ -0,0 +1,33 @@
+"""
+差分同期用の古い削除記録（deleted_records）を削除する
+
+INVENTORY_SYNC_TOMBSTONE_DAYS（既定30日）より古い同期トークンは
+/api/inventory が全件取得に切り替えるため、それより古い削除記録は不要になる。cron などで定期実行する。
+"""
+import config
+from database_manager import get_db_manager
+
+
+def prune_deleted_records():
+    db = get_db_manager()
+
+    try:
+        deleted = db.execute_update(
+            "DELETE FROM deleted_records WHERE deleted_at < NOW() - INTERVAL :days DAY",
+            {"days": config.INVENTORY_SYNC_TOMBSTONE_DAYS},
+        )
+        print(f"OK - {config.INVENTORY_SYNC_TOMBSTONE_DAYS}日より古い削除記録を {deleted} 件削除しました")
+
+        # 確認
+        result = db.execute_query(
+            "SELECT table_name, COUNT(*) AS count FROM deleted_records GROUP BY table_name ORDER BY table_name"
+        )
+        for _, row in result.iterrows():
+            print(f"  {row['table_name']}: {row['count']} 件")
+
+    except Exception as e:
+        print(f"ERROR - {e}")
+
+
+if __name__ == "__main__":
+    prune_deleted_records()
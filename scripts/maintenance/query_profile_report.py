@@ -0,0 +1,81 @@
+"""
+SQLプロファイラーの集計（フィンガープリント別の件数・合計・p95・最大）を表示する
+
+QUERY_PROFILER_ENABLED=true で動いている各ワーカーが QUERY_PROFILE_DIR に書き出した
+query_profile_<pid>.json をまとめ、時間のかかっているSQLとスロークエリ（EXPLAIN 付き）を表示する。
+
+実行方法: python scripts/maintenance/query_profile_report.py [--sort total_ms] [--top 20] [--slow 5] [--json] [--clear]
+"""
+import argparse
+import json
+
+import config
+from utils import query_profiler
+from utils.query_profiler import build_report, load_snapshots
+
+SORT_KEYS = ("total_ms", "count", "p95_ms", "max_ms", "avg_ms")
+
+
+def print_report(report: dict, slow_limit: int):
+    print(
+        f"OK - ワーカー {len(report['workers'])} 件・フィンガープリント {report['fingerprints']} 件"
+        f"（スロークエリの閾値 {report['slow_threshold_ms']:.0f} ms）"
+    )
+
+    print(f"\n{'件数':>8} {'エラー':>6} {'合計[ms]':>12} {'平均[ms]':>10} {'p95[ms]':>10} {'最大[ms]':>10}  SQL")
+    for row in report["queries"]:
+        print(
+            f"{row['count']:>8} {row['errors']:>6} {row['total_ms']:>12.1f} {row['avg_ms']:>10.2f}"
+            f" {row['p95_ms']:>10.2f} {row['max_ms']:>10.2f}  {row['fingerprint'][:160]}"
+        )
+
+    if slow_limit <= 0:
+        return
+    print(f"\nスロークエリ（新しい順に{slow_limit}件）:")
+    for entry in report["slow"][:slow_limit]:
+        print(f"  [{entry['at']}] {entry['duration_ms']} ms: {entry['statement'][:300]}")
+        print(f"    Params: {entry['params']}")
+        explain = entry.get("explain")
+        if isinstance(explain, list):
+            for plan in explain:
+                print(
+                    f"    EXPLAIN: table={plan.get('table')} type={plan.get('type')} key={plan.get('key')}"
+                    f" rows={plan.get('rows')} Extra={plan.get('Extra')}"
+                )
+        elif explain:
+            print(f"    EXPLAIN: {explain}")
+
+
+def clear_dumps():
+    count = query_profiler.clear_dumps()
+    print(f"OK - {count} 件の集計ファイルを削除しました（{config.QUERY_PROFILE_DIR}）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLプロファイラーの集計を表示")
+    parser.add_argument("--sort", choices=SORT_KEYS, default="total_ms", help="並び順（既定: 合計時間）")
+    parser.add_argument("--top", type=int, default=20, help="表示するフィンガープリントの件数")
+    parser.add_argument("--slow", type=int, default=5, help="表示するスロークエリの件数")
+    parser.add_argument("--json", action="store_true", help="レポートをJSONで出力")
+    parser.add_argument("--clear", action="store_true", help="書き出された集計ファイルを削除")
+    args = parser.parse_args()
+
+    if args.clear:
+        clear_dumps()
+        return
+
+    snapshots = load_snapshots()
+    if not snapshots:
+        print(f"ERROR - 集計ファイルがありません（{config.QUERY_PROFILE_DIR}）")
+        print("  QUERY_PROFILER_ENABLED=true でアプリを起動してください")
+        return
+
+    report = build_report(snapshots, sort=args.sort, top=args.top)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2, default=str))
+    else:
+        print_report(report, args.slow)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+在庫移動台帳（stock_movements）から日次集計（consumption_daily）を作り直す
+
+通常は入出庫の記録時に加算されるため不要。
+台帳のバックフィル後や、集計とずれが疑われる場合に実行する。
+"""
+from sqlalchemy import text
+
+from database_manager import get_db_manager
+from utils.date_utils import jst_date_sql
+
+REBUILD_QUERY = f"""
+    INSERT INTO consumption_daily (
+        stat_date, consumable_id, department, movement_type, quantity, amount, movement_count
+    )
+    SELECT
+        {jst_date_sql("moved_at")} AS stat_date,
+        consumable_id,
+        COALESCE(employee_department, '') AS department,
+        movement_type,
+        SUM(ABS(quantity)),
+        COALESCE(SUM(total_amount), 0),
+        COUNT(*)
+    FROM stock_movements
+    GROUP BY stat_date, consumable_id, department, movement_type
+"""
+
+
+def rebuild_consumption_daily():
+    db = get_db_manager()
+
+    try:
+        with db.transaction() as session:
+            session.execute(text("DELETE FROM consumption_daily"))
+            inserted = session.execute(text(REBUILD_QUERY)).rowcount
+        print(f"OK - 日次集計を {inserted} 行で作り直しました")
+
+        # 確認
+        result = db.execute_query(
+            """
+            SELECT movement_type, MIN(stat_date) AS first_date, MAX(stat_date) AS last_date,
+                   SUM(quantity) AS quantity, SUM(movement_count) AS count
+            FROM consumption_daily
+            GROUP BY movement_type
+            """
+        )
+        print("\n集計後の状態:")
+        print("=" * 60)
+        for _, row in result.iterrows():
+            print(
+                f"  {row['movement_type']}: {row['first_date']} 〜 {row['last_date']}, "
+                f"数量 {row['quantity']}, 件数 {row['count']}"
+            )
+
+    except Exception as e:
+        print(f"ERROR - {e}")
+
+
+if __name__ == "__main__":
+    rebuild_consumption_daily()
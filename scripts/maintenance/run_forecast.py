@@ -0,0 +1,56 @@
+"""
+全消耗品の消費予測（発注点・推奨発注数）を算出する
+
+日次集計（consumption_daily）の出庫実績から、移動平均と指数平滑で1日あたりの
+消費量を求め、購入先のリードタイムを加味して consumable_forecasts を更新する。
+cron などで1日1回の実行を想定。
+
+使い方:
+    python scripts/maintenance/run_forecast.py
+    python scripts/maintenance/run_forecast.py --history-days 180
+"""
+import argparse
+import time
+
+from database_manager import get_db_manager
+from utils.forecast_utils import run_forecast
+
+
+def main():
+    parser = argparse.ArgumentParser(description="消耗品の消費予測を更新します")
+    parser.add_argument("--history-days", type=int, default=None, help="予測に使う出庫実績の日数")
+    args = parser.parse_args()
+
+    db = get_db_manager()
+
+    try:
+        started = time.perf_counter()
+        count = run_forecast(db, history_days=args.history_days)
+        elapsed = time.perf_counter() - started
+        print(f"OK - {count} 件の消費予測を更新しました（{elapsed:.2f}秒）")
+
+        # 確認
+        result = db.execute_query(
+            """
+            SELECT c.code, c.name, c.stock_quantity, f.daily_rate, f.reorder_point, f.order_quantity, f.days_of_stock
+            FROM consumable_forecasts f
+            JOIN consumables c ON f.consumable_id = c.id
+            WHERE c.stock_quantity <= f.reorder_point
+            ORDER BY f.days_of_stock IS NULL, f.days_of_stock
+            LIMIT 20
+            """
+        )
+        print("\n発注点を下回っている消耗品（最大20件）:")
+        print("=" * 60)
+        for _, row in result.iterrows():
+            print(
+                f"  {row['code']} {row['name']}: 在庫 {row['stock_quantity']} / 発注点 {row['reorder_point']}"
+                f"（消費 {row['daily_rate']}/日, 推奨発注数 {row['order_quantity']}）"
+            )
+
+    except Exception as e:
+        print(f"ERROR - {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+主要クエリの実行計画（EXPLAIN）を確認するスクリプト
+
+routes/ の頻出クエリと同じ形のSQLを EXPLAIN し、
+フルテーブルスキャン（type = ALL）になっているものを報告する。
+行数が少ないテーブルではオプティマイザがあえてフルスキャンを選ぶため、
+--min-rows 未満のテーブルは判定対象外とする。
+
+使い方:
+    python scripts/setup/check_query_plans.py
+    python scripts/setup/check_query_plans.py --min-rows 0 --verbose
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime, timedelta
+
+from migrate import get_connection
+
+_NOW = datetime.now()
+_MONTH_AGO = _NOW - timedelta(days=30)
+
+# EXPLAIN の table 列に出るエイリアスと実テーブル名の対応
+TABLE_ALIASES = {
+    "o": "orders",
+    "s": "suppliers",
+    "do": "dispatch_orders",
+    "ih": "inbound_history",
+    "ur": "user_roles",
+    "r": "roles",
+    "c": "consumables",
+}
+
+# (名前, SQL, パラメータ)  ※ pymysql の %(name)s 形式
+HOT_QUERIES: list[tuple[str, str, dict]] = [
+    (
+        "orders.status IN ... ORDER BY requested_date（/api/orders/pending）",
+        """
+        SELECT o.id, s.name FROM orders o
+        LEFT JOIN suppliers s ON o.supplier_id = s.id
+        WHERE o.status IN ('依頼中', '発注準備')
+        ORDER BY o.requested_date DESC
+        """,
+        {},
+    ),
+    (
+        "orders.status = 発注準備（/api/dispatch/items）",
+        "SELECT o.id FROM orders o WHERE o.status = '発注準備'",
+        {},
+    ),
+    (
+        "orders.consumable_id + status（/api/inventory 発注済み注文）",
+        """
+        SELECT o.consumable_id, o.ordered_date FROM orders o
+        WHERE o.consumable_id IN (1, 2, 3) AND o.status = '発注済'
+        ORDER BY o.ordered_date DESC
+        """,
+        {},
+    ),
+    (
+        "orders.requested_date 範囲（/api/orders 日付絞り込み）",
+        "SELECT o.id FROM orders o WHERE o.requested_date >= %(start)s AND o.requested_date < %(end)s",
+        {"start": _MONTH_AGO, "end": _NOW},
+    ),
+    (
+        "dispatch_orders.status + created_at（/api/dispatch/orders）",
+        """
+        SELECT do.id FROM dispatch_orders do
+        WHERE do.status != '入庫済み'
+        ORDER BY do.created_at DESC
+        """,
+        {},
+    ),
+    (
+        "dispatch_orders.supplier_id + created_at（当日の注文書数）",
+        """
+        SELECT COUNT(*) FROM dispatch_orders
+        WHERE supplier_id = 1 AND created_at >= %(start)s AND created_at <= %(end)s
+        """,
+        {"start": _NOW.replace(hour=0, minute=0, second=0, microsecond=0), "end": _NOW},
+    ),
+    (
+        "dispatch_order_items.dispatch_order_id（注文書明細）",
+        "SELECT name, quantity, unit FROM dispatch_order_items WHERE dispatch_order_id = 1 ORDER BY name",
+        {},
+    ),
+    (
+        "inbound_history.consumable_id + inbound_date（/api/inventory 入庫詳細）",
+        """
+        SELECT ih.consumable_id, ih.inbound_date FROM inbound_history ih
+        WHERE ih.consumable_id IN (1, 2, 3)
+        ORDER BY ih.inbound_date DESC
+        """,
+        {},
+    ),
+    (
+        "outbound_history.outbound_date 範囲（/api/history）",
+        """
+        SELECT id FROM outbound_history
+        WHERE outbound_date >= %(start)s AND outbound_date < %(end)s
+        """,
+        {"start": _MONTH_AGO, "end": _NOW},
+    ),
+    (
+        "stock_movements.moved_at 範囲（/api/history）",
+        """
+        SELECT id FROM stock_movements
+        WHERE moved_at >= %(start)s AND moved_at < %(end)s
+        ORDER BY moved_at DESC, id DESC LIMIT 1000
+        """,
+        {"start": _MONTH_AGO, "end": _NOW},
+    ),
+    (
+        "stock_movements.consumable_id + moved_at（品目別の入出庫推移）",
+        """
+        SELECT id, quantity, stock_after FROM stock_movements
+        WHERE consumable_id = 1
+        ORDER BY moved_at DESC, id DESC LIMIT 200
+        """,
+        {},
+    ),
+    (
+        "consumption_daily.movement_type + stat_date（/api/reports/consumption）",
+        """
+        SELECT department, SUM(quantity) FROM consumption_daily
+        WHERE movement_type = 'outbound' AND stat_date >= %(start)s AND stat_date <= %(end)s
+        GROUP BY department
+        """,
+        {"start": _MONTH_AGO.date(), "end": _NOW.date()},
+    ),
+    (
+        "consumables.needs_reorder + order_status（/api/check-low-stock）",
+        """
+        SELECT c.id FROM consumables c
+        WHERE c.needs_reorder = 1 AND c.order_status != '発注済'
+        """,
+        {},
+    ),
+    (
+        "orders.updated_at（/api/inventory?updated_since）",
+        """
+        SELECT consumable_id FROM orders WHERE updated_at >= %(since)s
+        """,
+        {"since": _NOW - timedelta(minutes=5)},
+    ),
+    (
+        "stock_movements.department_id + moved_at（/api/history?department_id）",
+        """
+        SELECT id FROM stock_movements
+        WHERE department_id = %(department_id)s AND moved_at >= %(start)s
+        ORDER BY moved_at DESC LIMIT 1000
+        """,
+        {"department_id": 1, "start": _MONTH_AGO},
+    ),
+    (
+        "user_roles.user_id（権限チェック）",
+        """
+        SELECT r.role_name FROM user_roles ur
+        JOIN roles r ON ur.role_id = r.id
+        WHERE ur.user_id = 1
+        """,
+        {},
+    ),
+    (
+        "consumables.name 全文検索（/api/inventory 品名検索）",
+        """
+        SELECT c.id FROM consumables c
+        WHERE MATCH(c.name) AGAINST('+"テープ"' IN BOOLEAN MODE)
+        """,
+        {},
+    ),
+]
+
+
+def fetch_table_rows(conn) -> dict[str, int]:
+    """テーブルごとの推定行数を取得"""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT TABLE_NAME, TABLE_ROWS FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE()
+            """
+        )
+        return {row["TABLE_NAME"]: int(row["TABLE_ROWS"] or 0) for row in cursor.fetchall()}
+
+
+def explain(conn, sql: str, params: dict) -> list[dict]:
+    with conn.cursor() as cursor:
+        cursor.execute("EXPLAIN " + sql, params or None)
+        return list(cursor.fetchall())
+
+
+def check_query_plans(min_rows: int = 1000, verbose: bool = False) -> int:
+    """全ての主要クエリを確認し、インデックスを使わないクエリの件数を返す"""
+    conn = get_connection()
+    try:
+        table_rows = fetch_table_rows(conn)
+        violations = 0
+
+        for name, sql, params in HOT_QUERIES:
+            try:
+                plan = explain(conn, sql, params)
+            except Exception as e:
+                print(f"[ERROR] {name}: {e}")
+                violations += 1
+                continue
+
+            problems = []
+            for row in plan:
+                table = TABLE_ALIASES.get(row.get("table"), row.get("table"))
+                if row.get("type") != "ALL":
+                    continue
+                if table_rows.get(table, 0) < min_rows:
+                    continue
+                problems.append(f"{table}（推定{table_rows.get(table, 0)}行）をフルスキャン")
+
+            if problems:
+                violations += 1
+                print(f"[NG] {name}")
+                for problem in problems:
+                    print(f"     - {problem}")
+            else:
+                print(f"[OK] {name}")
+
+            if verbose or problems:
+                for row in plan:
+                    print(
+                        f"     table={row.get('table')} type={row.get('type')} "
+                        f"key={row.get('key')} rows={row.get('rows')} extra={row.get('Extra')}"
+                    )
+
+        print("\n" + "=" * 60)
+        if violations:
+            print(f"[NG] インデックスを使わないクエリが {violations} 件あります")
+        else:
+            print("[OK] 全ての主要クエリがインデックスを使用しています")
+        return violations
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="主要クエリの実行計画を確認します")
+    parser.add_argument("--min-rows", type=int, default=1000, help="判定対象とするテーブルの最小推定行数")
+    parser.add_argument("--verbose", action="store_true", help="全クエリの実行計画を表示する")
+    args = parser.parse_args()
+
+    violations = check_query_plans(min_rows=args.min_rows, verbose=args.verbose)
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
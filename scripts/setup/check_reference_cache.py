@@ -0,0 +1,187 @@
+"""
+マスターデータのキャッシュ（utils.cache）の動作を確認する
+
+既定では Redis の代わりにプロセス内の FakeRedis（get / set ex / delete / incr / scan_iter のみ）を使い、
+RedisCache の保存・取得・TTL・名前空間の無効化と、2つのワーカーから同じサーバーを使った場合の
+無効化の共有を確認する。プロセス内キャッシュ（LocalTTLCache）が DB のバージョンを指定した場合だけ
+使われることも確認する。--url を指定すると実際の Redis / Valkey サーバーで同じ確認を行う
+（キーの接頭辞は確認用のものに切り替え、最後に削除する）。
+
+実行方法: python scripts/setup/check_reference_cache.py [--url redis://localhost:6379/15]
+"""
+import argparse
+import fnmatch
+import sys
+import time
+import uuid
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT_DIR))
+
+import config
+from utils import cache
+
+
+class FakeRedis:
+    """Redis クライアントのスタンドイン（utils.cache.RedisCache が使うコマンドのみ）"""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._data: dict[str, tuple[bytes, float | None]] = {}
+
+    def _alive(self, key: str):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self._clock():
+            del self._data[key]
+            return None
+        return value
+
+    def get(self, key: str):
+        return self._alive(key)
+
+    def set(self, key: str, value, ex: int | None = None):
+        if isinstance(value, int):
+            value = str(value).encode()
+        self._data[key] = (value, self._clock() + ex if ex else None)
+        return True
+
+    def delete(self, *keys: str) -> int:
+        return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def incr(self, key: str) -> int:
+        value = int(self._alive(key) or 0) + 1
+        expires_at = self._data[key][1] if key in self._data else None
+        self._data[key] = (str(value).encode(), expires_at)
+        return value
+
+    def scan_iter(self, pattern: str):
+        return [key for key in list(self._data) if self._alive(key) is not None and fnmatch.fnmatchcase(key, pattern)]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+failures = 0
+
+
+def check(label: str, condition: bool, detail: str = ""):
+    global failures
+    if condition:
+        print(f"OK - {label}")
+    else:
+        failures += 1
+        print(f"ERROR - {label}{f'（{detail}）' if detail else ''}")
+
+
+def check_backend(make_backend, advance):
+    """RedisCache の保存・取得・TTL・無効化（make_backend はワーカーごとのバックエンドを作る）"""
+    worker_a, worker_b = make_backend(), make_backend()
+    prefix = config.REFERENCE_CACHE_PREFIX
+
+    worker_a.set(f"{prefix}:plain", {"value": [1, 2, 3]}, 60)
+    check("set / get", worker_b.get(f"{prefix}:plain") == {"value": [1, 2, 3]})
+    check("未登録のキーは既定値", worker_b.get(f"{prefix}:missing", "default") == "default")
+
+    worker_a.delete(f"{prefix}:plain")
+    check("delete", worker_b.get(f"{prefix}:plain") is None)
+
+    version_key = f"{prefix}:ns:check"
+    check("incr（初回は1）", worker_a.incr(version_key) == 1)
+    check("incr の値を別のワーカーから取得", worker_b.version(version_key) == 1)
+
+    worker_a.set(f"{prefix}:short", "x", 1)
+    advance(1.5)
+    check("TTL を過ぎたキーは消える", worker_b.get(f"{prefix}:short") is None)
+
+    # cached / invalidate は get_cache() を使うため、ワーカーごとに差し替えて確認する
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return [{"id": len(loads)}]
+
+    cache.set_cache_backend(worker_a)
+    first = cache.cached("check", "list", loader)
+    cache.set_cache_backend(worker_b)
+    second = cache.cached("check", "list", loader)
+    check("別のワーカーでもキャッシュを共有", first == second and len(loads) == 1, f"読み込み {len(loads)} 回")
+
+    cache.set_cache_backend(worker_a)
+    cache.invalidate("check")
+    cache.set_cache_backend(worker_b)
+    third = cache.cached("check", "list", loader)
+    check("invalidate が別のワーカーにも効く", third == [{"id": 2}] and len(loads) == 2, f"読み込み {len(loads)} 回")
+
+    cache.cached("check", "empty", lambda: [])
+    advance(cache.EMPTY_TTL_SECONDS + 1)
+    reloaded = []
+    cache.cached("check", "empty", lambda: reloaded.append(1) or [])
+    check("空の結果は EMPTY_TTL_SECONDS で期限切れ", len(reloaded) == 1)
+
+    worker_a.clear()
+    check("clear で接頭辞のキーを削除", worker_b.version(version_key) == 0)
+
+
+def check_local_backend():
+    """プロセス内キャッシュは DB のバージョンを指定した場合だけ使う"""
+    cache.set_cache_backend(cache.LocalTTLCache(16))
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return len(loads)
+
+    cache.cached("check", "list", loader)
+    cache.cached("check", "list", loader)
+    check("バージョンなしはキャッシュしない", len(loads) == 2, f"読み込み {len(loads)} 回")
+
+    loads.clear()
+    cache.cached("check", "list", loader, version="v1")
+    cache.cached("check", "list", loader, version="v1")
+    check("同じバージョンはキャッシュを使う", len(loads) == 1, f"読み込み {len(loads)} 回")
+    cache.cached("check", "list", loader, version="v2")
+    check("バージョンが変わると読み直す", len(loads) == 2, f"読み込み {len(loads)} 回")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="マスターデータのキャッシュの動作確認")
+    parser.add_argument("--url", help="確認に使う Redis サーバー（省略時は FakeRedis）")
+    args = parser.parse_args()
+
+    original_prefix = config.REFERENCE_CACHE_PREFIX
+    config.REFERENCE_CACHE_PREFIX = f"check-{uuid.uuid4().hex[:8]}"
+    try:
+        if args.url:
+            print(f"Redis サーバー: {args.url}")
+            check_backend(lambda: cache.RedisCache(args.url), time.sleep)
+            cache.RedisCache(args.url).clear()
+        else:
+            print("Redis サーバー: FakeRedis（--url で実際のサーバーを確認）")
+            clock = FakeClock()
+            server = FakeRedis(clock)
+
+            def advance(seconds: float):
+                clock.now += seconds
+
+            check_backend(lambda: cache.RedisCache(client=server), advance)
+        check_local_backend()
+    finally:
+        config.REFERENCE_CACHE_PREFIX = original_prefix
+        cache.set_cache_backend(None)
+
+    print()
+    print("OK - すべての確認に成功しました" if failures == 0 else f"ERROR - {failures} 件の確認に失敗しました")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+バージョン管理されたスキーママイグレーションを適用するスクリプト
+
+init.sql をベースライン（バージョン 0000）として実行したあと、
+migrations/ 配下の「<4桁の番号>_<名前>.sql」を番号順に適用し、
+適用済みのバージョンを schema_migrations テーブルに記録する。
+
+使い方:
+    python scripts/setup/migrate.py            # 未適用のマイグレーションを適用
+    python scripts/setup/migrate.py --status   # 適用状況を表示
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import re
+import time
+from pathlib import Path
+
+import pymysql
+from dotenv import load_dotenv
+
+BASE_DIR = Path(__file__).resolve().parent
+ROOT_DIR = BASE_DIR.parents[1]
+MIGRATIONS_DIR = BASE_DIR / "migrations"
+BASELINE_FILE = BASE_DIR / "init.sql"
+BASELINE_VERSION = "0000"
+
+load_dotenv(dotenv_path=ROOT_DIR / ".env", override=False)
+
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d{4})_(.+)\.sql$")
+
+# 既に適用済みの状態とみなしてスキップするMySQLエラー
+#   1060: Duplicate column name / 1061: Duplicate key name / 1091: Can't DROP; check that it exists
+IGNORABLE_ERROR_CODES = {1060, 1061, 1091}
+
+SCHEMA_MIGRATIONS_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version VARCHAR(20) NOT NULL PRIMARY KEY COMMENT 'バージョン',
+        name VARCHAR(255) NOT NULL COMMENT 'マイグレーション名',
+        checksum CHAR(64) NOT NULL COMMENT 'SQLファイルのSHA-256',
+        execution_ms INT COMMENT '実行時間（ミリ秒）',
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '適用日時'
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='スキーママイグレーション履歴'
+"""
+
+
+def get_connection():
+    """マイグレーション対象データベースへの接続を取得"""
+    return pymysql.connect(
+        host=os.getenv("INVENTORY_DB_HOST", "localhost"),
+        user=os.getenv("INVENTORY_DB_USER", "root"),
+        password=os.getenv("PRIMARY_DB_PASSWORD") or os.getenv("INVENTORY_DB_PASSWORD", ""),
+        port=int(os.getenv("INVENTORY_DB_PORT", "3306")),
+        database=os.getenv("INVENTORY_DB_NAME", "inventory_db"),
+        charset="utf8mb4",
+        cursorclass=pymysql.cursors.DictCursor,
+    )
+
+
+def split_sql_statements(sql_script: str) -> list[str]:
+    """
+    SQLスクリプトを文単位に分割する
+
+    文字列リテラル・識別子クォート内の「;」やコメント（-- / # / /* */）を正しく扱う。
+    """
+    statements: list[str] = []
+    current: list[str] = []
+    quote: str | None = None
+    i = 0
+    length = len(sql_script)
+
+    while i < length:
+        ch = sql_script[i]
+        nxt = sql_script[i + 1] if i + 1 < length else ""
+
+        if quote:
+            current.append(ch)
+            if ch == "\\" and quote != "`" and nxt:
+                current.append(nxt)
+                i += 2
+                continue
+            if ch == quote:
+                if nxt == quote:
+                    # '' のようなエスケープされたクォート
+                    current.append(nxt)
+                    i += 2
+                    continue
+                quote = None
+            i += 1
+            continue
+
+        if ch in ("'", '"', "`"):
+            quote = ch
+            current.append(ch)
+        elif (ch == "-" and nxt == "-" and (i + 2 >= length or sql_script[i + 2] in " \t\r\n")) or ch == "#":
+            # 行末までのコメントを読み飛ばす
+            newline = sql_script.find("\n", i)
+            i = length if newline == -1 else newline
+            continue
+        elif ch == "/" and nxt == "*":
+            end = sql_script.find("*/", i + 2)
+            i = length if end == -1 else end + 2
+            continue
+        elif ch == ";":
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+
+    statement = "".join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def discover_migrations() -> list[tuple[str, str, Path]]:
+    """migrations/ 配下のマイグレーションを (バージョン, 名前, パス) の番号順で返す"""
+    migrations = [(BASELINE_VERSION, "initial_schema", BASELINE_FILE)]
+    seen = {BASELINE_VERSION}
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        match = MIGRATION_FILE_PATTERN.match(path.name)
+        if not match:
+            print(f"[SKIP] 命名規則に合わないファイル: {path.name}")
+            continue
+        version, name = match.groups()
+        if version in seen:
+            raise ValueError(f"マイグレーション番号が重複しています: {version}")
+        seen.add(version)
+        migrations.append((version, name, path))
+    return migrations
+
+
+def _checksum(sql_script: str) -> str:
+    return hashlib.sha256(sql_script.encode("utf-8")).hexdigest()
+
+
+def fetch_applied(conn) -> dict[str, dict]:
+    """適用済みのマイグレーションを取得"""
+    with conn.cursor() as cursor:
+        cursor.execute(SCHEMA_MIGRATIONS_SQL)
+        cursor.execute("SELECT version, name, checksum, applied_at FROM schema_migrations ORDER BY version")
+        return {row["version"]: row for row in cursor.fetchall()}
+
+
+def apply_migration(conn, version: str, name: str, path: Path) -> None:
+    """1つのマイグレーションを適用して履歴に記録する"""
+    sql_script = path.read_text(encoding="utf-8")
+    started = time.perf_counter()
+
+    with conn.cursor() as cursor:
+        for statement in split_sql_statements(sql_script):
+            try:
+                cursor.execute(statement)
+            except pymysql.err.MySQLError as e:
+                code = e.args[0] if e.args else None
+                if code in IGNORABLE_ERROR_CODES:
+                    print(f"[SKIP] 適用済みのためスキップ: {str(e)[:100]}")
+                    continue
+                print(f"[ERROR] SQL実行エラー: {e}")
+                print(f"   Statement: {statement[:200]}...")
+                raise
+
+        execution_ms = int((time.perf_counter() - started) * 1000)
+        cursor.execute(
+            """
+            INSERT INTO schema_migrations (version, name, checksum, execution_ms)
+            VALUES (%s, %s, %s, %s)
+            """,
+            (version, name, _checksum(sql_script), execution_ms),
+        )
+    conn.commit()
+    print(f"[OK] {version}_{name} を適用しました（{execution_ms}ms）")
+
+
+def run_migrations(conn=None) -> int:
+    """未適用のマイグレーションを番号順に適用し、適用件数を返す"""
+    own_connection = conn is None
+    if own_connection:
+        conn = get_connection()
+
+    try:
+        applied = fetch_applied(conn)
+        count = 0
+        for version, name, path in discover_migrations():
+            if version in applied:
+                continue
+            apply_migration(conn, version, name, path)
+            count += 1
+
+        if count == 0:
+            print("[OK] 適用するマイグレーションはありません")
+        return count
+    finally:
+        if own_connection:
+            conn.close()
+
+
+def show_status(conn=None) -> None:
+    """マイグレーションの適用状況を表示"""
+    own_connection = conn is None
+    if own_connection:
+        conn = get_connection()
+
+    try:
+        applied = fetch_applied(conn)
+        for version, name, path in discover_migrations():
+            record = applied.get(version)
+            if not record:
+                print(f"[未適用] {version}_{name}")
+                continue
+            status = "適用済"
+            if record["checksum"] != _checksum(path.read_text(encoding="utf-8")):
+                status = "適用済（適用後にファイルが変更されています）"
+            print(f"[{status}] {version}_{name}  {record['applied_at']}")
+    finally:
+        if own_connection:
+            conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="スキーママイグレーションを適用します")
+    parser.add_argument("--status", action="store_true", help="適用状況のみ表示する")
+    args = parser.parse_args()
+
+    if args.status:
+        show_status()
+    else:
+        run_migrations()
+
+
+if __name__ == "__main__":
+    main()
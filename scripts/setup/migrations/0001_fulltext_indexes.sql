@@ -0,0 +1,22 @@
+-- 品名検索用の全文検索インデックス（ngramパーサー）を追加するマイグレーション
+-- 実行方法: python scripts/setup/migrate.py
+--
+-- LIKE '%...%' の前方ワイルドカード検索はインデックスを使えないため、
+-- 日本語の品名に対応した ngram パーサーの FULLTEXT インデックスで MATCH ... AGAINST 検索する。
+-- 1文字検索など ngram_token_size（既定2）未満の語は、アプリ側でLIKE検索にフォールバックする。
+-- MATCH() のカラム構成はインデックスと完全一致している必要がある（utils/search_utils.py 参照）。
+
+-- 在庫一覧: c.name
+ALTER TABLE consumables
+    ADD FULLTEXT INDEX ft_consumables_name (name) WITH PARSER ngram;
+
+-- 注文依頼一覧: o.code, o.name
+ALTER TABLE orders
+    ADD FULLTEXT INDEX ft_orders_code_name (code, name) WITH PARSER ngram;
+
+-- 入出庫履歴: name, employee_name
+ALTER TABLE outbound_history
+    ADD FULLTEXT INDEX ft_outbound_name_employee (name, employee_name) WITH PARSER ngram;
+
+ALTER TABLE inbound_history
+    ADD FULLTEXT INDEX ft_inbound_name_employee (name, employee_name) WITH PARSER ngram;
@@ -0,0 +1,51 @@
+-- ルートの実際の検索条件に合わせた複合インデックスを追加するマイグレーション
+-- 実行方法: python scripts/setup/migrate.py
+--
+-- 複合インデックスの先頭カラムで代替できる単一カラムインデックスは削除する
+-- （外部キー用のインデックスも複合インデックスで代替される）。
+
+-- 注文依頼: status で絞り込み requested_date で並べる（/api/orders/pending, /api/dispatch/items）
+ALTER TABLE orders
+    ADD INDEX idx_orders_status_requested (status, requested_date);
+
+-- 注文依頼: consumable_id + status（在庫一覧の発注済み注文、入庫時のステータス更新）
+ALTER TABLE orders
+    ADD INDEX idx_orders_consumable_status (consumable_id, status);
+
+ALTER TABLE orders DROP INDEX idx_status;
+ALTER TABLE orders DROP INDEX idx_consumable_id;
+
+-- 注文書: status + created_at（/api/dispatch/orders の一覧）
+ALTER TABLE dispatch_orders
+    ADD INDEX idx_dispatch_orders_status_created (status, created_at);
+
+-- 注文書: supplier_id + created_at（当日の同一購入先の注文書数）
+ALTER TABLE dispatch_orders
+    ADD INDEX idx_dispatch_orders_supplier_created (supplier_id, created_at);
+
+ALTER TABLE dispatch_orders DROP INDEX idx_status;
+ALTER TABLE dispatch_orders DROP INDEX idx_supplier_id;
+
+-- 注文書明細: dispatch_order_id から consumable_id を引く副問い合わせをインデックスだけで解決する
+ALTER TABLE dispatch_order_items
+    ADD INDEX idx_dispatch_items_order_consumable (dispatch_order_id, consumable_id);
+
+ALTER TABLE dispatch_order_items DROP INDEX idx_dispatch_order_id;
+
+-- 入庫履歴: consumable_id + inbound_date（在庫一覧の入庫詳細）
+ALTER TABLE inbound_history
+    ADD INDEX idx_inbound_consumable_date (consumable_id, inbound_date);
+
+ALTER TABLE inbound_history DROP INDEX idx_consumable_id;
+
+-- 出庫履歴: 品目別の出庫推移（outbound_date 単体は idx_outbound_date を使用）
+ALTER TABLE outbound_history
+    ADD INDEX idx_outbound_consumable_date (consumable_id, outbound_date);
+
+ALTER TABLE outbound_history DROP INDEX idx_consumable_id;
+
+-- ユーザーロール: user_id からロールを引く結合をインデックスだけで解決する
+ALTER TABLE user_roles
+    ADD INDEX idx_user_roles_user_role (user_id, role_id);
+
+ALTER TABLE user_roles DROP INDEX idx_user_roles_user;
@@ -0,0 +1,32 @@
+-- 入出庫を1本にまとめた在庫移動台帳（追記専用）を追加するマイグレーション
+-- 実行方法: python scripts/setup/migrate.py
+--
+-- 既存の入出庫履歴の取り込み: python scripts/maintenance/backfill_stock_movements.py
+
+CREATE TABLE IF NOT EXISTS stock_movements (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    movement_type VARCHAR(10) NOT NULL COMMENT '移動種別（inbound/outbound）',
+    consumable_id INT NOT NULL COMMENT '消耗品ID',
+    code VARCHAR(50) NOT NULL COMMENT 'コード（参照用）',
+    name VARCHAR(255) NOT NULL COMMENT '品名（参照用）',
+    quantity INT NOT NULL COMMENT '数量（入庫は正、出庫は負）',
+    stock_after INT COMMENT '移動後の在庫数',
+    employee_id INT COMMENT '作業者ID',
+    employee_name VARCHAR(100) COMMENT '作業者名',
+    employee_department VARCHAR(100) COMMENT '部署',
+    unit_price DECIMAL(10, 2) COMMENT '単価',
+    total_amount DECIMAL(12, 2) COMMENT '金額',
+    note TEXT COMMENT '備考',
+    inbound_type VARCHAR(20) COMMENT '入庫種別（入庫のみ）',
+    source_table VARCHAR(30) NOT NULL COMMENT '元の履歴テーブル',
+    source_id INT NOT NULL COMMENT '元の履歴ID',
+    moved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '移動日時',
+    FOREIGN KEY (consumable_id) REFERENCES consumables(id) ON DELETE CASCADE,
+    FOREIGN KEY (employee_id) REFERENCES employees(id) ON DELETE SET NULL,
+    UNIQUE KEY uk_stock_movements_source (source_table, source_id),
+    INDEX idx_stock_movements_moved_at (moved_at),
+    INDEX idx_stock_movements_type_moved_at (movement_type, moved_at),
+    INDEX idx_stock_movements_consumable_moved_at (consumable_id, moved_at),
+    INDEX idx_stock_movements_department_moved_at (employee_department, moved_at),
+    FULLTEXT INDEX ft_stock_movements_name_employee (name, employee_name) WITH PARSER ngram
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='在庫移動台帳';
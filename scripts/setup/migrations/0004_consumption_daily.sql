@@ -0,0 +1,21 @@
+-- 日次の入出庫集計（消耗品 × 部署 × 移動種別）を追加するマイグレーション
+-- 実行方法: python scripts/setup/migrate.py
+--
+-- 入出庫の記録時に同じトランザクション内で加算される。
+-- 在庫移動台帳から作り直す場合: python scripts/maintenance/rebuild_consumption_daily.py
+
+CREATE TABLE IF NOT EXISTS consumption_daily (
+    stat_date DATE NOT NULL COMMENT '集計日（JST）',
+    consumable_id INT NOT NULL COMMENT '消耗品ID',
+    department VARCHAR(100) NOT NULL DEFAULT '' COMMENT '部署',
+    movement_type VARCHAR(10) NOT NULL COMMENT '移動種別（inbound/outbound）',
+    quantity INT NOT NULL DEFAULT 0 COMMENT '数量合計',
+    amount DECIMAL(14, 2) NOT NULL DEFAULT 0 COMMENT '金額合計',
+    movement_count INT NOT NULL DEFAULT 0 COMMENT '件数',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新日時',
+    PRIMARY KEY (stat_date, consumable_id, department, movement_type),
+    FOREIGN KEY (consumable_id) REFERENCES consumables(id) ON DELETE CASCADE,
+    INDEX idx_consumption_daily_type_date (movement_type, stat_date),
+    INDEX idx_consumption_daily_department_date (department, stat_date),
+    INDEX idx_consumption_daily_consumable_date (consumable_id, stat_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='日次入出庫集計';
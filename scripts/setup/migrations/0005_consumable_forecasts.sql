@@ -0,0 +1,23 @@
+-- 消費ペースの予測から発注点・発注数を算出するためのマイグレーション
+-- 実行方法: python scripts/setup/migrate.py
+--
+-- 予測の更新（定期実行）: python scripts/maintenance/run_forecast.py
+
+-- 購入先ごとの調達リードタイム
+ALTER TABLE suppliers
+    ADD COLUMN lead_time_days INT NOT NULL DEFAULT 7 COMMENT '調達リードタイム（日）' AFTER address;
+
+-- 消耗品ごとの予測結果（バッチで洗い替え）
+CREATE TABLE IF NOT EXISTS consumable_forecasts (
+    consumable_id INT NOT NULL PRIMARY KEY COMMENT '消耗品ID',
+    daily_rate_sma DECIMAL(12, 4) NOT NULL DEFAULT 0 COMMENT '1日あたり消費量（移動平均）',
+    daily_rate_ewma DECIMAL(12, 4) NOT NULL DEFAULT 0 COMMENT '1日あたり消費量（指数平滑）',
+    daily_rate DECIMAL(12, 4) NOT NULL DEFAULT 0 COMMENT '発注点の算出に使う1日あたり消費量',
+    daily_std DECIMAL(12, 4) NOT NULL DEFAULT 0 COMMENT '1日あたり消費量の標準偏差',
+    lead_time_days INT NOT NULL COMMENT '算出に使ったリードタイム（日）',
+    reorder_point INT NOT NULL DEFAULT 0 COMMENT '発注点',
+    order_quantity INT NOT NULL DEFAULT 0 COMMENT '推奨発注数',
+    days_of_stock DECIMAL(12, 1) COMMENT '現在庫で何日もつか',
+    computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '算出日時',
+    FOREIGN KEY (consumable_id) REFERENCES consumables(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='消耗品の消費予測';
@@ -0,0 +1,16 @@
+-- 発注が必要な消耗品をインデックスで引けるようにするマイグレーション
+-- 実行方法: python scripts/setup/migrate.py
+--
+-- stock_quantity <= safety_stock のような列同士の比較はインデックスを使えないため、
+-- 在庫の増減時に判定結果を needs_reorder に保存し、(needs_reorder, order_status) で検索する。
+
+ALTER TABLE consumables
+    ADD COLUMN needs_reorder TINYINT(1) NOT NULL DEFAULT 0 COMMENT '発注要否（在庫 <= 発注点）' AFTER shortage_status;
+
+ALTER TABLE consumables
+    ADD INDEX idx_consumables_needs_reorder (needs_reorder, order_status);
+
+-- 既存データの初期値
+UPDATE consumables c
+LEFT JOIN consumable_forecasts f ON f.consumable_id = c.id
+SET c.needs_reorder = (c.stock_quantity <= COALESCE(f.reorder_point, c.safety_stock));
@@ -0,0 +1,13 @@
+-- 画面へ配信する変更イベント（在庫・注文状態・注文書）を保存するマイグレーション
+-- 実行方法: python scripts/setup/migrate.py
+--
+-- 複数のワーカープロセス間でイベントを共有し、SSE の Last-Event-ID で再接続時の取りこぼしを防ぐ。
+-- 古いイベントの削除: python scripts/maintenance/prune_change_events.py
+
+CREATE TABLE IF NOT EXISTS change_events (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    event_type VARCHAR(50) NOT NULL COMMENT 'イベント種別',
+    payload JSON NOT NULL COMMENT '変更内容',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '発生日時',
+    INDEX idx_change_events_created_at (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='変更イベント';
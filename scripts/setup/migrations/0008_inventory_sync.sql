@@ -0,0 +1,40 @@
+-- 在庫一覧の差分同期（/api/inventory?updated_since=...）のためのマイグレーション
+-- 実行方法: python scripts/setup/migrate.py
+--
+-- 同期トークン以降に更新された行を updated_at のインデックスで取得し、
+-- 削除された行は deleted_records（トゥームストーン）から取得する。
+-- 古い削除記録の削除（定期実行）: python scripts/maintenance/prune_deleted_records.py
+
+ALTER TABLE consumables
+    ADD INDEX idx_consumables_updated_at (updated_at);
+
+ALTER TABLE suppliers
+    ADD INDEX idx_suppliers_updated_at (updated_at);
+
+ALTER TABLE orders
+    ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新日時';
+
+ALTER TABLE orders
+    ADD INDEX idx_orders_updated_at (updated_at);
+
+ALTER TABLE inbound_history
+    ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新日時';
+
+ALTER TABLE inbound_history
+    ADD INDEX idx_inbound_history_updated_at (updated_at);
+
+ALTER TABLE outbound_history
+    ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新日時';
+
+ALTER TABLE outbound_history
+    ADD INDEX idx_outbound_history_updated_at (updated_at);
+
+-- 削除記録（トゥームストーン）
+CREATE TABLE IF NOT EXISTS deleted_records (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    table_name VARCHAR(64) NOT NULL COMMENT '削除されたテーブル',
+    record_id INT NOT NULL COMMENT '削除された行のID',
+    consumable_id INT COMMENT '関連する消耗品ID（注文依頼などの場合）',
+    deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '削除日時',
+    INDEX idx_deleted_records_table_deleted_at (table_name, deleted_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='差分同期用の削除記録';
@@ -0,0 +1,68 @@
+-- 部署マスター（departments）を追加し、入出庫履歴に部署IDを持たせるマイグレーション
+-- 実行方法: python scripts/setup/migrate.py
+--
+-- 部署一覧を履歴全体の SELECT DISTINCT から求めず、従業員の登録・入出庫の記録時に
+-- departments へ追加する。履歴の部署での絞り込みは department_id のインデックスで行う。
+
+CREATE TABLE IF NOT EXISTS departments (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL COMMENT '部署名',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '作成日時',
+    UNIQUE KEY uk_departments_name (name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='部署マスター';
+
+-- 既存の部署を登録
+INSERT IGNORE INTO departments (name)
+SELECT DISTINCT TRIM(department) FROM employees
+WHERE department IS NOT NULL AND TRIM(department) != '';
+
+INSERT IGNORE INTO departments (name)
+SELECT DISTINCT TRIM(employee_department) FROM stock_movements
+WHERE employee_department IS NOT NULL AND TRIM(employee_department) != '';
+
+INSERT IGNORE INTO departments (name)
+SELECT DISTINCT TRIM(employee_department) FROM outbound_history
+WHERE employee_department IS NOT NULL AND TRIM(employee_department) != '';
+
+INSERT IGNORE INTO departments (name)
+SELECT DISTINCT TRIM(employee_department) FROM inbound_history
+WHERE employee_department IS NOT NULL AND TRIM(employee_department) != '';
+
+-- 在庫移動台帳
+ALTER TABLE stock_movements
+    ADD COLUMN department_id INT COMMENT '部署ID' AFTER employee_department;
+
+ALTER TABLE stock_movements
+    ADD INDEX idx_stock_movements_department_id_moved_at (department_id, moved_at);
+
+ALTER TABLE stock_movements
+    DROP INDEX idx_stock_movements_department_moved_at;
+
+UPDATE stock_movements sm
+JOIN departments d ON d.name = TRIM(sm.employee_department)
+SET sm.department_id = d.id
+WHERE sm.department_id IS NULL;
+
+-- 出庫履歴
+ALTER TABLE outbound_history
+    ADD COLUMN department_id INT COMMENT '部署ID' AFTER employee_department;
+
+ALTER TABLE outbound_history
+    ADD INDEX idx_outbound_history_department_id (department_id);
+
+UPDATE outbound_history oh
+JOIN departments d ON d.name = TRIM(oh.employee_department)
+SET oh.department_id = d.id
+WHERE oh.department_id IS NULL;
+
+-- 入庫履歴
+ALTER TABLE inbound_history
+    ADD COLUMN department_id INT COMMENT '部署ID' AFTER employee_department;
+
+ALTER TABLE inbound_history
+    ADD INDEX idx_inbound_history_department_id (department_id);
+
+UPDATE inbound_history ih
+JOIN departments d ON d.name = TRIM(ih.employee_department)
+SET ih.department_id = d.id
+WHERE ih.department_id IS NULL;
@@ -0,0 +1,12 @@
+-- 在庫移動台帳に端末で採番した移動ID（client_id）を持たせるマイグレーション
+-- 実行方法: python scripts/setup/migrate.py
+--
+-- 出庫・入庫の画面は記録を端末（IndexedDB）に貯めてから /api/movements/batch でまとめて送信する。
+-- 通信が途切れて同じ記録を再送しても二重に記録しないよう、client_id を一意にする。
+-- 画面以外で記録した移動（注文書分入庫・既存データの取り込みなど）は NULL のまま。
+
+ALTER TABLE stock_movements
+    ADD COLUMN client_id VARCHAR(64) NULL COMMENT '端末で採番した移動ID（再送の重複防止）' AFTER source_id;
+
+ALTER TABLE stock_movements
+    ADD UNIQUE KEY uk_stock_movements_client_id (client_id);
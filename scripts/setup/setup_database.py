@@ -9,6 +9,8 @@ from pathlib import Path
 import pymysql
 from dotenv import load_dotenv
 
+from migrate import run_migrations
+
 # .envファイルを読み込む
 BASE_DIR = Path(__file__).resolve().parent
 ENV_PATH = BASE_DIR / ".env"
@@ -49,7 +51,7 @@ def create_database():
 
 
 def create_tables():
-    """テーブルを作成"""
+    """テーブルを作成（init.sql とバージョン管理されたマイグレーションを適用）"""
     dbname = os.getenv("INVENTORY_DB_NAME", "inventory_db")
     host = os.getenv("INVENTORY_DB_HOST", "localhost")
     user = os.getenv("INVENTORY_DB_USER", "root")
@@ -67,50 +69,8 @@ def create_tables():
     )
 
     try:
-        with conn.cursor() as cursor:
-            # init.sqlファイルを読み込んで実行
-            sql_file = BASE_DIR / "init.sql"
-            if not sql_file.exists():
-                print(f"[ERROR] SQLファイルが見つかりません: {sql_file}")
-                return
-
-            with open(sql_file, encoding="utf-8") as f:
-                sql_script = f.read()
-
-            # コメント行を削除
-            lines = sql_script.split("\n")
-            clean_lines = []
-            for line in lines:
-                # コメント行をスキップ
-                if line.strip().startswith("--") or line.strip().startswith("#"):
-                    continue
-                clean_lines.append(line)
-
-            sql_script = "\n".join(clean_lines)
-
-            # SQLを文ごとに分割して実行
-            statements = [s.strip() for s in sql_script.split(";") if s.strip()]
-
-            for statement in statements:
-                if statement and len(statement) > 10:  # 短すぎる文は無視
-                    try:
-                        cursor.execute(statement)
-                        # テーブル名を抽出して表示
-                        if "CREATE TABLE" in statement.upper():
-                            table_name = statement.split("CREATE TABLE")[1].split("(")[0].strip().replace("IF NOT EXISTS", "").strip()
-                            print(f"[OK] テーブル作成: {table_name}")
-                        else:
-                            print(f"[OK] SQL実行: {statement[:50]}...")
-                    except Exception as e:
-                        # すでにテーブルが存在する場合はスキップ
-                        if "already exists" in str(e) or "Table" in str(e) and "doesn't exist" not in str(e):
-                            print(f"[SKIP] スキップ: {str(e)[:100]}...")
-                        else:
-                            print(f"[ERROR] SQL実行エラー: {e}")
-                            print(f"   Statement: {statement[:200]}...")
-
-        conn.commit()
-        print("\n[OK] 全てのテーブルを作成しました")
+        applied = run_migrations(conn)
+        print(f"\n[OK] 全てのテーブルを作成しました（適用したマイグレーション: {applied}件）")
 
     finally:
         conn.close()
@@ -137,7 +97,9 @@ def main():
         print("\n次のステップ:")
         print("1. JSONデータをインポート:")
         print("   .\\venv\\Scripts\\python import_json_to_mysql.py")
-        print("\n2. Flaskアプリを起動:")
+        print("\n2. 主要クエリがインデックスを使っているか確認:")
+        print("   .\\venv\\Scripts\\python scripts\\setup\\check_query_plans.py")
+        print("\n3. Flaskアプリを起動:")
         print("   .\\venv\\Scripts\\python app.py")
 
     except Exception as e:
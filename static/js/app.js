@@ -158,6 +158,7 @@ async function submitSupplierForm() {
         phone: document.getElementById('supplierPhone').value.trim(),
         email: document.getElementById('supplierEmail').value.trim(),
         address: document.getElementById('supplierAddress').value.trim(),
+        lead_time_days: document.getElementById('supplierLeadTime').value.trim(),
         note: document.getElementById('supplierNote').value.trim()
     };
 
@@ -180,6 +181,7 @@ async function submitSupplierForm() {
             document.getElementById('supplierPhone').value = '';
             document.getElementById('supplierEmail').value = '';
             document.getElementById('supplierAddress').value = '';
+            document.getElementById('supplierLeadTime').value = '7';
             document.getElementById('supplierNote').value = '';
             // 一覧タブに切り替え
             switchSuppliersSubtab('list');
@@ -338,6 +338,13 @@ function debounce(func, wait) {
         timeout = setTimeout(later, wait);
     };
 }
+
+// APIの日時（"YYYY-MM-DD HH:MM:SS"、DBの NOW() で記録したUTC）を Date に変換
+function parseServerDateTime(value) {
+    if (!value) return null;
+    return new Date(String(value).replace(' ', 'T') + 'Z');
+}
+
 function showSuccess(message) {
     const toast = document.createElement('div');
     toast.style.cssText = `
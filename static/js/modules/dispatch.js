@@ -594,6 +594,55 @@ function forceDownloadPDF(orderId, orderNumber) {
 // 3. 注文書送信機能
 // ========================================
 
+// 表示中の注文書（変更イベントで1行だけ差し替えるために保持）
+let dispatchOrdersCache = new Map();
+let dispatchOrdersPermissions = { can_review: false, can_approve: false };
+
+function renderDispatchOrderRow(order, permissions) {
+    return `
+        <tr data-order-id="${order.id}">
+            <td><strong>${order.order_number}</strong></td>
+            <td>${order.supplier_name || '-'}</td>
+            <td>${order.total_items || 0}件</td>
+            <td>¥${(order.total_amount || 0).toLocaleString()}</td>
+            <td>
+                <span class="status-badge status-${order.status === '未送信' ? 'pending' : 'sent'}">
+                    ${order.status}
+                </span>
+            </td>
+            <td>
+                ${order.reviewed_by_name ?
+                    `✅ ${order.reviewed_by_name}<br><small>${order.reviewed_at ? new Date(order.reviewed_at).toLocaleString('ja-JP') : ''}</small>`
+                    : (permissions.can_review ? '<button class="btn-small btn-secondary" onclick="reviewDispatchOrder(' + order.id + ')" title="確認">確認</button>' : '-')}
+            </td>
+            <td>
+                ${order.approved_by_name ?
+                    `✅ ${order.approved_by_name}<br><small>${order.approved_at ? new Date(order.approved_at).toLocaleString('ja-JP') : ''}</small>`
+                    : (permissions.can_approve && order.reviewed_by_name ? '<button class="btn-small btn-secondary" onclick="approveDispatchOrder(' + order.id + ')" title="承認">承認</button>' : '-')}
+            </td>
+            <td>${order.created_by || '-'}</td>
+            <td>${order.created_at ? new Date(order.created_at).toLocaleString('ja-JP') : '-'}</td>
+            <td>${order.sent_at ? new Date(order.sent_at).toLocaleString('ja-JP') : '-'}</td>
+            <td>
+                <button class="btn-small btn-edit" onclick="showDispatchOrderDetail(${order.id})" title="詳細">
+                    👁
+                </button>
+                <button class="btn-small btn-primary" onclick="downloadPurchaseOrderPDF(${order.id}, '${order.order_number}')" title="PDFダウンロード">
+                    📄
+                </button>
+                ${order.status === '未送信' && order.approved_by_name ? `
+                    <button class="btn-small btn-primary" onclick="showSendOrderModal(${order.id}, '${order.supplier_name}', '${order.supplier_email || ''}')" title="送信">
+                        📧
+                    </button>
+                ` : ''}
+                <button class="btn-small btn-danger" onclick="deleteDispatchOrder(${order.id}, '${order.order_number}')" title="削除">
+                    🗑️
+                </button>
+            </td>
+        </tr>
+    `;
+}
+
 async function loadDispatchOrders() {
     try {
         const response = await fetch('/api/dispatch/orders');
@@ -607,56 +656,43 @@ async function loadDispatchOrders() {
             return;
         }
 
-        const permissions = data.permissions || { can_review: false, can_approve: false };
+        dispatchOrdersPermissions = data.permissions || { can_review: false, can_approve: false };
+        dispatchOrdersCache = new Map(data.data.map(order => [order.id, order]));
 
-        tbody.innerHTML = data.data.map(order => `
-            <tr>
-                <td><strong>${order.order_number}</strong></td>
-                <td>${order.supplier_name || '-'}</td>
-                <td>${order.total_items || 0}件</td>
-                <td>¥${(order.total_amount || 0).toLocaleString()}</td>
-                <td>
-                    <span class="status-badge status-${order.status === '未送信' ? 'pending' : 'sent'}">
-                        ${order.status}
-                    </span>
-                </td>
-                <td>
-                    ${order.reviewed_by_name ?
-                        `✅ ${order.reviewed_by_name}<br><small>${order.reviewed_at ? new Date(order.reviewed_at).toLocaleString('ja-JP') : ''}</small>`
-                        : (permissions.can_review ? '<button class="btn-small btn-secondary" onclick="reviewDispatchOrder(' + order.id + ')" title="確認">確認</button>' : '-')}
-                </td>
-                <td>
-                    ${order.approved_by_name ?
-                        `✅ ${order.approved_by_name}<br><small>${order.approved_at ? new Date(order.approved_at).toLocaleString('ja-JP') : ''}</small>`
-                        : (permissions.can_approve && order.reviewed_by_name ? '<button class="btn-small btn-secondary" onclick="approveDispatchOrder(' + order.id + ')" title="承認">承認</button>' : '-')}
-                </td>
-                <td>${order.created_by || '-'}</td>
-                <td>${order.created_at ? new Date(order.created_at).toLocaleString('ja-JP') : '-'}</td>
-                <td>${order.sent_at ? new Date(order.sent_at).toLocaleString('ja-JP') : '-'}</td>
-                <td>
-                    <button class="btn-small btn-edit" onclick="showDispatchOrderDetail(${order.id})" title="詳細">
-                        👁
-                    </button>
-                    <button class="btn-small btn-primary" onclick="downloadPurchaseOrderPDF(${order.id}, '${order.order_number}')" title="PDFダウンロード">
-                        📄
-                    </button>
-                    ${order.status === '未送信' && order.approved_by_name ? `
-                        <button class="btn-small btn-primary" onclick="showSendOrderModal(${order.id}, '${order.supplier_name}', '${order.supplier_email || ''}')" title="送信">
-                            📧
-                        </button>
-                    ` : ''}
-                    <button class="btn-small btn-danger" onclick="deleteDispatchOrder(${order.id}, '${order.order_number}')" title="削除">
-                        🗑️
-                    </button>
-                </td>
-            </tr>
-        `).join('');
+        tbody.innerHTML = data.data.map(order => renderDispatchOrderRow(order, dispatchOrdersPermissions)).join('');
     } catch (error) {
         console.error('Error loading dispatch orders:', error);
         showError('注文書の読み込みに失敗しました');
     }
 }
 
+// 注文書の変更イベントを一覧に反映（削除・入庫済みは行を消し、未表示の注文書は一覧を再読み込み）
+function applyDispatchOrderPatch(patch) {
+    const tbody = document.getElementById('dispatchOrdersTableBody');
+    if (!tbody || !patch || patch.id === undefined) return;
+
+    const row = tbody.querySelector(`tr[data-order-id="${patch.id}"]`);
+    if (patch.deleted || patch.status === '入庫済み') {
+        dispatchOrdersCache.delete(patch.id);
+        if (row) row.remove();
+        if (!tbody.querySelector('tr[data-order-id]')) {
+            tbody.innerHTML = '<tr><td colspan="11" style="text-align: center; color: #999;">注文書がありません</td></tr>';
+        }
+        return;
+    }
+
+    const cached = dispatchOrdersCache.get(patch.id);
+    if (!cached || !row) {
+        loadDispatchOrders();
+        return;
+    }
+
+    const order = { ...cached, ...patch };
+    delete order.deleted;
+    dispatchOrdersCache.set(order.id, order);
+    row.outerHTML = renderDispatchOrderRow(order, dispatchOrdersPermissions);
+}
+
 async function showDispatchOrderDetail(orderId) {
     const modal = document.getElementById('dispatchOrderDetailModal');
     const content = document.getElementById('dispatchOrderDetailContent');
@@ -166,7 +166,7 @@ function renderEmployeesList(employees) {
         const email = employee.email || '-';
         const department = employee.department || '-';
         const role = employee.role || '-';
-        const createdAt = employee.created_at ? new Date(employee.created_at).toLocaleString('ja-JP') : '-';
+        const createdAt = employee.created_at ? parseServerDateTime(employee.created_at).toLocaleString('ja-JP') : '-';
 
         // 状態バッジ（常に有効と表示）
         const statusBadge = '<span style="background: #4caf50; color: white; padding: 4px 12px; border-radius: 12px; font-size: 12px;">有効</span>';
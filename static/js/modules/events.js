@@ -0,0 +1,55 @@
+// ========================================
+// サーバーからの変更イベント（SSE）
+// ========================================
+
+// 在庫数・欠品状態・注文状態・注文書の変更を受け取り、画面を再読み込みせずに該当箇所だけ更新する。
+// 接続はサーバー側で一定時間ごとに閉じられ、ブラウザが Last-Event-ID 付きで自動再接続する。
+let changeEventSource = null;
+
+function parseChangeEvent(event) {
+    try {
+        return JSON.parse(event.data);
+    } catch (error) {
+        console.error('変更イベントの解析に失敗:', error);
+        return null;
+    }
+}
+
+function startChangeEvents() {
+    if (changeEventSource || typeof EventSource === 'undefined') return;
+
+    changeEventSource = new EventSource('/api/events/stream');
+
+    changeEventSource.addEventListener('stock.changed', event => {
+        const payload = parseChangeEvent(event);
+        if (!payload) return;
+        applyInventoryPatch({
+            code: payload.code,
+            stock_quantity: payload.stock_quantity,
+            shortage_status: payload.shortage_status,
+            order_status: payload.order_status,
+        });
+    });
+
+    changeEventSource.addEventListener('order.status_changed', event => {
+        const payload = parseChangeEvent(event);
+        if (!payload) return;
+        applyInventoryPatch({ code: payload.code, order_status: payload.order_status });
+    });
+
+    changeEventSource.addEventListener('dispatch.changed', event => {
+        const payload = parseChangeEvent(event);
+        if (!payload) return;
+        applyDispatchOrderPatch(payload);
+    });
+}
+
+function stopChangeEvents() {
+    if (changeEventSource) {
+        changeEventSource.close();
+        changeEventSource = null;
+    }
+}
+
+document.addEventListener('DOMContentLoaded', startChangeEvents);
+window.addEventListener('beforeunload', stopChangeEvents);
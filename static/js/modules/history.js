@@ -26,15 +26,16 @@ async function loadHistoryDepartments() {
         const response = await fetch('/api/history/departments');
         const data = await response.json();
 
-        if (data.success && data.departments) {
+        if (data.success && data.items) {
             const select = document.getElementById('historyDepartment');
             const currentValue = select.value;
 
+            // 値は部署ID（履歴の絞り込みは department_id で行う）
             select.innerHTML = '<option value="">すべて</option>';
-            data.departments.forEach(dept => {
+            data.items.forEach(dept => {
                 const option = document.createElement('option');
-                option.value = dept;
-                option.textContent = dept;
+                option.value = dept.id;
+                option.textContent = dept.name;
                 select.appendChild(option);
             });
 
@@ -57,7 +58,7 @@ async function loadHistory() {
 
     const params = new URLSearchParams();
     if (type !== 'all') params.append('type', type);
-    if (department) params.append('department', department);
+    if (department) params.append('department_id', department);
     if (startDate) params.append('start_date', startDate);
     if (endDate) params.append('end_date', endDate);
     if (searchText) params.append('search_text', searchText);
@@ -87,7 +88,7 @@ function displayHistory(history) {
     }
 
     tbody.innerHTML = history.map(item => {
-        const date = item.date ? new Date(item.date).toLocaleString('ja-JP') : '-';
+        const date = item.date ? parseServerDateTime(item.date).toLocaleString('ja-JP') : '-';
         const type = item.type || '-';
         const typeBadge = type === '出庫'
             ? '<span style="background: #ff6b6b; color: white; padding: 2px 8px; border-radius: 4px; font-size: 0.85em;">出庫</span>'
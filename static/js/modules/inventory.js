@@ -36,6 +36,114 @@ async function loadFilterOptions() {
     }
 }
 
+// ========================================
+// 在庫一覧のローカルキャッシュ（IndexedDB）
+// ========================================
+
+// 絞り込みなしの一覧を端末に保存し、2回目以降は前回の sync_token 以降の差分だけを取得する
+const INVENTORY_CACHE_DB = 'syomohin-inventory';
+const INVENTORY_CACHE_VERSION = 1;
+
+function openInventoryCache() {
+    return new Promise((resolve, reject) => {
+        if (!window.indexedDB) {
+            reject(new Error('IndexedDB is not available'));
+            return;
+        }
+        const request = indexedDB.open(INVENTORY_CACHE_DB, INVENTORY_CACHE_VERSION);
+        request.onupgradeneeded = () => {
+            const db = request.result;
+            if (!db.objectStoreNames.contains('items')) {
+                db.createObjectStore('items', { keyPath: 'id' });
+            }
+            if (!db.objectStoreNames.contains('meta')) {
+                db.createObjectStore('meta');
+            }
+        };
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+}
+
+function readInventoryCache(db) {
+    return new Promise((resolve, reject) => {
+        const tx = db.transaction(['items', 'meta'], 'readonly');
+        const itemsRequest = tx.objectStore('items').getAll();
+        const tokenRequest = tx.objectStore('meta').get('sync_token');
+        tx.oncomplete = () => resolve({ items: itemsRequest.result || [], syncToken: tokenRequest.result || null });
+        tx.onerror = () => reject(tx.error);
+    });
+}
+
+function writeInventoryCache(db, { items, deletedIds, syncToken, replace }) {
+    return new Promise((resolve, reject) => {
+        const tx = db.transaction(['items', 'meta'], 'readwrite');
+        const store = tx.objectStore('items');
+        if (replace) {
+            store.clear();
+        }
+        (deletedIds || []).forEach(id => store.delete(id));
+        items.forEach(item => store.put(item));
+        tx.objectStore('meta').put(syncToken, 'sync_token');
+        tx.oncomplete = () => resolve();
+        tx.onerror = () => reject(tx.error);
+    });
+}
+
+// 列指向（format=columnar）の在庫データを行オブジェクトの配列に戻す
+function decodeColumnar(data) {
+    if (!data || !Array.isArray(data.columns)) {
+        return data || [];
+    }
+    const dictionaries = data.dictionaries || {};
+    const decoders = data.columns.map(column => dictionaries[column] || null);
+    return data.rows.map(values => {
+        const item = {};
+        data.columns.forEach((column, i) => {
+            const value = values[i];
+            item[column] = decoders[i] && value !== null ? decoders[i][value] : value;
+        });
+        return item;
+    });
+}
+
+// サーバーと差分同期した一覧（コード順）を返す
+async function syncInventoryCache() {
+    const db = await openInventoryCache();
+    try {
+        const cached = await readInventoryCache(db);
+        const params = new URLSearchParams({ format: 'columnar' });
+        if (cached.syncToken) {
+            params.set('updated_since', cached.syncToken);
+        }
+
+        const response = await fetch(`/api/inventory?${params}`);
+        const data = await response.json();
+        if (!data.success) {
+            throw new Error(data.error);
+        }
+
+        const rows = decodeColumnar(data.data);
+        const merged = new Map(data.delta ? cached.items.map(item => [item.id, item]) : []);
+        (data.deleted_ids || []).forEach(id => merged.delete(id));
+        rows.forEach(item => merged.set(item.id, item));
+
+        await writeInventoryCache(db, {
+            items: rows,
+            deletedIds: data.deleted_ids,
+            syncToken: data.sync_token,
+            replace: !data.delta,
+        });
+
+        const items = Array.from(merged.values()).sort((a, b) =>
+            String(a['コード'] || '').localeCompare(String(b['コード'] || ''), 'ja')
+        );
+        return { items, total: data.total };
+    } finally {
+        db.close();
+    }
+}
+
 // 在庫データを読み込み
 async function loadInventory() {
     try {
@@ -44,18 +152,34 @@ async function loadInventory() {
         const orderStatus = document.getElementById('orderStatus').value;
         const shortageStatus = document.getElementById('shortageStatus').value;
 
+        // 絞り込みなしの場合は端末のキャッシュと差分同期する
+        const hasFilters = qrCode.trim() || searchText.trim()
+            || (orderStatus && orderStatus !== 'すべて')
+            || (shortageStatus && shortageStatus !== 'すべて');
+        if (!hasFilters) {
+            try {
+                const synced = await syncInventoryCache();
+                renderInventory(synced.items);
+                updateCountInfo(synced.items.length, synced.total);
+                return;
+            } catch (error) {
+                console.warn('在庫キャッシュの同期に失敗したため全件を取得します:', error);
+            }
+        }
+
         const params = new URLSearchParams({
             qr_code: qrCode,
             search_text: searchText,
             order_status: orderStatus,
             shortage_status: shortageStatus,
+            format: 'columnar',
         });
 
         const response = await fetch(`/api/inventory?${params}`);
         const data = await response.json();
 
         if (data.success) {
-            renderInventory(data.data);
+            renderInventory(decodeColumnar(data.data));
             updateCountInfo(data.filtered, data.total);
         } else {
             showError('データの取得に失敗しました: ' + data.error);
@@ -162,7 +286,7 @@ function renderInventory(items) {
         }
 
         return `
-            <div class="inventory-card">
+            <div class="inventory-card" data-code="${safeCodeAttr}">
                 <div class="card-main">
                     <div class="card-image-wrapper">
                         <img
@@ -182,15 +306,15 @@ function renderInventory(items) {
                             <span>カテゴリ: ${category || '-'}</span>
                         </div>
                         <div class="card-meta-row">
-                            <span>在庫数: <strong>${stock}</strong> ${unit}</span>
+                            <span>在庫数: <strong class="js-stock-quantity">${stock}</strong> ${unit}</span>
                             <span>安全在庫: ${safety} ${unit}</span>
                         </div>
                         <div class="card-meta-row">
                             <span>購入先: ${supplier || '-'}</span>
                         </div>
                         <div class="status-row">
-                            <span class="status-pill ${shortageClass}">欠品状態: ${shortageStatus}</span>
-                            <span class="status-pill ${orderClass}">注文状態: ${orderStatus}</span>
+                            <span class="status-pill js-shortage-status ${shortageClass}">欠品状態: ${shortageStatus}</span>
+                            <span class="status-pill js-order-status ${orderClass}">注文状態: ${orderStatus}</span>
                         </div>
                         ${pendingOrdersHtml}
                         ${completedOrdersHtml}
@@ -240,6 +364,41 @@ function renderInventory(items) {
     }).join('');
 }
 
+// 在庫一覧の1品目だけを差分更新（入出庫の応答やサーバーからの変更イベントで使用）
+// patch: { code, stock_quantity, shortage_status, order_status } のうち変わった項目
+function applyInventoryPatch(patch) {
+    if (!patch || !patch.code) return false;
+    const card = Array.from(document.querySelectorAll('#inventoryList .inventory-card'))
+        .find(element => element.dataset.code === String(patch.code));
+    if (!card) return false;
+
+    if (patch.stock_quantity !== undefined && patch.stock_quantity !== null) {
+        const stock = parseInt(patch.stock_quantity, 10) || 0;
+        const stockElement = card.querySelector('.js-stock-quantity');
+        if (stockElement) stockElement.textContent = stock;
+        card.querySelectorAll('.action-btn').forEach(button => {
+            button.dataset.stock = stock;
+        });
+    }
+
+    if (patch.shortage_status) {
+        const shortageElement = card.querySelector('.js-shortage-status');
+        if (shortageElement) {
+            shortageElement.className = `status-pill js-shortage-status ${getStatusClass(patch.shortage_status, 'shortage')}`;
+            shortageElement.textContent = `欠品状態: ${patch.shortage_status}`;
+        }
+    }
+
+    if (patch.order_status) {
+        const orderElement = card.querySelector('.js-order-status');
+        if (orderElement) {
+            orderElement.className = `status-pill js-order-status ${getStatusClass(patch.order_status, 'order')}`;
+            orderElement.textContent = `注文状態: ${patch.order_status}`;
+        }
+    }
+    return true;
+}
+
 function handleInventoryAction(action, button) {
     const payload = {
         code: button.dataset.code || "",
@@ -47,6 +47,10 @@ async function loadItemInfo(type) {
         }
     } catch (error) {
         console.error('商品情報の取得に失敗:', error);
+        // 通信できない場合も出庫・入庫は送信待ちに保存できるよう、読み取ったコードで続ける
+        if (type !== 'order' && (error instanceof TypeError || !navigator.onLine)) {
+            displayOfflineItemInfo(type, qrCode);
+        }
     }
 }
 
@@ -281,6 +285,21 @@ function displayItemInfo(type, item) {
     document.getElementById(`${type}ItemInfo`).dataset.itemCode = item['コード'];
 }
 
+// 通信できない場合の商品情報（読み取ったコードのみ、商品の確認は送信時にサーバーで行う）
+function displayOfflineItemInfo(type, code) {
+    const detailsDiv = document.getElementById(`${type}ItemDetails`);
+    detailsDiv.innerHTML = `
+        <div style="padding: 12px; background: #FFF3E0; border-radius: 8px; margin-bottom: 12px;">
+            <div style="margin-bottom: 8px;"><strong>コード:</strong> <span class="offline-item-code"></span></div>
+            <div>通信できないため商品情報を表示できません。記録は送信待ちに保存し、通信が回復すると自動で送信します。</div>
+        </div>
+    `;
+    detailsDiv.querySelector('.offline-item-code').textContent = code;
+
+    document.getElementById(`${type}ItemInfo`).style.display = 'block';
+    document.getElementById(`${type}ItemInfo`).dataset.itemCode = code;
+}
+
 // 出庫確認ダイアログを表示
 function submitOutbound() {
     const code = document.getElementById('outboundItemInfo').dataset.itemCode;
@@ -343,16 +362,15 @@ async function _doOutbound(withOrder) {
     const note = document.getElementById('outboundNote').value.trim();
 
     try {
-        const response = await fetch('/api/outbound', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ code, quantity, person, department, note }),
-        });
+        // 送信待ちに保存してから送信する（通信できない場合は data が null になり、回復後に自動で送信する）
+        const data = await submitMovement({ type: 'outbound', code, quantity, person, department, note });
 
-        const data = await response.json();
-
-        if (data.success) {
-            showSuccess(`${code} を ${quantity} 個出庫しました（出庫者: ${person}${department ? ' / ' + department : ''}）`);
+        if (!data || data.success) {
+            if (data) {
+                showSuccess(`${code} を ${quantity} 個出庫しました（出庫者: ${person}${department ? ' / ' + department : ''}）`);
+            } else {
+                showSuccess(`通信できないため、${code} の出庫（${quantity} 個）を送信待ちに保存しました`);
+            }
 
             // フォームをクリア
             document.getElementById('outboundQrCode').value = '';
@@ -363,7 +381,9 @@ async function _doOutbound(withOrder) {
             document.getElementById('outboundNote').value = '';
             document.getElementById('outboundItemInfo').style.display = 'none';
 
-            await loadInventory();
+            if (data) {
+                await refreshInventoryAfterMovement(data);
+            }
 
             // 出庫＋注文依頼の場合は注文タブへ遷移して商品をセット
             if (withOrder) {
@@ -417,25 +437,23 @@ async function submitInbound() {
     console.log('バリデーションOK、API呼び出しを開始します');
 
     try {
-        const response = await fetch('/api/inbound', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-                code: code,
-                quantity: quantity,
-                person: person,
-                department: department,
-                note: note,
-                inbound_type: '手動'
-            }),
+        // 送信待ちに保存してから送信する（通信できない場合は data が null になり、回復後に自動で送信する）
+        const data = await submitMovement({
+            type: 'inbound',
+            code: code,
+            quantity: quantity,
+            person: person,
+            department: department,
+            note: note,
+            inbound_type: '手動'
         });
 
-        const data = await response.json();
-
-        if (data.success) {
-            showSuccess(`${code} を ${quantity} 個入庫しました（入庫者: ${person}${department ? ' / ' + department : ''}）`);
+        if (!data || data.success) {
+            if (data) {
+                showSuccess(`${code} を ${quantity} 個入庫しました（入庫者: ${person}${department ? ' / ' + department : ''}）`);
+            } else {
+                showSuccess(`通信できないため、${code} の入庫（${quantity} 個）を送信待ちに保存しました`);
+            }
 
             // フォームをクリア
             document.getElementById('inboundQrCode').value = '';
@@ -446,8 +464,10 @@ async function submitInbound() {
             document.getElementById('inboundNote').value = '';
             document.getElementById('inboundItemInfo').style.display = 'none';
 
-            // 在庫データを再読み込み
-            await loadInventory();
+            // 在庫一覧の該当品目を更新
+            if (data) {
+                await refreshInventoryAfterMovement(data);
+            }
         } else {
             showError(data.error || '入庫に失敗しました');
         }
@@ -534,7 +554,7 @@ async function loadPendingOrders() {
                     <div style="margin-bottom: 8px;"><strong>品名:</strong> ${order.name}</div>
                     <div style="margin-bottom: 8px;"><strong>数量:</strong> ${order.quantity} ${order.unit}</div>
                     <div style="margin-bottom: 8px;"><strong>依頼者:</strong> ${order.requester_name}</div>
-                    <div style="margin-bottom: 8px;"><strong>依頼日:</strong> ${new Date(order.requested_date).toLocaleDateString('ja-JP')}</div>
+                    <div style="margin-bottom: 8px;"><strong>依頼日:</strong> ${parseServerDateTime(order.requested_date).toLocaleDateString('ja-JP')}</div>
                     <div style="margin-bottom: 8px;"><strong>購入先:</strong> ${order.supplier_name || '未設定'}</div>
                     <div><span class="badge badge-blue">${order.status}</span></div>
                 </div>
@@ -572,7 +592,7 @@ async function loadManualOrders() {
                         <div style="margin-bottom: 8px;"><strong>コード:</strong> ${order.code}</div>
                         <div style="margin-bottom: 8px;"><strong>数量:</strong> ${order.quantity} ${order.unit}</div>
                         <div style="margin-bottom: 8px;"><strong>依頼者:</strong> ${order.requester_name}</div>
-                        <div style="margin-bottom: 8px;"><strong>依頼日:</strong> ${new Date(order.requested_date).toLocaleDateString('ja-JP')}</div>
+                        <div style="margin-bottom: 8px;"><strong>依頼日:</strong> ${parseServerDateTime(order.requested_date).toLocaleDateString('ja-JP')}</div>
                         <div style="margin-bottom: 8px;"><strong>購入先:</strong> ${order.supplier_name || '未設定'}</div>
                         <div style="margin-bottom: 8px;"><strong>納期:</strong> ${order.deadline}</div>
                         <div style="margin-bottom: 12px;">
@@ -627,7 +647,7 @@ async function loadAutoOrders() {
                         <div style="margin-bottom: 8px;"><strong>品名:</strong> ${order.name}</div>
                         <div style="margin-bottom: 8px;"><strong>コード:</strong> ${order.code}</div>
                         <div style="margin-bottom: 8px;"><strong>数量:</strong> ${order.quantity} ${order.unit}</div>
-                        <div style="margin-bottom: 8px;"><strong>依頼日:</strong> ${new Date(order.requested_date).toLocaleDateString('ja-JP')}</div>
+                        <div style="margin-bottom: 8px;"><strong>依頼日:</strong> ${parseServerDateTime(order.requested_date).toLocaleDateString('ja-JP')}</div>
                         <div style="margin-bottom: 8px;"><strong>購入先:</strong> ${order.supplier_name || '未設定'}</div>
                         <div style="margin-bottom: 8px;"><strong>備考:</strong> ${order.note || '-'}</div>
                         <div style="margin-bottom: 12px;">
@@ -1047,3 +1067,397 @@ window.loadManualOrders = loadManualOrders;
 window.loadDispatchOrdersForInbound = loadDispatchOrdersForInbound;
 window.selectDispatchOrderForInbound = selectDispatchOrderForInbound;
 window.submitDispatchOrderInbound = submitDispatchOrderInbound;
+
+// 入出庫の応答で在庫一覧の該当品目だけを更新（一覧に表示されていなければ再読み込み）
+async function refreshInventoryAfterMovement(data) {
+    const patched = applyInventoryPatch({
+        code: data.code,
+        stock_quantity: data.new_stock,
+        shortage_status: data.shortage_status,
+        order_status: data.order_status,
+    });
+    if (!patched) {
+        await loadInventory();
+    }
+}
+
+// ========================================
+// 入出庫の送信待ち（オフライン対応）
+// ========================================
+
+// 出庫・入庫の記録は端末の IndexedDB に保存してから /api/movements/batch でまとめて送信する。
+// 記録ごとに端末で client_id を採番し、サーバーは記録済みの client_id を記録し直さないため、
+// 応答を受け取る前に通信が途切れても同じ記録をそのまま再送できる。
+// サーバーが記録できなかった記録（商品コードの誤り・在庫不足など）は消さずに要確認へ移し、
+// 担当者が内容を修正して再送するか、破棄するかを選ぶ。
+const MOVEMENT_QUEUE_DB = 'syomohin-offline';
+const MOVEMENT_QUEUE_STORE = 'movements';
+const MOVEMENT_ATTENTION_STORE = 'needs_attention';
+const MOVEMENT_BATCH_SIZE = 200;
+const MOVEMENT_SYNC_INTERVAL_MS = 30000;
+// サーバーが送信全体を受け付けない状態がこの回数続いたら、最も古い記録を要確認へ移す
+// （原因の記録が先頭に残り続けて、後の記録を送信できなくなるのを防ぐ）
+const MOVEMENT_MAX_BATCH_FAILURES = 3;
+
+let movementQueueDbPromise = null;
+let movementSyncChain = Promise.resolve();
+let movementBatchFailures = 0;
+
+function openMovementQueue() {
+    if (!movementQueueDbPromise) {
+        movementQueueDbPromise = new Promise((resolve, reject) => {
+            const request = indexedDB.open(MOVEMENT_QUEUE_DB, 2);
+            request.onupgradeneeded = (event) => {
+                const db = request.result;
+                if (event.oldVersion < 1) {
+                    const store = db.createObjectStore(MOVEMENT_QUEUE_STORE, { keyPath: 'client_id' });
+                    store.createIndex('queued_at', 'queued_at');
+                }
+                if (event.oldVersion < 2) {
+                    const attention = db.createObjectStore(MOVEMENT_ATTENTION_STORE, { keyPath: 'client_id' });
+                    attention.createIndex('failed_at', 'failed_at');
+                }
+            };
+            request.onsuccess = () => {
+                const db = request.result;
+                // 別のタブで新しい版に更新する場合は閉じる（次回の操作で開き直す）
+                db.onversionchange = () => {
+                    db.close();
+                    movementQueueDbPromise = null;
+                };
+                resolve(db);
+            };
+            request.onerror = () => reject(request.error);
+        });
+        // 開けなかった場合は次回に開き直す
+        movementQueueDbPromise.catch(() => {
+            movementQueueDbPromise = null;
+        });
+    }
+    return movementQueueDbPromise;
+}
+
+// 送信待ち（storeNames で要確認も指定できる）を1つのトランザクションで操作し、
+// 完了後に callback が返したリクエストの結果を返す
+async function withMovementQueue(mode, callback, storeNames = [MOVEMENT_QUEUE_STORE]) {
+    const db = await openMovementQueue();
+    return new Promise((resolve, reject) => {
+        const transaction = db.transaction(storeNames, mode);
+        const request = callback(...storeNames.map((name) => transaction.objectStore(name)));
+        transaction.oncomplete = () => resolve(request ? request.result : undefined);
+        transaction.onerror = () => reject(transaction.error);
+        transaction.onabort = () => reject(transaction.error);
+    });
+}
+
+function generateClientId() {
+    if (window.crypto && typeof crypto.randomUUID === 'function') {
+        return crypto.randomUUID();
+    }
+    // randomUUID は HTTPS でしか使えないため、HTTPで起動した場合は乱数から作る
+    const bytes = crypto.getRandomValues(new Uint8Array(16));
+    return Array.from(bytes, (byte) => byte.toString(16).padStart(2, '0')).join('');
+}
+
+async function postMovementBatch(entries) {
+    const response = await fetch('/api/movements/batch', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ movements: entries }),
+    });
+    const data = await response.json().catch(() => null);
+    if (!response.ok || !data || !data.success) {
+        const error = new Error((data && data.error) || `HTTP ${response.status}`);
+        // JSON のエラー応答（400・500）は送信した内容が原因の可能性がある
+        // （通信エラー・ログイン画面へのリダイレクト・プロキシのエラーページは数えない）
+        error.rejectedByServer = Boolean(data) && (response.status === 400 || response.status >= 500);
+        throw error;
+    }
+    return data.results;
+}
+
+// 送信全体を受け付けない状態が続いた場合に、最も古い記録を要確認へ移す
+async function setAsideOldestMovement(entry, error, results) {
+    const message = `送信全体が受け付けられませんでした: ${error.message}`;
+    await withMovementQueue('readwrite', (queue, attention) => {
+        queue.delete(entry.client_id);
+        attention.put({ ...entry, error: message, failed_at: new Date().toISOString() });
+    }, [MOVEMENT_QUEUE_STORE, MOVEMENT_ATTENTION_STORE]);
+    results.set(entry.client_id, { ...entry, status: 'error', success: false, error: message });
+}
+
+async function _syncMovementQueue() {
+    const results = new Map();
+    const entries = await withMovementQueue('readonly', (store) => store.index('queued_at').getAll());
+
+    for (let start = 0; start < entries.length; start += MOVEMENT_BATCH_SIZE) {
+        const chunk = entries.slice(start, start + MOVEMENT_BATCH_SIZE);
+        let chunkResults;
+        try {
+            chunkResults = await postMovementBatch(chunk);
+            movementBatchFailures = 0;
+        } catch (error) {
+            console.warn('送信待ちの入出庫を送信できません（通信の回復後に再送します）:', error);
+            if (error.rejectedByServer && ++movementBatchFailures >= MOVEMENT_MAX_BATCH_FAILURES) {
+                movementBatchFailures = 0;
+                await setAsideOldestMovement(chunk[0], error, results);
+            }
+            break;
+        }
+
+        // 記録済み・重複（記録済みの再送）は送信待ちから削除し、記録できなかった記録は要確認へ移す
+        // （それ以外の結果は送信待ちに残して次回に再送する）
+        const failedAt = new Date().toISOString();
+        await withMovementQueue('readwrite', (queue, attention) => {
+            chunk.forEach((entry, index) => {
+                const result = chunkResults[index];
+                if (result.status === 'applied' || result.status === 'duplicate') {
+                    queue.delete(entry.client_id);
+                } else if (result.status === 'error') {
+                    queue.delete(entry.client_id);
+                    attention.put({ ...entry, error: result.error, failed_at: failedAt });
+                }
+            });
+        }, [MOVEMENT_QUEUE_STORE, MOVEMENT_ATTENTION_STORE]);
+        chunk.forEach((entry, index) => {
+            results.set(entry.client_id, { ...entry, ...chunkResults[index] });
+        });
+    }
+
+    await updateMovementQueueStatus();
+    return results;
+}
+
+// 送信待ちを送信し、client_id ごとの結果を返す（同時に送信しないよう順番に実行する）
+function syncMovementQueue() {
+    const run = movementSyncChain.then(_syncMovementQueue);
+    movementSyncChain = run.catch(() => {});
+    return run;
+}
+
+// 1件の入出庫を送信待ちに保存して送信する（通信できなかった場合は null を返す）
+async function submitMovement(movement) {
+    const entry = { ...movement, client_id: generateClientId(), queued_at: new Date().toISOString() };
+    try {
+        await withMovementQueue('readwrite', (store) => {
+            store.put(entry);
+        });
+    } catch (error) {
+        // IndexedDB を使えない場合（プライベートブラウズなど）は保存せずに送信する
+        console.warn('送信待ちに保存できません:', error);
+        const [result] = await postMovementBatch([entry]);
+        return result;
+    }
+
+    const results = await syncMovementQueue();
+    reportMovementResults(results, entry.client_id);
+    const result = results.get(entry.client_id) || null;
+    if (result && !result.success) {
+        // 画面にエラーを表示し、入力内容もフォームに残るため要確認には残さない
+        await withMovementQueue('readwrite', (attention) => {
+            attention.delete(entry.client_id);
+        }, [MOVEMENT_ATTENTION_STORE]);
+        await updateMovementQueueStatus();
+    }
+    return result;
+}
+
+// 以前に送信待ちに保存した記録の送信結果を表示する
+function reportMovementResults(results, currentClientId = null) {
+    const recorded = [];
+    const failed = [];
+    results.forEach((result) => {
+        if (result.client_id === currentClientId) return;
+        (result.success ? recorded : failed).push(result);
+    });
+
+    let needsReload = false;
+    recorded.filter((result) => result.status === 'applied').forEach((result) => {
+        const patched = applyInventoryPatch({
+            code: result.code,
+            stock_quantity: result.new_stock,
+            shortage_status: result.shortage_status,
+            order_status: result.order_status,
+        });
+        needsReload = needsReload || !patched;
+    });
+    if (needsReload) {
+        loadInventory();
+    }
+
+    if (recorded.length > 0) {
+        showSuccess(`送信待ちの入出庫 ${recorded.length} 件を記録しました`);
+    }
+    if (failed.length > 0) {
+        const details = failed.slice(0, 3).map((result) => `${result.code}: ${result.error}`).join(' / ');
+        showError(`送信待ちの入出庫 ${failed.length} 件を記録できませんでした（${details}${failed.length > 3 ? ' ほか' : ''}）。「要確認」から修正して再送してください`);
+    }
+}
+
+async function updateMovementQueueStatus() {
+    const status = document.getElementById('movementQueueStatus');
+    const attentionStatus = document.getElementById('movementAttentionStatus');
+    if (!status && !attentionStatus) return;
+
+    let count = 0;
+    let attentionCount = 0;
+    try {
+        [count, attentionCount] = await Promise.all([
+            withMovementQueue('readonly', (store) => store.count()),
+            withMovementQueue('readonly', (store) => store.count(), [MOVEMENT_ATTENTION_STORE]),
+        ]);
+    } catch (error) {
+        console.warn('送信待ちの件数を取得できません:', error);
+    }
+    if (status) {
+        status.hidden = count === 0;
+        status.textContent = `送信待ち ${count} 件`;
+    }
+    if (attentionStatus) {
+        attentionStatus.hidden = attentionCount === 0;
+        attentionStatus.textContent = `要確認 ${attentionCount} 件`;
+    }
+}
+
+// 要確認の一覧を表示する（商品コード・数量を修正して再送するか、破棄する）
+async function showMovementAttention() {
+    const dialog = document.getElementById('movementAttentionDialog');
+    const list = document.getElementById('movementAttentionList');
+    if (!dialog || !list) return;
+
+    let entries = [];
+    try {
+        entries = await withMovementQueue('readonly', (store) => store.index('failed_at').getAll(), [MOVEMENT_ATTENTION_STORE]);
+    } catch (error) {
+        console.warn('要確認の入出庫を読み込めません:', error);
+        showError('要確認の入出庫を読み込めません');
+        return;
+    }
+    if (entries.length === 0) {
+        dialog.style.display = 'none';
+        await updateMovementQueueStatus();
+        return;
+    }
+
+    list.innerHTML = '';
+    entries.forEach((entry) => {
+        const row = document.createElement('div');
+        row.style.cssText = 'padding: 12px; border: 1px solid #FFCDD2; border-radius: 8px; margin-bottom: 10px; background: #FFF8F8;';
+        row.innerHTML = `
+            <div style="font-size: 13px; color: #555; margin-bottom: 6px;">
+                <strong class="attention-type"></strong> <span class="attention-person"></span> <span class="attention-queued-at" style="color: #999;"></span>
+            </div>
+            <div class="attention-error" style="font-size: 13px; color: #C62828; margin-bottom: 8px;"></div>
+            <div style="display: flex; gap: 8px; margin-bottom: 8px;">
+                <input type="text" class="input-field attention-code" placeholder="商品コード" style="flex: 2;">
+                <input type="number" class="input-field attention-quantity" min="1" placeholder="数量" style="flex: 1;">
+            </div>
+            <div style="display: flex; gap: 8px;">
+                <button type="button" class="btn btn-primary attention-retry" style="flex: 1;">修正して再送</button>
+                <button type="button" class="btn btn-secondary attention-discard" style="flex: 1;">破棄</button>
+            </div>
+        `;
+        row.querySelector('.attention-type').textContent = entry.type === 'outbound' ? '出庫' : '入庫';
+        row.querySelector('.attention-person').textContent = `${entry.person}${entry.department ? ' / ' + entry.department : ''}`;
+        row.querySelector('.attention-queued-at').textContent = new Date(entry.queued_at).toLocaleString();
+        row.querySelector('.attention-error').textContent = entry.error || '記録できませんでした';
+        row.querySelector('.attention-code').value = entry.code || '';
+        row.querySelector('.attention-quantity').value = entry.quantity;
+        row.querySelector('.attention-retry').addEventListener('click', () => {
+            const code = row.querySelector('.attention-code').value.trim();
+            const quantity = parseInt(row.querySelector('.attention-quantity').value);
+            if (!code || !quantity || quantity <= 0) {
+                showError('商品コードと数量を入力してください');
+                return;
+            }
+            retryMovementAttention(entry, { code, quantity });
+        });
+        row.querySelector('.attention-discard').addEventListener('click', () => discardMovementAttention(entry));
+        list.appendChild(row);
+    });
+    dialog.style.display = 'flex';
+}
+
+// 要確認の記録を修正して送信待ちへ戻し、送信する
+// （記録できなかった client_id はサーバーに記録されていないため、同じ client_id で再送できる）
+async function retryMovementAttention(entry, changes) {
+    const { error: _error, failed_at: _failedAt, ...movement } = entry;
+    const retried = { ...movement, ...changes };
+    try {
+        await withMovementQueue('readwrite', (queue, attention) => {
+            attention.delete(entry.client_id);
+            queue.put(retried);
+        }, [MOVEMENT_QUEUE_STORE, MOVEMENT_ATTENTION_STORE]);
+    } catch (error) {
+        console.warn('要確認の入出庫を送信待ちに戻せません:', error);
+        showError('要確認の入出庫を送信待ちに戻せません');
+        return;
+    }
+
+    const results = await syncMovementQueue().catch(() => new Map());
+    const result = results.get(entry.client_id);
+    if (!result) {
+        showSuccess(`${retried.code} の記録を送信待ちに戻しました（通信の回復後に送信します）`);
+    } else if (result.success) {
+        showSuccess(`${retried.code} の記録を送信しました`);
+    } else {
+        showError(`${retried.code} の記録を送信できませんでした: ${result.error}`);
+    }
+    reportMovementResults(results, entry.client_id);
+    if (result && result.status === 'applied') {
+        await refreshInventoryAfterMovement(result);
+    }
+    await showMovementAttention();
+}
+
+async function discardMovementAttention(entry) {
+    const label = entry.type === 'outbound' ? '出庫' : '入庫';
+    if (!confirm(`${entry.code} の${label}（${entry.quantity} 個）の記録を破棄しますか？`)) return;
+
+    await withMovementQueue('readwrite', (attention) => {
+        attention.delete(entry.client_id);
+    }, [MOVEMENT_ATTENTION_STORE]);
+    showSuccess(`${entry.code} の${label}の記録を破棄しました`);
+    await showMovementAttention();
+    await updateMovementQueueStatus();
+}
+
+function flushMovementQueue() {
+    return syncMovementQueue()
+        .then((results) => reportMovementResults(results))
+        .catch((error) => console.warn('送信待ちの入出庫の送信に失敗:', error));
+}
+
+function startMovementQueue() {
+    // メインページとスクリプトをキャッシュし、通信できない場合も画面を開けるようにする（HTTPS または localhost のみ）
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.register('/sw.js').catch((error) => {
+            console.warn('サービスワーカーの登録に失敗:', error);
+        });
+    }
+    if (typeof indexedDB === 'undefined') return;
+
+    const status = document.getElementById('movementQueueStatus');
+    if (status) {
+        status.addEventListener('click', flushMovementQueue);
+    }
+    const attentionStatus = document.getElementById('movementAttentionStatus');
+    if (attentionStatus) {
+        attentionStatus.addEventListener('click', showMovementAttention);
+    }
+    const attentionClose = document.getElementById('movementAttentionCloseBtn');
+    if (attentionClose) {
+        attentionClose.addEventListener('click', () => {
+            document.getElementById('movementAttentionDialog').style.display = 'none';
+        });
+    }
+    window.addEventListener('online', flushMovementQueue);
+    setInterval(() => {
+        if (navigator.onLine) {
+            flushMovementQueue();
+        }
+    }, MOVEMENT_SYNC_INTERVAL_MS);
+    flushMovementQueue();
+}
+
+document.addEventListener('DOMContentLoaded', startMovementQueue);
@@ -0,0 +1,90 @@
+// ========================================
+// サービスワーカー（オフライン時の画面表示）
+// ========================================
+
+// 倉庫内で通信が途切れても出庫・入庫の画面を開けるよう、メインページとスクリプトをキャッシュする。
+// 入出庫の記録は画面側（operations.js）が IndexedDB に貯め、通信の回復後に /api/movements/batch へまとめて送信する。
+// API はキャッシュせず、常にサーバーへ問い合わせる（在庫数が古いまま表示されないように）。
+// キャッシュする内容を変えた場合は SHELL_CACHE の版を上げる（古いキャッシュは activate で削除する）。
+const SHELL_CACHE = 'syomohin-shell-v1';
+
+const SHELL_URLS = [
+    '/static/js/modules/common.js',
+    '/static/js/modules/employees.js',
+    '/static/js/modules/users.js',
+    '/static/js/modules/inventory.js',
+    '/static/js/modules/register.js',
+    '/static/js/modules/operations.js',
+    '/static/js/modules/orders.js',
+    '/static/js/modules/dispatch.js',
+    '/static/js/modules/history.js',
+    '/static/js/modules/events.js',
+    '/static/js/app.js',
+];
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(SHELL_CACHE)
+            .then(cache => cache.addAll(SHELL_URLS))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(
+                keys.filter(key => key.startsWith('syomohin-shell-') && key !== SHELL_CACHE)
+                    .map(key => caches.delete(key))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+// メインページ: ネットワーク優先（ログイン画面へのリダイレクトはキャッシュしない）、失敗したらキャッシュ
+async function handleNavigation(request) {
+    const cache = await caches.open(SHELL_CACHE);
+    try {
+        const response = await fetch(request);
+        if (response.ok && !response.redirected) {
+            cache.put('/', response.clone());
+        }
+        return response;
+    } catch (error) {
+        const cached = await cache.match('/');
+        if (cached) return cached;
+        throw error;
+    }
+}
+
+// スクリプト: キャッシュを返しつつ裏で更新する（次回の読み込みから新しい版を使う）
+async function handleStatic(request) {
+    const cache = await caches.open(SHELL_CACHE);
+    const cached = await cache.match(request, { ignoreSearch: true });
+    const update = fetch(request)
+        .then(response => {
+            if (response.ok) {
+                cache.put(request, response.clone());
+            }
+            return response;
+        })
+        .catch(() => null);
+
+    if (cached) return cached;
+    const response = await update;
+    return response || Response.error();
+}
+
+self.addEventListener('fetch', event => {
+    const { request } = event;
+    if (request.method !== 'GET') return;
+
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) return;
+
+    if (request.mode === 'navigate' && url.pathname === '/') {
+        event.respondWith(handleNavigation(request));
+    } else if (url.pathname.startsWith('/static/')) {
+        event.respondWith(handleStatic(request));
+    }
+});
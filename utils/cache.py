@@ -0,0 +1,195 @@
+"""マスターデータ（購入先・従業員・部署）の共有キャッシュユーティリティ.
+
+既定はプロセス内のTTL付きLRU。REFERENCE_CACHE_URL に redis:// を指定すると
+Redisプロトコルのサーバー（Redis / Valkey / KeyDB など）を使い、ワーカー間でキャッシュと無効化を共有する。
+
+プロセス内のキャッシュは invalidate() が他のワーカーに届かないため、DBのバージョン（ETag と同じ
+resource_fingerprint）をキーに含める場合にだけ使う。バージョンを指定しない読み込みは
+共有キャッシュ（Redis）がある場合だけキャッシュし、無ければ毎回 loader() を呼ぶ。
+"""
+
+from __future__ import annotations
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+import config
+
+# 名前空間（更新系APIから invalidate() して無効化する）
+SUPPLIERS = "suppliers"
+EMPLOYEES = "employees"
+DEPARTMENTS = "departments"
+
+_MISSING = object()
+
+# 該当なし・空の結果（DB障害で空になった場合を含む）は短い期間だけ保存する
+EMPTY_TTL_SECONDS = 30
+
+
+class LocalTTLCache:
+    """プロセス内のTTL付きLRUキャッシュ"""
+
+    # 無効化がワーカー間で共有されない
+    shared = False
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def version(self, key: str) -> int:
+        # 名前空間のバージョン番号はLRUの追い出し対象外として別に保持する
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            return self._versions[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+class RedisCache:
+    """Redisプロトコルのキャッシュ（redis パッケージが必要、client に互換のスタンドインも渡せる）"""
+
+    shared = True
+
+    def __init__(self, url: str = "", client=None):
+        if client is None:
+            import redis  # 任意の依存関係のため使用時のみ読み込む
+
+            client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._client = client
+
+    def get(self, key: str, default: Any = None) -> Any:
+        raw = self._client.get(key)
+        return default if raw is None else pickle.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        self._client.set(key, pickle.dumps(value), ex=max(int(ttl), 1))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+    def version(self, key: str) -> int:
+        raw = self._client.get(key)
+        return int(raw) if raw is not None else 0
+
+    def incr(self, key: str) -> int:
+        return int(self._client.incr(key))
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(f"{config.REFERENCE_CACHE_PREFIX}:*"):
+            self._client.delete(key)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_cache():
+    """設定に応じたキャッシュバックエンド（シングルトン）"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                url = config.REFERENCE_CACHE_URL
+                if url.startswith(("redis://", "rediss://", "unix://")):
+                    try:
+                        _backend = RedisCache(url)
+                    except Exception as e:
+                        print(f"Redisキャッシュを利用できないためプロセス内キャッシュを使用します: {e}")
+                if _backend is None:
+                    _backend = LocalTTLCache(config.REFERENCE_CACHE_MAX_ENTRIES)
+    return _backend
+
+
+def set_cache_backend(backend) -> None:
+    """キャッシュバックエンドを差し替える（動作確認用のスタンドインなど）"""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def _namespace_key(backend, namespace: str) -> str:
+    version = backend.version(f"{config.REFERENCE_CACHE_PREFIX}:ns:{namespace}")
+    return f"{config.REFERENCE_CACHE_PREFIX}:{namespace}:v{version}"
+
+
+def cached(
+    namespace: str,
+    key: str,
+    loader: Callable[[], Any],
+    ttl: int | None = None,
+    version: str | None = None,
+) -> Any:
+    """
+    キャッシュから値を取得し、なければ loader() の結果を保存して返す.
+
+    version にはDBのバージョン（http_cache.current_resource_version()）を指定する。
+    プロセス内のキャッシュは version を指定した場合だけ使う（他のワーカーでの更新を検知するため）。
+    None も「該当なし」として保存する。キャッシュサーバーの障害時は loader() の結果をそのまま返す。
+    """
+    ttl = config.REFERENCE_CACHE_TTL_SECONDS if ttl is None else ttl
+    backend = get_cache()
+    if version is None and not getattr(backend, "shared", False):
+        return loader()
+
+    try:
+        full_key = f"{_namespace_key(backend, namespace)}:{key}"
+        if version is not None:
+            full_key += f":{version}"
+        value = backend.get(full_key, _MISSING)
+        if value is not _MISSING:
+            return value
+    except Exception as e:
+        print(f"Cache get error ({namespace}): {e}")
+        return loader()
+
+    value = loader()
+    if value is None or (hasattr(value, "__len__") and len(value) == 0):
+        ttl = min(ttl, EMPTY_TTL_SECONDS)
+    try:
+        backend.set(full_key, value, ttl)
+    except Exception as e:
+        print(f"Cache set error ({namespace}): {e}")
+    return value
+
+
+def invalidate(namespace: str) -> None:
+    """名前空間のバージョンを上げて、その名前空間のキャッシュをまとめて無効にする"""
+    try:
+        get_cache().incr(f"{config.REFERENCE_CACHE_PREFIX}:ns:{namespace}")
+    except Exception as e:
+        print(f"Cache invalidate error ({namespace}): {e}")
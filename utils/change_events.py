@@ -0,0 +1,244 @@
+"""画面へ配信する変更イベントを保存・取得するユーティリティ."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import traceback
+from collections import deque
+
+import pandas as pd
+
+import config
+from database_manager import get_db_manager
+from utils import event_bus
+
+# change_events に保存してクライアントへ配信するトピック
+PERSISTED_TOPICS = (
+    event_bus.STOCK_CHANGED,
+    event_bus.LOW_STOCK_ENTERED,
+    event_bus.LOW_STOCK_CLEARED,
+    event_bus.ORDER_STATUS_CHANGED,
+    event_bus.DISPATCH_CHANGED,
+)
+
+_registered = False
+
+
+def _persist_event(topic: str, payload: dict) -> None:
+    """イベントを change_events に保存（他のワーカーの接続にも配信するため）"""
+    get_db_manager().execute_update(
+        "INSERT INTO change_events (event_type, payload) VALUES (:event_type, :payload)",
+        {"event_type": topic, "payload": json.dumps(payload, ensure_ascii=False, default=str)},
+    )
+
+
+def register_change_event_sink() -> None:
+    """配信対象のトピックを change_events に保存するよう購読する（起動時に1回）"""
+    global _registered
+    if _registered:
+        return
+    for topic in PERSISTED_TOPICS:
+        event_bus.subscribe(topic, _persist_event)
+    _registered = True
+
+
+def latest_event_id(db) -> int:
+    """最新のイベントID"""
+    df = db.execute_query("SELECT COALESCE(MAX(id), 0) AS id FROM change_events")
+    return int(df.iloc[0]["id"]) if not df.empty else 0
+
+
+def fetch_events_since(db, last_event_id: int, limit: int = 100) -> list[dict]:
+    """指定したIDより後のイベントを古い順に取得"""
+    df = db.execute_query(
+        f"""
+        SELECT id, event_type, payload
+        FROM change_events
+        WHERE id > :last_event_id
+        ORDER BY id
+        LIMIT {int(limit)}
+        """,
+        {"last_event_id": last_event_id},
+    )
+    events = []
+    for _, row in df.iterrows():
+        payload = row["payload"]
+        if isinstance(payload, (str, bytes)):
+            payload = json.loads(payload)
+        events.append({"id": int(row["id"]), "type": row["event_type"], "data": payload})
+    return events
+
+
+class ChangeEventHub:
+    """
+    change_events をプロセスごとに1つのスレッドで確認し、SSE接続へ配る.
+
+    接続ごとにDBを確認すると接続数に比例してクエリが増えるため、購読している接続がある間だけ
+    1つのスレッドが EVENTS_POLL_INTERVAL ごとに確認し、新しいイベントを直近のバッファに貯めて
+    待っている接続を Condition で起こす。バッファより古い位置から再接続した接続は
+    呼び出し元が fetch_events_since で直接取得する（wait が None を返す）。
+    """
+
+    def __init__(self, buffer_size: int = 1000, batch_size: int = 100):
+        self._condition = threading.Condition()
+        self._events: deque[dict] = deque(maxlen=buffer_size)
+        self._batch_size = batch_size
+        self._cursor: int | None = None  # 確認済みの最新イベントID
+        self._floor: int | None = None  # これより後のイベントはすべてバッファにある
+        self._subscribers = 0
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+
+    def open(self, max_subscribers: int) -> bool:
+        """接続を登録する（このプロセスの接続数が上限に達している場合は False）"""
+        with self._condition:
+            if self._pid != os.getpid():
+                # fork 後のワーカーでは親プロセスのスレッドと状態を引き継がない
+                self._pid = os.getpid()
+                self._thread = None
+                self._subscribers = 0
+                self._reset()
+            if self._subscribers >= max_subscribers:
+                return False
+            self._subscribers += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="change-event-hub", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+            return True
+
+    def close(self) -> None:
+        """接続の登録を解除する"""
+        with self._condition:
+            self._subscribers = max(self._subscribers - 1, 0)
+
+    def wait(self, cursor: int, timeout: float) -> list[dict] | None:
+        """
+        cursor より後のイベントを返す.
+
+        無ければ最大 timeout 秒待ち、それでも無ければ空のリストを返す。
+        cursor がバッファより古い場合は None を返す。
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._floor is not None:
+                    if cursor < self._floor:
+                        return None
+                    events = [event for event in self._events if event["id"] > cursor]
+                    if events:
+                        return events
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self._condition.wait(remaining)
+
+    def _reset(self) -> None:
+        self._events.clear()
+        self._cursor = None
+        self._floor = None
+
+    def _run(self) -> None:
+        db = get_db_manager()
+        while True:
+            with self._condition:
+                if self._subscribers == 0:
+                    # 接続が無い間は確認しない（再開時はバッファを作り直す）
+                    while self._subscribers == 0:
+                        self._condition.wait()
+                    self._reset()
+                cursor = self._cursor
+
+            try:
+                if cursor is None:
+                    cursor = latest_event_id(db)
+                    events = []
+                else:
+                    events = fetch_events_since(db, cursor, limit=self._batch_size)
+            except Exception as e:
+                print(f"Change event poll error: {e}")
+                traceback.print_exc()
+                time.sleep(config.EVENTS_POLL_INTERVAL)
+                continue
+
+            with self._condition:
+                if self._floor is None:
+                    self._floor = cursor
+                for event in events:
+                    if len(self._events) == self._events.maxlen:
+                        self._floor = self._events[0]["id"]
+                    self._events.append(event)
+                self._cursor = events[-1]["id"] if events else cursor
+                self._condition.notify_all()
+
+            # 取得しきれなかった場合は待たずに続きを取得する
+            if len(events) < self._batch_size:
+                time.sleep(config.EVENTS_POLL_INTERVAL)
+
+
+change_event_hub = ChangeEventHub()
+
+
+def publish_consumable_order_status(db, consumable_ids=None, dispatch_order_id: int | None = None) -> None:
+    """消耗品の現在の注文状態を ORDER_STATUS_CHANGED として配信する"""
+    if dispatch_order_id is not None:
+        df = db.execute_query(
+            """
+            SELECT c.id, c.code, c.order_status
+            FROM consumables c
+            WHERE c.id IN (
+                SELECT DISTINCT consumable_id
+                FROM dispatch_order_items
+                WHERE dispatch_order_id = :order_id
+                AND consumable_id IS NOT NULL
+            )
+            """,
+            {"order_id": dispatch_order_id},
+        )
+    else:
+        ids = [int(cid) for cid in (consumable_ids or []) if cid is not None]
+        if not ids:
+            return
+        placeholders = ", ".join(f":id{i}" for i in range(len(ids)))
+        df = db.execute_query(
+            f"SELECT id, code, order_status FROM consumables WHERE id IN ({placeholders})",
+            {f"id{i}": cid for i, cid in enumerate(ids)},
+        )
+
+    for _, row in df.iterrows():
+        event_bus.publish(event_bus.ORDER_STATUS_CHANGED, {
+            "consumable_id": int(row["id"]),
+            "code": row["code"],
+            "order_status": row["order_status"],
+        })
+
+
+def publish_dispatch_order_changed(db, order_id: int, deleted: bool = False) -> None:
+    """注文書の現在の状態を DISPATCH_CHANGED として配信する"""
+    if deleted:
+        event_bus.publish(event_bus.DISPATCH_CHANGED, {"id": int(order_id), "deleted": True})
+        return
+
+    df = db.execute_query(
+        """
+        SELECT
+            id, order_number, status,
+            reviewed_by_name, reviewed_at, approved_by_name, approved_at, sent_at
+        FROM dispatch_orders
+        WHERE id = :id
+        """,
+        {"id": order_id},
+    )
+    if df.empty:
+        return
+
+    row = df.iloc[0]
+    payload = {"id": int(row["id"]), "deleted": False}
+    for key in ("order_number", "status", "reviewed_by_name", "approved_by_name"):
+        payload[key] = row[key] if pd.notna(row[key]) else None
+    for key in ("reviewed_at", "approved_at", "sent_at"):
+        payload[key] = row[key].strftime("%Y-%m-%d %H:%M:%S") if pd.notna(row[key]) else None
+    event_bus.publish(event_bus.DISPATCH_CHANGED, payload)
@@ -0,0 +1,47 @@
+"""一覧APIの列指向（columnar）レスポンス形式ユーティリティ."""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+COLUMNAR = "columnar"
+
+
+def to_columnar(rows: list[dict], dictionary_columns: Iterable[str] = ()) -> dict:
+    """
+    行の辞書のリストを、列名を1回だけ持つ列指向の形式に変換する.
+
+    dictionary_columns の列（カテゴリ・状態など種類の少ない値）は辞書符号化し、
+    値の一覧を dictionaries に、各行にはその添字を入れる（NULL はそのまま null）。
+
+    Returns:
+        {"columns": [列名...], "rows": [[値...], ...], "dictionaries": {列名: [値...]}}
+    """
+    if not rows:
+        return {"columns": [], "rows": [], "dictionaries": {}}
+
+    columns = list(rows[0].keys())
+    dictionaries: dict[str, list] = {}
+    encoders = []
+    for column in columns:
+        if column in dictionary_columns:
+            dictionaries[column] = []
+            encoders.append((column, {}))
+        else:
+            encoders.append((column, None))
+
+    encoded_rows = []
+    for row in rows:
+        values = []
+        for column, lookup in encoders:
+            value = row.get(column)
+            if lookup is not None and value is not None:
+                index = lookup.get(value)
+                if index is None:
+                    index = lookup[value] = len(dictionaries[column])
+                    dictionaries[column].append(value)
+                value = index
+            values.append(value)
+        encoded_rows.append(values)
+
+    return {"columns": columns, "rows": encoded_rows, "dictionaries": dictionaries}
@@ -0,0 +1,190 @@
+"""レスポンス圧縮（gzip / brotli）ユーティリティ.
+
+JSON・HTML・静的ファイル（JS / CSS）を Accept-Encoding に応じて圧縮する。
+ストリーミングのレスポンスはチャンクごとに圧縮して送り、SSE（text/event-stream）は圧縮しない。
+"""
+
+from __future__ import annotations
+
+import gzip
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import current_app, request
+from werkzeug.security import safe_join
+
+import config
+
+try:
+    import brotli
+except ImportError:  # 任意の依存関係（無ければ gzip のみ）
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/javascript",
+    "application/manifest+json",
+    "image/svg+xml",
+    "text/css",
+    "text/csv",
+    "text/html",
+    "text/javascript",
+    "text/plain",
+}
+
+# 圧縮済みの静的ファイルを (パス, 更新日時, サイズ, 方式) ごとに保持する
+STATIC_CACHE_MAX_ENTRIES = 128
+
+_static_cache: OrderedDict[tuple, bytes] = OrderedDict()
+_static_cache_lock = threading.Lock()
+
+
+def compression(enabled: bool = True, min_size: int | None = None):
+    """
+    ルートごとに圧縮の有無と最小サイズを指定するデコレーター.
+
+    Example:
+        @bp.route("/api/large")
+        @compression(min_size=256)
+        def large(): ...
+    """
+    def decorator(view):
+        view.compression_options = {"enabled": enabled, "min_size": min_size}
+        return view
+
+    return decorator
+
+
+def _route_options() -> dict:
+    view = current_app.view_functions.get(request.endpoint) if request.endpoint else None
+    return getattr(view, "compression_options", {})
+
+
+def _choose_encoding() -> str | None:
+    accept = request.accept_encodings
+    if brotli is not None and accept["br"]:
+        return "br"
+    if accept["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress_bytes(data: bytes, encoding: str) -> bytes:
+    """バイト列を指定の方式で圧縮"""
+    if encoding == "br":
+        return brotli.compress(data, quality=config.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=config.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _compress_stream(chunks, encoding: str, flush_each: bool):
+    """チャンクを順に圧縮して返す（flush_each ならチャンクごとにクライアントへ送り出す）"""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=config.COMPRESSION_BROTLI_QUALITY)
+        for chunk in chunks:
+            data = compressor.process(chunk)
+            if flush_each:
+                data += compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+
+    compressor = zlib.compressobj(config.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if flush_each:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _compressed_static_file(filename: str, encoding: str) -> bytes | None:
+    """静的ファイルを圧縮して返す（ファイルが更新されるまで圧縮結果を再利用）"""
+    path = safe_join(current_app.static_folder, filename)
+    if path is None or not os.path.isfile(path):
+        return None
+
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size, encoding)
+    with _static_cache_lock:
+        body = _static_cache.get(key)
+        if body is not None:
+            _static_cache.move_to_end(key)
+            return body
+
+    with open(path, "rb") as f:
+        body = compress_bytes(f.read(), encoding)
+
+    with _static_cache_lock:
+        _static_cache[key] = body
+        while len(_static_cache) > STATIC_CACHE_MAX_ENTRIES:
+            _static_cache.popitem(last=False)
+    return body
+
+
+def compress_response(response):
+    """after_request フック: 条件を満たすレスポンスを圧縮する"""
+    if not config.COMPRESSION_ENABLED or response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+
+    # 圧縮の有無はリクエストの Accept-Encoding で変わるため、プロキシ・ブラウザのキャッシュに伝える
+    response.vary.add("Accept-Encoding")
+
+    if response.status_code != 200 or request.method == "HEAD" or "Content-Encoding" in response.headers:
+        return response
+
+    options = _route_options()
+    if not options.get("enabled", True):
+        return response
+
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    min_size = options.get("min_size")
+    if min_size is None:
+        min_size = config.COMPRESSION_MIN_SIZE
+    if response.content_length is not None and response.content_length < min_size:
+        return response
+
+    if response.direct_passthrough and request.endpoint == "static":
+        body = _compressed_static_file((request.view_args or {}).get("filename", ""), encoding)
+        if body is None:
+            return response
+        response.close()
+        response.direct_passthrough = False
+        response.set_data(body)
+    elif response.is_streamed:
+        # send_file（ファイルをそのまま送る）とジェネレーターは読み込みながら圧縮する
+        original = response.response
+        flush_each = not response.direct_passthrough
+        chunks = response.iter_encoded()
+        response.direct_passthrough = False
+        response.response = _compress_stream(chunks, encoding, flush_each)
+        if hasattr(original, "close"):
+            response.call_on_close(original.close)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        response.set_data(compress_bytes(data, encoding))
+
+    response.headers["Content-Encoding"] = encoding
+    # 圧縮後の表現に対する範囲リクエストには対応しない
+    response.headers.pop("Accept-Ranges", None)
+
+    # 強いETagはバイト列の一致を意味するため弱いETagにする（http_cache のETagは元から弱い）。
+    # 弱いETagは圧縮の有無によらず同じ値で比較されるため、If-None-Match による304はそのまま有効
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app) -> None:
+    """アプリにレスポンス圧縮を組み込む"""
+    app.after_request(compress_response)
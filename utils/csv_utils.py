@@ -5,6 +5,7 @@ from __future__ import annotations
 
 from numbers import Integral, Real
 from config import CSV_FIELD_ALIASES
+from utils import cache
 
 
 def resolve_csv_field(field_name: str | None) -> str | None:
@@ -61,8 +62,17 @@ def parse_float(value: str | int | float | None, default: float = 0.0) -> float:
     except (ValueError, TypeError):
         return default
 
-def resolve_supplier_id(db, row: dict[str, str | None], cache: dict[str, int | None]) -> int | None:
-    """仕入先IDを解決（キャッシュ付き）"""
+def get_supplier_id_map(db) -> dict[str, int]:
+    """購入先名（大文字小文字を区別しない） → ID の対応表（マスターデータのキャッシュを使用）"""
+    def load():
+        df = db.execute_query("SELECT id, name FROM suppliers")
+        return {str(row["name"]).strip().casefold(): int(row["id"]) for _, row in df.iterrows()}
+
+    return cache.cached(cache.SUPPLIERS, "id_by_name", load)
+
+
+def resolve_supplier_id(db, row: dict[str, str | None], supplier_ids: dict[str, int] | None = None) -> int | None:
+    """仕入先IDを解決（購入先名は get_supplier_id_map の対応表で照合、CSV取込では1回だけ取得して渡す）"""
     supplier_id_value = row.get("supplier_id")
     if supplier_id_value not in (None, ""):
         try:
@@ -80,11 +90,6 @@ def resolve_supplier_id(db, row: dict[str, str | None], cache: dict[str, int | N
     if not supplier_name:
         return None
 
-    if supplier_name not in cache:
-        result = db.execute_query(
-            "SELECT id FROM suppliers WHERE name = :name",
-            {"name": supplier_name},
-        )
-        cache[supplier_name] = int(result.iloc[0]["id"]) if not result.empty else None
-
-    return cache[supplier_name]
+    if supplier_ids is None:
+        supplier_ids = get_supplier_id_map(db)
+    return supplier_ids.get(supplier_name.casefold())
@@ -0,0 +1,73 @@
+"""日付・タイムゾーン関連のユーティリティ."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+# DBの NOW() で記録される日時はUTC、画面で扱う日付はJST
+JST = timedelta(hours=9)
+
+
+def to_jst_date(ts) -> str | None:
+    """UTC datetimeをJST日付文字列(YYYY-MM-DD)に変換"""
+    if not pd.notna(ts):
+        return None
+    return (ts + JST).strftime('%Y-%m-%d')
+
+
+def jst_date_sql(column: str) -> str:
+    """UTCの日時カラムをJST日付に変換するSQL式を返す"""
+    return f"DATE({column} + INTERVAL {int(JST.total_seconds() // 3600)} HOUR)"
+
+
+def parse_date(value) -> date | None:
+    """YYYY-MM-DD 形式の文字列を date に変換（空なら None）"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value).strip()[:10], "%Y-%m-%d").date()
+    except ValueError as e:
+        raise ValueError(f"日付の形式が正しくありません: {value}") from e
+
+
+def jst_day_start_utc(day: date) -> datetime:
+    """JST日付の0時をUTCのnaive datetimeで返す"""
+    return datetime(day.year, day.month, day.day) - JST
+
+
+def jst_date_range(start_date=None, end_date=None) -> tuple[datetime | None, datetime | None]:
+    """
+    JSTの日付範囲（両端を含む）をUTCの半開区間 [start, end) に変換する.
+
+    DATE(column) で比較するとインデックスが使えないため、
+    ``column >= :start AND column < :end`` の形で絞り込むために使う。
+    """
+    start_day = parse_date(start_date)
+    end_day = parse_date(end_date)
+    start = jst_day_start_utc(start_day) if start_day else None
+    end = jst_day_start_utc(end_day + timedelta(days=1)) if end_day else None
+    return start, end
+
+
+def build_date_range_clause(column: str, start_date=None, end_date=None, prefix: str = "date") -> tuple[str, dict]:
+    """
+    JSTの日付範囲をインデックスが使える WHERE 句に変換する.
+
+    戻り値は (" AND ..." 形式の句, パラメータ)。条件がなければ空文字を返す。
+    """
+    start, end = jst_date_range(start_date, end_date)
+    clause = ""
+    params: dict = {}
+    if start is not None:
+        clause += f" AND {column} >= :{prefix}_start"
+        params[f"{prefix}_start"] = start
+    if end is not None:
+        clause += f" AND {column} < :{prefix}_end"
+        params[f"{prefix}_end"] = end
+    return clause, params
@@ -0,0 +1,71 @@
+"""部署マスター（departments）ユーティリティ."""
+
+from __future__ import annotations
+
+from sqlalchemy import text
+
+from utils import cache
+
+
+def normalize_department_name(name) -> str:
+    """部署名の前後の空白を除去（None は空文字）"""
+    return str(name or "").strip()
+
+
+def list_departments(db, version: str | None = None) -> list[dict]:
+    """
+    部署の一覧（名前順、マスターデータのキャッシュを使用）.
+
+    ETag を付けるAPIでは version に current_resource_version() を渡す（プロセス内キャッシュの古い一覧を返さないように）。
+    """
+    def load():
+        df = db.execute_query("SELECT id, name FROM departments ORDER BY name")
+        return [{"id": int(row["id"]), "name": row["name"]} for _, row in df.iterrows()]
+
+    return cache.cached(cache.DEPARTMENTS, "list", load, version=version)
+
+
+def find_department_id(db, name) -> int | None:
+    """部署名から部署IDを取得（未登録なら None、他のワーカーで追加された部署も引けるよう一意インデックスで直接引く）"""
+    name = normalize_department_name(name)
+    if not name:
+        return None
+    df = db.execute_query("SELECT id FROM departments WHERE name = :name", {"name": name})
+    return int(df.iloc[0]["id"]) if not df.empty else None
+
+
+def ensure_department_in_session(session, name) -> tuple[int | None, bool]:
+    """
+    部署IDを取得し、未登録なら departments に追加する（トランザクション内で使用）.
+
+    (部署ID, 新規に追加したか) を返す。既存の部署はロックを取らない通常の SELECT で引く。
+    """
+    name = normalize_department_name(name)
+    if not name:
+        return None, False
+
+    department_id = session.execute(
+        text("SELECT id FROM departments WHERE name = :name"), {"name": name}
+    ).scalar()
+    if department_id is not None:
+        return int(department_id), False
+
+    # 同時に追加された場合は既存の行のIDを LAST_INSERT_ID で受け取る
+    result = session.execute(
+        text("INSERT INTO departments (name) VALUES (:name) ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id)"),
+        {"name": name},
+    )
+    return int(result.lastrowid), True
+
+
+def ensure_department(db, name) -> int | None:
+    """部署IDを取得し、未登録なら departments に追加する（従業員の登録時など）"""
+    department_id = find_department_id(db, name)
+    if department_id is not None or not normalize_department_name(name):
+        return department_id
+
+    with db.transaction() as session:
+        department_id, created = ensure_department_in_session(session, name)
+    if created:
+        cache.invalidate(cache.DEPARTMENTS)
+    return department_id
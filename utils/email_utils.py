@@ -6,7 +6,8 @@ from __future__ import annotations
 import smtplib
 from email.message import EmailMessage
 
-from config import SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, SMTP_USE_TLS, SMTP_FROM
+from config import SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, SMTP_USE_TLS, SMTP_FROM, SMTP_TIMEOUT_SECONDS
+from utils.metrics import SMTP_SEND, timed
 from utils.validators import normalize_recipient_list
 
 
@@ -46,7 +47,7 @@ def send_order_email(email_payload: dict, pdf_bytes: bytes, pdf_filename: str):
 
     all_recipients = to_list + cc_list + bcc_list
 
-    with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
+    with timed(SMTP_SEND), smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT_SECONDS) as server:
         if SMTP_USE_TLS:
             server.starttls()
         if SMTP_USER and SMTP_PASSWORD:
@@ -0,0 +1,50 @@
+"""プロセス内の簡易イベント配信（Pub/Sub）ユーティリティ."""
+
+from __future__ import annotations
+
+import threading
+import traceback
+from collections import defaultdict
+from typing import Any, Callable
+
+# トピック名
+STOCK_CHANGED = "stock.changed"  # 在庫数・欠品状態が変わった
+LOW_STOCK_ENTERED = "low_stock.entered"  # 発注が必要な状態になった
+LOW_STOCK_CLEARED = "low_stock.cleared"  # 発注が不要な状態に戻った
+ORDER_STATUS_CHANGED = "order.status_changed"  # 消耗品の注文状態が変わった
+DISPATCH_CHANGED = "dispatch.changed"  # 注文書の作成・確認・承認・送信・入庫・削除
+
+Subscriber = Callable[[str, dict], Any]
+
+_subscribers: dict[str, list[Subscriber]] = defaultdict(list)
+_lock = threading.Lock()
+
+
+def subscribe(topic: str, callback: Subscriber) -> Callable[[], None]:
+    """トピックを購読し、購読解除用の関数を返す"""
+    with _lock:
+        _subscribers[topic].append(callback)
+
+    def unsubscribe():
+        with _lock:
+            if callback in _subscribers[topic]:
+                _subscribers[topic].remove(callback)
+
+    return unsubscribe
+
+
+def publish(topic: str, payload: dict) -> None:
+    """
+    トピックの購読者にイベントを配信する.
+
+    購読者の例外は呼び出し元（在庫更新など）に影響させないようログ出力のみとする。
+    """
+    with _lock:
+        callbacks = list(_subscribers.get(topic, ()))
+
+    for callback in callbacks:
+        try:
+            callback(topic, payload)
+        except Exception as e:
+            print(f"Event subscriber error ({topic}): {e}")
+            traceback.print_exc()
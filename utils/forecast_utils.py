@@ -0,0 +1,230 @@
+"""消費ペースを予測して発注点・発注数を算出するユーティリティ."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import text
+
+import config
+from utils.date_utils import JST
+from utils.stock_utils import REFRESH_NEEDS_REORDER_SQL
+
+
+def build_demand_matrix(
+    item_ids: np.ndarray,
+    row_item_ids: np.ndarray,
+    row_day_offsets: np.ndarray,
+    row_quantities: np.ndarray,
+    days: int,
+) -> np.ndarray:
+    """
+    (消耗品ID, 日, 数量) の明細を 品目 × 日 の消費量行列に変換する.
+
+    item_ids は昇順に並んだ全品目のID。明細に含まれない日は0になる。
+    """
+    matrix = np.zeros((len(item_ids), days), dtype=np.float64)
+    if len(row_item_ids) == 0:
+        return matrix
+
+    rows = np.searchsorted(item_ids, row_item_ids)
+    valid = (
+        (rows < len(item_ids))
+        & (item_ids[np.minimum(rows, len(item_ids) - 1)] == row_item_ids)
+        & (row_day_offsets >= 0)
+        & (row_day_offsets < days)
+    )
+    np.add.at(matrix, (rows[valid], row_day_offsets[valid]), row_quantities[valid])
+    return matrix
+
+
+def simple_moving_average(matrix: np.ndarray, window: int) -> np.ndarray:
+    """直近 window 日の1日あたり平均消費量"""
+    window = max(1, min(window, matrix.shape[1]))
+    return matrix[:, -window:].mean(axis=1)
+
+
+def exponential_smoothing(matrix: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    指数平滑法による1日あたり消費量.
+
+    s_t = alpha * x_t + (1 - alpha) * s_{t-1}（s_0 = x_0）を
+    重みベクトルとの内積で全品目まとめて計算する。
+    """
+    days = matrix.shape[1]
+    if days == 0:
+        return np.zeros(matrix.shape[0])
+    exponents = np.arange(days - 1, -1, -1)
+    weights = alpha * (1 - alpha) ** exponents
+    weights[0] = (1 - alpha) ** (days - 1)
+    return matrix @ weights
+
+
+def compute_reorder_policy(
+    daily_rate: np.ndarray,
+    daily_std: np.ndarray,
+    lead_time_days: np.ndarray,
+    stock_quantity: np.ndarray,
+    safety_stock: np.ndarray,
+    order_unit: np.ndarray,
+    service_factor: float,
+    review_days: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    発注点と推奨発注数を算出する.
+
+    発注点 = リードタイム中の消費量 + 安全係数 × 標準偏差 × √リードタイム（安全在庫を下限とする）
+    発注数 = 発注点 + review_days 日分の消費量 まで補充する数を発注単位で切り上げ
+    消費実績がない品目は従来どおり安全在庫の2倍まで補充する。
+    """
+    lead = np.maximum(lead_time_days, 0).astype(np.float64)
+    reorder_point = np.ceil(daily_rate * lead + service_factor * daily_std * np.sqrt(lead))
+    reorder_point = np.maximum(reorder_point, safety_stock)
+
+    target = np.where(
+        daily_rate > 0,
+        reorder_point + np.ceil(daily_rate * review_days),
+        safety_stock * 2,
+    )
+    unit = np.maximum(order_unit, 1)
+    shortfall = np.maximum(target - stock_quantity, 0)
+    order_quantity = np.maximum(np.ceil(shortfall / unit), 1) * unit
+
+    return reorder_point.astype(np.int64), order_quantity.astype(np.int64)
+
+
+def suggest_order_quantity(stock_quantity, safety_stock, order_unit, reorder_point=None, daily_rate=None) -> int:
+    """
+    現在の在庫数から1品目の推奨発注数を算出する（注文依頼の作成時に使用）.
+
+    予測が未算出の品目は従来どおり安全在庫の2倍まで補充する。
+    """
+    stock = int(stock_quantity or 0)
+    safety = int(safety_stock or 0)
+    unit = max(int(order_unit or 1), 1)
+    rate = float(daily_rate or 0)
+
+    if reorder_point is not None and rate > 0:
+        target = int(reorder_point) + int(np.ceil(rate * config.FORECAST_REVIEW_DAYS))
+    else:
+        target = safety * 2
+    shortfall = max(target - stock, 0)
+    return max(int(np.ceil(shortfall / unit)), 1) * unit
+
+
+def run_forecast(db, history_days: int | None = None) -> int:
+    """全消耗品の消費予測を算出して consumable_forecasts に保存し、件数を返す"""
+    history_days = history_days or config.FORECAST_HISTORY_DAYS
+
+    items_df = db.execute_query(
+        """
+        SELECT
+            c.id,
+            c.stock_quantity,
+            c.safety_stock,
+            c.order_unit,
+            COALESCE(s.lead_time_days, :default_lead_time) AS lead_time_days
+        FROM consumables c
+        LEFT JOIN suppliers s ON c.supplier_id = s.id
+        ORDER BY c.id
+        """,
+        {"default_lead_time": config.DEFAULT_LEAD_TIME_DAYS},
+    )
+    if items_df.empty:
+        return 0
+
+    # 当日分は途中経過のため、前日までの history_days 日を対象とする（JST）
+    today = (datetime.utcnow() + JST).date()
+    start_date = today - timedelta(days=history_days)
+    usage_df = db.execute_query(
+        """
+        SELECT consumable_id, stat_date, SUM(quantity) AS quantity
+        FROM consumption_daily
+        WHERE movement_type = 'outbound'
+          AND stat_date >= :start_date AND stat_date < :end_date
+        GROUP BY consumable_id, stat_date
+        """,
+        {"start_date": start_date, "end_date": today},
+    )
+
+    item_ids = items_df["id"].to_numpy(dtype=np.int64)
+    if usage_df.empty:
+        matrix = np.zeros((len(item_ids), history_days))
+    else:
+        day_offsets = (
+            usage_df["stat_date"].map(lambda d: (d - start_date).days).to_numpy(dtype=np.int64)
+        )
+        matrix = build_demand_matrix(
+            item_ids,
+            usage_df["consumable_id"].to_numpy(dtype=np.int64),
+            day_offsets,
+            usage_df["quantity"].to_numpy(dtype=np.float64),
+            history_days,
+        )
+
+    sma = simple_moving_average(matrix, config.FORECAST_SMA_DAYS)
+    ewma = exponential_smoothing(matrix, config.FORECAST_EWMA_ALPHA)
+    # 消費の増加に遅れないよう、移動平均と指数平滑の大きい方を採用する
+    daily_rate = np.maximum(sma, ewma)
+    daily_std = matrix[:, -max(1, config.FORECAST_SMA_DAYS):].std(axis=1)
+
+    stock = items_df["stock_quantity"].fillna(0).to_numpy(dtype=np.float64)
+    lead_time = items_df["lead_time_days"].fillna(config.DEFAULT_LEAD_TIME_DAYS).to_numpy(dtype=np.float64)
+    reorder_point, order_quantity = compute_reorder_policy(
+        daily_rate,
+        daily_std,
+        lead_time,
+        stock,
+        items_df["safety_stock"].fillna(0).to_numpy(dtype=np.float64),
+        items_df["order_unit"].fillna(1).to_numpy(dtype=np.float64),
+        config.FORECAST_SERVICE_FACTOR,
+        config.FORECAST_REVIEW_DAYS,
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days_of_stock = np.where(daily_rate > 0, stock / daily_rate, np.nan)
+
+    records = [
+        {
+            "consumable_id": int(item_ids[i]),
+            "daily_rate_sma": round(float(sma[i]), 4),
+            "daily_rate_ewma": round(float(ewma[i]), 4),
+            "daily_rate": round(float(daily_rate[i]), 4),
+            "daily_std": round(float(daily_std[i]), 4),
+            "lead_time_days": int(lead_time[i]),
+            "reorder_point": int(reorder_point[i]),
+            "order_quantity": int(order_quantity[i]),
+            "days_of_stock": None if np.isnan(days_of_stock[i]) else round(float(days_of_stock[i]), 1),
+        }
+        for i in range(len(item_ids))
+    ]
+
+    upsert = text(
+        """
+        INSERT INTO consumable_forecasts (
+            consumable_id, daily_rate_sma, daily_rate_ewma, daily_rate, daily_std,
+            lead_time_days, reorder_point, order_quantity, days_of_stock
+        ) VALUES (
+            :consumable_id, :daily_rate_sma, :daily_rate_ewma, :daily_rate, :daily_std,
+            :lead_time_days, :reorder_point, :order_quantity, :days_of_stock
+        )
+        ON DUPLICATE KEY UPDATE
+            daily_rate_sma = VALUES(daily_rate_sma),
+            daily_rate_ewma = VALUES(daily_rate_ewma),
+            daily_rate = VALUES(daily_rate),
+            daily_std = VALUES(daily_std),
+            lead_time_days = VALUES(lead_time_days),
+            reorder_point = VALUES(reorder_point),
+            order_quantity = VALUES(order_quantity),
+            days_of_stock = VALUES(days_of_stock),
+            computed_at = CURRENT_TIMESTAMP
+        """
+    )
+    chunk_size = 1000
+    with db.transaction() as session:
+        for start in range(0, len(records), chunk_size):
+            session.execute(upsert, records[start:start + chunk_size])
+        # 発注点が変わるため発注要否を一括で再計算
+        session.execute(text(REFRESH_NEEDS_REORDER_SQL))
+
+    return len(records)
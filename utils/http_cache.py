@@ -0,0 +1,111 @@
+"""読み取りAPIの条件付きGET（ETag / 304 Not Modified）ユーティリティ."""
+
+from __future__ import annotations
+
+import hashlib
+from functools import wraps
+
+from flask import g, has_request_context, make_response, request
+
+from database_manager import get_db_manager
+
+# 直近に更新があったデータは同じ秒内の更新を区別できない（TIMESTAMPは秒単位）ため、
+# この秒数が経過するまではETagを付けない
+VOLATILE_SECONDS = 2
+
+# Cache-Control（ブラウザは毎回ETagで再検証する）
+REVALIDATE = "private, no-cache"
+
+
+def _build_fingerprint_sql(sources) -> str:
+    columns = ["NOW() AS db_now"]
+    for i, (table, column, with_count) in enumerate(sources):
+        columns.append(f"(SELECT MAX({column}) FROM {table}) AS v{i}")
+        if with_count:
+            # 削除は MAX では検知できないため件数も含める
+            columns.append(f"(SELECT COUNT(*) FROM {table}) AS c{i}")
+    return "SELECT " + ", ".join(columns)
+
+
+def resource_fingerprint(db, sources) -> str | None:
+    """
+    リソースのバージョン（各テーブルの MAX(列) と件数）を返す.
+
+    sources は (テーブル名, バージョン列, 件数を含めるか) のタプルの並び。
+    バージョン列が updated_at などの日時で、直近 VOLATILE_SECONDS 秒以内に
+    更新されている場合や取得に失敗した場合は None（キャッシュしない）。
+    """
+    df = db.execute_query(_build_fingerprint_sql(sources))
+    if df.empty:
+        return None
+
+    row = df.iloc[0]
+    db_now = row["db_now"]
+    values = []
+    for i, (_table, column, with_count) in enumerate(sources):
+        version = row[f"v{i}"]
+        if column != "id" and version is not None and str(version) != "NaT":
+            if (db_now - version).total_seconds() < VOLATILE_SECONDS:
+                return None
+        values.append(str(version))
+        if with_count:
+            values.append(str(row[f"c{i}"]))
+    return "|".join(values)
+
+
+def current_resource_version() -> str | None:
+    """
+    conditional_get が計算したリソースのバージョン（ETag の元、計算できなかった場合は None）.
+
+    ETag を付けるAPIで本文をキャッシュする場合はキーに含める（cache.cached の version）。
+    含めないと、他のワーカーで更新された後も古い本文に新しいETagを付けて返してしまう。
+    """
+    if not has_request_context():
+        return None
+    return g.get("resource_version")
+
+
+def conditional_get(*sources, cache_control: str = REVALIDATE):
+    """
+    GETのレスポンスにETagとCache-Controlを付け、If-None-Match が一致すれば304を返すデコレーター.
+
+    ETagはリソースのバージョンとクエリ文字列から作るため、ビュー関数を呼ばずに304を返せる。
+    sources を省略した場合（DBに依存しない固定データ）はレスポンス本文のハッシュを使う。
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not sources:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200:
+                    response.headers["Cache-Control"] = cache_control
+                    response.add_etag(weak=True)
+                    response.make_conditional(request)
+                return response
+
+            etag = None
+            g.resource_version = None
+            try:
+                fingerprint = resource_fingerprint(get_db_manager(), sources)
+                g.resource_version = fingerprint
+                if fingerprint is not None:
+                    key = f"{request.full_path}|{fingerprint}"
+                    etag = hashlib.sha1(key.encode("utf-8")).hexdigest()
+            except Exception as e:
+                print(f"ETag calculation error ({request.path}): {e}")
+
+            if etag and request.if_none_match.contains_weak(etag):
+                response = make_response("", 304)
+                response.set_etag(etag, weak=True)
+                response.headers["Cache-Control"] = cache_control
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if etag and response.status_code == 200:
+                response.set_etag(etag, weak=True)
+                response.headers["Cache-Control"] = cache_control
+            return response
+
+        return wrapper
+
+    return decorator
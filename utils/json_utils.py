@@ -0,0 +1,111 @@
+"""JSONレスポンスの高速シリアライズ（orjson）ユーティリティ.
+
+orjson が使えない環境では標準の json モジュールで同じ変換規則を適用する。
+日時は "%Y-%m-%d %H:%M:%S"、Decimal は数値、NaN / NaT は null に変換するため、
+ルート側で DataFrame の NaN 除去や strftime をする必要はない。
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import math
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # 任意の依存関係（無ければ標準の json を使う）
+    orjson = None
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+DATE_FORMAT = "%Y-%m-%d"
+
+if orjson is not None:
+    # datetime は to_json_value() で書式を揃える（orjson標準のISO形式にしない）
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+else:
+    ORJSON_OPTIONS = 0
+
+
+def to_json_value(value: Any) -> Any:
+    """JSONでそのまま表せない値を変換する（orjson / json の default 関数）"""
+    if value is pd.NaT:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime(DATETIME_FORMAT)
+    if isinstance(value, date):
+        return value.strftime(DATE_FORMAT)
+    if isinstance(value, time):
+        return value.strftime("%H:%M:%S")
+    if isinstance(value, timedelta):
+        # MySQL の TIME 型は timedelta で返る
+        return str(value)
+    if isinstance(value, Decimal):
+        return None if value.is_nan() else float(value)
+    if isinstance(value, np.generic):
+        item = value.item()
+        return None if isinstance(item, float) and math.isnan(item) else item
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _replace_nan(value: Any) -> Any:
+    """標準の json 用に NaN を None に置き換える（orjson は NaN を null にする）"""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, dict):
+        return {k: _replace_nan(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_replace_nan(v) for v in value]
+    return value
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """オブジェクトをUTF-8のJSONバイト列に変換"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=to_json_value, option=ORJSON_OPTIONS)
+    return dumps(obj).encode("utf-8")
+
+
+def dumps(obj: Any) -> str:
+    """オブジェクトをJSON文字列に変換"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=to_json_value, option=ORJSON_OPTIONS).decode("utf-8")
+    return json.dumps(_replace_nan(obj), ensure_ascii=False, default=to_json_value, allow_nan=False)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify / request.get_json で使う Flask の JSON プロバイダー"""
+
+    ensure_ascii = False
+    sort_keys = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if orjson is None:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
+
+
+def init_json_provider(app) -> None:
+    """アプリのJSONプロバイダーを差し替える"""
+    app.json = FastJSONProvider(app)
@@ -0,0 +1,376 @@
+"""リクエスト時間・SQL・PDF/QR/SMTP処理時間の計測ユーティリティ.
+
+計測値はワーカープロセスごとにメモリ上で集計し、METRICS_DIR に worker_<pid>_<起動時刻>.json として
+定期的に書き出す。/metrics（Prometheusのテキスト形式）は書き出された全ワーカーの値を合計して返す
+（どのワーカーが応答しても同じ系列になる）。終了したワーカーの値は gunicorn の child_exit で
+archive.json に足し込み、カウンターが減らないようにする。
+各レスポンスには Server-Timing ヘッダー（処理全体・DB・PDF作成などの内訳）を付ける。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import config
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+ARCHIVE_FILE = "archive.json"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """ラベルごとの累積カウンター"""
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def collect(self) -> dict[tuple, float]:
+        with self._lock:
+            return dict(self._values)
+
+    @staticmethod
+    def merge(total: dict, values: dict) -> None:
+        for label_values, value in values.items():
+            total[label_values] = total.get(label_values, 0) + value
+
+    def render(self, values: dict) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    """ラベルごとのヒストグラム（累積バケット・合計・件数）"""
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # [バケットごとの件数..., 合計, 件数]
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def collect(self) -> dict[tuple, list]:
+        with self._lock:
+            return {key: list(series) for key, series in self._series.items()}
+
+    def merge(self, total: dict, values: dict) -> None:
+        for label_values, series in values.items():
+            if len(series) != len(self.buckets) + 2:
+                continue  # バケットを変更する前に書き出された値
+            current = total.get(label_values)
+            if current is None:
+                total[label_values] = list(series)
+            else:
+                total[label_values] = [a + b for a, b in zip(current, series)]
+
+    def render(self, values: dict) -> list[str]:
+        names = self.labels
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(values.items()):
+            for bound, count in zip(self.buckets, series):
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(names, label_values, le)} {count}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(names, label_values, inf)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(names, label_values)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(names, label_values)} {series[-1]}")
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "リクエストの処理時間", ("endpoint", "method", "status")
+)
+REQUEST_SQL_STATEMENTS = Histogram(
+    "http_request_sql_statements", "1リクエストで実行したSQLの件数", ("endpoint",), QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds", "1リクエストのSQL実行時間の合計", ("endpoint",)
+)
+SQL_STATEMENTS_TOTAL = Counter("sql_statements_total", "実行したSQLの件数", ("endpoint",))
+OPERATION_DURATION = Histogram(
+    "operation_duration_seconds", "PDF作成・QR読み取り・SMTP送信などの処理時間", ("operation",)
+)
+
+METRICS = (REQUEST_DURATION, REQUEST_SQL_STATEMENTS, REQUEST_DB_DURATION, SQL_STATEMENTS_TOTAL, OPERATION_DURATION)
+
+# Server-Timing の名前（英数字のみ使える）
+PDF_RENDER = "pdf_render"
+QR_DECODE = "qr_decode"
+SMTP_SEND = "smtp_send"
+
+
+def _request_endpoint() -> str:
+    return request.endpoint or "unmatched"
+
+
+@contextmanager
+def timed(operation: str):
+    """
+    処理時間を operation_duration_seconds と Server-Timing に記録する.
+
+    Example:
+        with timed(PDF_RENDER):
+            ...
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        OPERATION_DURATION.observe(elapsed, operation)
+        if has_request_context() and "metrics_timings" in g:
+            g.metrics_timings.append((operation, elapsed))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_list = conn.info.get("metrics_query_started")
+    if not started_list:
+        return
+    elapsed = time.perf_counter() - started_list.pop()
+    if has_request_context() and "metrics_sql_count" in g:
+        g.metrics_sql_count += 1
+        g.metrics_sql_seconds += elapsed
+
+
+def _start_request_timer():
+    g.metrics_started = time.perf_counter()
+    g.metrics_sql_count = 0
+    g.metrics_sql_seconds = 0.0
+    g.metrics_timings = []
+
+
+def _record_request(response):
+    started = g.pop("metrics_started", None)
+    if started is None:
+        return response
+
+    elapsed = time.perf_counter() - started
+    endpoint = _request_endpoint()
+    sql_count = g.get("metrics_sql_count", 0)
+    sql_seconds = g.get("metrics_sql_seconds", 0.0)
+
+    REQUEST_DURATION.observe(elapsed, endpoint, request.method, str(response.status_code))
+    REQUEST_SQL_STATEMENTS.observe(sql_count, endpoint)
+    REQUEST_DB_DURATION.observe(sql_seconds, endpoint)
+    if sql_count:
+        SQL_STATEMENTS_TOTAL.inc(endpoint, amount=sql_count)
+    _dump_if_due()
+
+    if config.METRICS_SERVER_TIMING:
+        entries = [
+            f"app;dur={elapsed * 1000:.1f}",
+            f'db;dur={sql_seconds * 1000:.1f};desc="{sql_count} queries"',
+        ]
+        entries.extend(f"{name};dur={seconds * 1000:.1f}" for name, seconds in g.get("metrics_timings", []))
+        response.headers["Server-Timing"] = ", ".join(entries)
+    return response
+
+
+_dump_lock = threading.Lock()
+_last_dump = 0.0
+_worker: tuple[int, str] | None = None
+
+
+def _worker_key() -> str:
+    """このワーカーの書き出し先の名前（PIDの再利用で別のワーカーと混ざらないよう起動時刻を付ける）"""
+    global _worker
+    pid = os.getpid()
+    with _dump_lock:
+        if _worker is None or _worker[0] != pid:
+            _worker = (pid, f"worker_{pid}_{time.time_ns()}")
+        return _worker[1]
+
+
+def _encode(totals: dict[str, dict]) -> dict[str, list]:
+    return {name: [[list(key), value] for key, value in values.items()] for name, values in totals.items()}
+
+
+def _read(path: Path) -> dict | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Metrics load error: {path}: {e}")
+        return None
+
+
+def _write(path: Path, data: dict) -> None:
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    # 読み込み中の集計が途中までの内容にならないよう置き換える
+    os.replace(tmp_path, path)
+
+
+def snapshot() -> dict:
+    """このワーカーの計測値を返す"""
+    return {
+        "worker": _worker_key(),
+        "metrics": _encode({metric.name: metric.collect() for metric in METRICS}),
+    }
+
+
+def merge_snapshots(snapshots: list[dict]) -> dict[str, dict]:
+    """ワーカーごとの計測値を系列ごとに合計する"""
+    metrics = {metric.name: metric for metric in METRICS}
+    totals: dict[str, dict] = {name: {} for name in metrics}
+    for item in snapshots:
+        for name, rows in item.get("metrics", {}).items():
+            metric = metrics.get(name)
+            if metric is not None:
+                metric.merge(totals[name], {tuple(key): value for key, value in rows})
+    return totals
+
+
+def dump_metrics(directory: Path | str | None = None) -> Path:
+    """このワーカーの計測値を worker_<pid>_<起動時刻>.json に書き出す"""
+    directory = Path(directory or config.METRICS_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    item = snapshot()
+    path = directory / f"{item['worker']}.json"
+    _write(path, item)
+    return path
+
+
+def _dump_if_due() -> None:
+    global _last_dump
+    interval = config.METRICS_DUMP_SECONDS
+    if interval <= 0:
+        return
+    now = time.monotonic()
+    with _dump_lock:
+        if now - _last_dump < interval:
+            return
+        _last_dump = now
+    try:
+        dump_metrics()
+    except OSError as e:
+        print(f"Metrics dump error: {e}")
+
+
+def load_snapshots(directory: Path | str | None = None) -> list[dict]:
+    """書き出された全ワーカーの計測値（終了したワーカーの合計を含む）を読み込む"""
+    directory = Path(directory or config.METRICS_DIR)
+    snapshots = [item for item in map(_read, sorted(directory.glob("worker_*.json"))) if item]
+    # archive_worker は archive.json に移したワーカーを記録してからファイルを消すため、
+    # ワーカーのファイルより後に読み、記録済みのワーカーを除く（二重に数えない）
+    archive = _read(directory / ARCHIVE_FILE)
+    if archive:
+        archived = set(archive.get("workers", []))
+        snapshots = [item for item in snapshots if item.get("worker") not in archived]
+        snapshots.append(archive)
+    return snapshots
+
+
+def archive_worker(pid: int, directory: Path | str | None = None) -> None:
+    """
+    終了したワーカーの計測値を archive.json に足し込み、ワーカーのファイルを消す.
+
+    gunicorn のマスター（child_exit）から呼ぶ。
+    """
+    directory = Path(directory or config.METRICS_DIR)
+    paths = sorted(directory.glob(f"worker_{pid}_*.json"))
+    if not paths:
+        return
+    dumped = [item for item in map(_read, paths) if item]
+    archive = _read(directory / ARCHIVE_FILE) or {"workers": [], "metrics": {}}
+
+    # 記録は消し終えていないファイルの分だけ残す（消したファイルは読まれないため不要）
+    existing = {path.stem for path in directory.glob("worker_*.json")}
+    moved = [item["worker"] for item in dumped]
+    workers = [key for key in archive.get("workers", []) if key in existing and key not in moved] + moved
+    _write(
+        directory / ARCHIVE_FILE,
+        {"workers": workers, "metrics": _encode(merge_snapshots([archive, *dumped]))},
+    )
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+def clear_dumps(directory: Path | str | None = None) -> None:
+    """書き出した計測値を消す（サーバーの起動時に前回の値を引き継がない）"""
+    directory = Path(directory or config.METRICS_DIR)
+    for path in directory.glob("*.json"):
+        path.unlink(missing_ok=True)
+
+
+def render_metrics() -> str:
+    """Prometheus のテキスト形式で全ワーカーの合計を出力する"""
+    own = snapshot()
+    snapshots = [own]
+    if config.METRICS_DUMP_SECONDS > 0:
+        # このワーカーは書き出し済みのファイルではなくメモリ上の最新の値を使う
+        snapshots.extend(item for item in load_snapshots() if item.get("worker") != own["worker"])
+
+    totals = merge_snapshots(snapshots)
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render(totals[metric.name]))
+    return "\n".join(lines) + "\n"
+
+
+_sql_listeners_registered = False
+
+
+def init_metrics(app) -> None:
+    """リクエストの計測とSQLの計測を組み込む"""
+    global _sql_listeners_registered
+    if not config.METRICS_ENABLED:
+        return
+
+    if not _sql_listeners_registered:
+        # DatabaseManager のエンジンを作る前に登録できるよう Engine クラス全体に設定する
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _sql_listeners_registered = True
+
+    app.before_request(_start_request_timer)
+    app.after_request(_record_request)
@@ -0,0 +1,379 @@
+"""入出庫（在庫移動）を記録するユーティリティ."""
+
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.exc import DataError, IntegrityError
+
+from utils import cache, event_bus
+from utils.date_utils import jst_date_sql
+from utils.department_utils import ensure_department_in_session
+from utils.stock_utils import NEEDS_REORDER_SQL, calculate_shortage_status
+
+MOVEMENT_INBOUND = "inbound"
+MOVEMENT_OUTBOUND = "outbound"
+
+# 台帳の移動種別と画面表示用の種別
+MOVEMENT_TYPE_LABELS = {
+    MOVEMENT_INBOUND: "入庫",
+    MOVEMENT_OUTBOUND: "出庫",
+}
+
+
+class MovementError(ValueError):
+    """入出庫を記録できない場合の例外"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class MovementBatchError(MovementError):
+    """まとめて記録する入出庫に記録できないものがあり、すべて取り消した場合の例外"""
+
+    def __init__(self, results: list[dict]):
+        super().__init__("記録できない明細があるため、すべての入出庫を取り消しました", status_code=409)
+        self.results = results
+
+
+def apply_movement(
+    session,
+    *,
+    movement_type: str,
+    consumable_id: int,
+    quantity: int,
+    employee_name: str,
+    employee_department: str = "",
+    note: str = "",
+    code: str | None = None,
+    name: str | None = None,
+    unit_price: float | None = None,
+    inbound_type: str = "手動",
+    order_status: str | None = None,
+    client_id: str | None = None,
+) -> dict:
+    """
+    1件の入出庫をトランザクション内で記録する.
+
+    履歴テーブル（inbound_history / outbound_history）への登録、
+    在庫移動台帳（stock_movements）への追記、日次集計（consumption_daily）への加算、
+    消耗品の在庫数・発注要否（needs_reorder）の更新をまとめて行う。
+    イベントの配信はコミット後に publish_movement_events で行う。
+    消耗品の行は FOR UPDATE でロックするため、同時の入出庫でも在庫数がずれない。
+    client_id（端末で採番した移動ID）は台帳で一意のため、同じ記録の再送は IntegrityError になる。
+    """
+    if movement_type not in MOVEMENT_TYPE_LABELS:
+        raise MovementError(f"不正な移動種別です: {movement_type}")
+
+    quantity = int(quantity)
+    if quantity <= 0:
+        raise MovementError("数量は1以上で指定してください")
+
+    item = session.execute(
+        text(
+            """
+            SELECT id, code, name, stock_quantity, safety_stock, unit_price, needs_reorder
+            FROM consumables WHERE id = :id FOR UPDATE
+            """
+        ),
+        {"id": consumable_id},
+    ).mappings().first()
+
+    if item is None:
+        raise MovementError("商品が見つかりません", status_code=404)
+
+    code = code or item["code"]
+    name = name or item["name"]
+    if unit_price is None:
+        unit_price = float(item["unit_price"]) if item["unit_price"] else 0
+    current_stock = int(item["stock_quantity"] or 0)
+    safety_stock = int(item["safety_stock"]) if item["safety_stock"] is not None else 0
+
+    if movement_type == MOVEMENT_OUTBOUND:
+        if current_stock < quantity:
+            raise MovementError("在庫が不足しています")
+        signed_quantity = -quantity
+    else:
+        signed_quantity = quantity
+
+    total_amount = quantity * unit_price
+    department_id, department_created = ensure_department_in_session(session, employee_department)
+    params = {
+        "consumable_id": consumable_id,
+        "code": code,
+        "name": name,
+        "quantity": quantity,
+        "employee_name": employee_name,
+        "employee_department": employee_department or "",
+        "department_id": department_id,
+        "unit_price": unit_price,
+        "total_amount": total_amount,
+        "note": note or "",
+        "inbound_type": inbound_type,
+    }
+
+    # 履歴テーブルへ登録
+    if movement_type == MOVEMENT_OUTBOUND:
+        source_table = "outbound_history"
+        result = session.execute(
+            text(
+                """
+                INSERT INTO outbound_history (
+                    consumable_id, code, name, quantity, employee_name, employee_department, department_id,
+                    unit_price, total_amount, note, outbound_date
+                ) VALUES (
+                    :consumable_id, :code, :name, :quantity, :employee_name, :employee_department, :department_id,
+                    :unit_price, :total_amount, :note, NOW()
+                )
+                """
+            ),
+            params,
+        )
+    else:
+        source_table = "inbound_history"
+        result = session.execute(
+            text(
+                """
+                INSERT INTO inbound_history (
+                    consumable_id, code, name, quantity, employee_name, employee_department, department_id,
+                    unit_price, total_amount, note, inbound_type, inbound_date
+                ) VALUES (
+                    :consumable_id, :code, :name, :quantity, :employee_name, :employee_department, :department_id,
+                    :unit_price, :total_amount, :note, :inbound_type, NOW()
+                )
+                """
+            ),
+            params,
+        )
+    history_id = int(result.lastrowid)
+
+    # 在庫移動台帳へ追記
+    new_stock = current_stock + signed_quantity
+    result = session.execute(
+        text(
+            """
+            INSERT INTO stock_movements (
+                movement_type, consumable_id, code, name, quantity, stock_after,
+                employee_name, employee_department, department_id, unit_price, total_amount, note,
+                inbound_type, source_table, source_id, client_id, moved_at
+            ) VALUES (
+                :movement_type, :consumable_id, :code, :name, :signed_quantity, :stock_after,
+                :employee_name, :employee_department, :department_id, :unit_price, :total_amount, :note,
+                :movement_inbound_type, :source_table, :source_id, :client_id, NOW()
+            )
+            """
+        ),
+        {
+            **params,
+            "movement_type": movement_type,
+            "signed_quantity": signed_quantity,
+            "stock_after": new_stock,
+            "movement_inbound_type": inbound_type if movement_type == MOVEMENT_INBOUND else None,
+            "source_table": source_table,
+            "source_id": history_id,
+            "client_id": client_id,
+        },
+    )
+    movement_id = int(result.lastrowid)
+
+    # 日次集計へ加算
+    session.execute(
+        text(
+            f"""
+            INSERT INTO consumption_daily (
+                stat_date, consumable_id, department, movement_type, quantity, amount, movement_count
+            ) VALUES (
+                {jst_date_sql("NOW()")}, :consumable_id, :employee_department, :movement_type,
+                :quantity, :total_amount, 1
+            )
+            ON DUPLICATE KEY UPDATE
+                quantity = quantity + VALUES(quantity),
+                amount = amount + VALUES(amount),
+                movement_count = movement_count + 1
+            """
+        ),
+        {**params, "movement_type": movement_type},
+    )
+
+    # 在庫数・欠品状態・発注要否を更新
+    new_status = calculate_shortage_status(new_stock, safety_stock)
+    update_sql = (
+        "UPDATE consumables SET stock_quantity = :stock, shortage_status = :status, "
+        f"needs_reorder = {NEEDS_REORDER_SQL}"
+    )
+    update_params = {"stock": new_stock, "status": new_status, "id": consumable_id}
+    if order_status:
+        update_sql += ", order_status = :order_status"
+        update_params["order_status"] = order_status
+    session.execute(text(update_sql + " WHERE id = :id"), update_params)
+    needs_reorder = bool(
+        session.execute(
+            text("SELECT needs_reorder FROM consumables WHERE id = :id"), {"id": consumable_id}
+        ).scalar()
+    )
+
+    return {
+        "client_id": client_id,
+        "movement_id": movement_id,
+        "history_id": history_id,
+        "consumable_id": consumable_id,
+        "code": code,
+        "name": name,
+        "quantity": quantity,
+        "movement_type": movement_type,
+        "new_stock": new_stock,
+        "shortage_status": new_status,
+        "needs_reorder": needs_reorder,
+        "was_needs_reorder": bool(item["needs_reorder"]),
+        "order_status": order_status,
+        "department_created": department_created,
+    }
+
+
+def publish_movement_events(movement: dict) -> None:
+    """記録した入出庫をイベントとして配信する（コミット後に呼び出す）"""
+    payload = {
+        "consumable_id": movement["consumable_id"],
+        "code": movement["code"],
+        "name": movement["name"],
+        "movement_type": movement["movement_type"],
+        "stock_quantity": movement["new_stock"],
+        "shortage_status": movement["shortage_status"],
+        "needs_reorder": movement["needs_reorder"],
+    }
+    if movement.get("order_status"):
+        payload["order_status"] = movement["order_status"]
+    event_bus.publish(event_bus.STOCK_CHANGED, payload)
+    if movement["needs_reorder"] and not movement["was_needs_reorder"]:
+        event_bus.publish(event_bus.LOW_STOCK_ENTERED, payload)
+    elif movement["was_needs_reorder"] and not movement["needs_reorder"]:
+        event_bus.publish(event_bus.LOW_STOCK_CLEARED, payload)
+
+
+def record_movement(db, **kwargs) -> dict:
+    """1件の入出庫を独立したトランザクションで記録し、コミット後にイベントを配信する"""
+    with db.transaction() as session:
+        movement = apply_movement(session, **kwargs)
+    publish_movement_events(movement)
+
+    # 新しい部署を登録した場合は部署一覧のキャッシュを無効化
+    if movement["department_created"]:
+        cache.invalidate(cache.DEPARTMENTS)
+    return movement
+
+
+def find_recorded_movements(session, client_ids: list[str]) -> dict[str, dict]:
+    """client_id で記録済みの入出庫を返す（再送された記録の判定用）"""
+    if not client_ids:
+        return {}
+    placeholders = ",".join([f":client_id{i}" for i in range(len(client_ids))])
+    rows = session.execute(
+        text(
+            f"""
+            SELECT client_id, movement_type, consumable_id, code, name, ABS(quantity) AS quantity, stock_after
+            FROM stock_movements WHERE client_id IN ({placeholders})
+            """
+        ),
+        {f"client_id{i}": client_id for i, client_id in enumerate(client_ids)},
+    ).mappings().all()
+    return {row["client_id"]: dict(row) for row in rows}
+
+
+def lock_consumables(session, consumable_ids: list[int]) -> None:
+    """複数の消耗品の行を1回のクエリで消耗品ID順にロックする"""
+    consumable_ids = sorted(set(consumable_ids))
+    if not consumable_ids:
+        return
+    placeholders = ",".join([f":id{i}" for i in range(len(consumable_ids))])
+    session.execute(
+        text(f"SELECT id FROM consumables WHERE id IN ({placeholders}) ORDER BY id FOR UPDATE"),
+        {f"id{i}": consumable_id for i, consumable_id in enumerate(consumable_ids)},
+    ).all()
+
+
+def record_movement_batch(db, movements: list[dict], *, all_or_nothing: bool = False) -> list[dict]:
+    """
+    複数の入出庫を1つのトランザクションで記録し、コミット後にイベントを配信する.
+
+    各入出庫は apply_movement の引数の辞書。1件ずつ SAVEPOINT の中で記録し、
+    在庫不足などで記録できない入出庫はその件だけ取り消して残りを記録する。
+    all_or_nothing=True の場合は1件でも記録できなければすべて取り消し、MovementBatchError を送出する
+    （この送信で記録した入出庫は cancelled、記録済みの再送は duplicate のまま返す）。
+    記録済みの client_id は記録し直さない（端末からの再送を重複として返す）。
+    消耗品の行ロックの順序をそろえて同時の送信とのデッドロックを避けるため、
+    最初に消耗品の行をまとめてロックし、消耗品ID順（同じ消耗品の中では送信順）に記録する。
+
+    Returns:
+        list[dict]: 送信順の結果（status は applied / duplicate / error）
+    """
+    results: list[dict | None] = [None] * len(movements)
+    applied = []
+    with db.transaction() as session:
+        lock_consumables(session, [movement["consumable_id"] for movement in movements])
+        recorded = find_recorded_movements(
+            session, [movement["client_id"] for movement in movements if movement.get("client_id")]
+        )
+        order = sorted(range(len(movements)), key=lambda index: movements[index]["consumable_id"])
+        for index in order:
+            movement = movements[index]
+            client_id = movement.get("client_id")
+            if client_id and client_id in recorded:
+                results[index] = {"status": "duplicate", **recorded[client_id]}
+                continue
+
+            savepoint = session.begin_nested()
+            try:
+                result = apply_movement(session, **movement)
+                savepoint.commit()
+            except MovementError as e:
+                savepoint.rollback()
+                results[index] = {"status": "error", "client_id": client_id, "error": str(e)}
+                continue
+            except DataError as e:
+                # 桁数の超過など、その入出庫の値が原因のエラーはその件だけ取り消す
+                # （送信全体を失敗させると、端末が同じ送信を再送し続けて後の記録も送信できなくなる）
+                savepoint.rollback()
+                results[index] = {
+                    "status": "error",
+                    "client_id": client_id,
+                    "error": f"記録できない値が含まれています: {e.orig}",
+                }
+                continue
+            except IntegrityError:
+                # 同じ記録を別のリクエストが先に記録した場合
+                savepoint.rollback()
+                duplicate = find_recorded_movements(session, [client_id]).get(client_id) if client_id else None
+                if duplicate is None:
+                    raise
+                results[index] = {"status": "duplicate", **duplicate}
+                continue
+
+            if client_id:
+                # 同じ client_id が1回の送信に重複して含まれる場合
+                recorded[client_id] = {
+                    "client_id": client_id,
+                    "movement_type": result["movement_type"],
+                    "consumable_id": result["consumable_id"],
+                    "code": result["code"],
+                    "name": result["name"],
+                    "quantity": result["quantity"],
+                    "stock_after": result["new_stock"],
+                }
+            results[index] = {"status": "applied", **result}
+            applied.append(result)
+
+        if all_or_nothing and any(result["status"] == "error" for result in results):
+            # 例外でトランザクションごと取り消す。取り消されるのはこの送信で記録した入出庫だけで、
+            # 以前に記録済みの再送（duplicate）は台帳に残るため duplicate のまま返す
+            raise MovementBatchError(
+                [
+                    {"status": "cancelled", "client_id": result["client_id"]} if result["status"] == "applied" else result
+                    for result in results
+                ]
+            )
+
+    for movement in applied:
+        publish_movement_events(movement)
+    if any(movement["department_created"] for movement in applied):
+        cache.invalidate(cache.DEPARTMENTS)
+    return results
@@ -4,6 +4,7 @@ PDF生成ユーティリティ
 from __future__ import annotations
 
 import os
+import threading
 from datetime import datetime
 from io import BytesIO
 from pathlib import Path
@@ -17,8 +18,13 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 
 from config import PDF_FOLDER
+from utils.metrics import PDF_RENDER, timed
 from utils.validators import sanitize_filename
 
+# フォントの登録は ReportLab のプロセス全体の状態を変更するため、スレッド間で排他する
+# （pdf_generator の注文書PDFと共用）
+FONT_REGISTRATION_LOCK = threading.Lock()
+
 
 def register_japanese_fonts() -> str:
     """
@@ -35,6 +41,16 @@ def register_japanese_fonts() -> str:
     if "Japanese" in pdfmetrics.getRegisteredFontNames():
         return "Japanese"
 
+    with FONT_REGISTRATION_LOCK:
+        return _register_japanese_fonts()
+
+
+def _register_japanese_fonts() -> str:
+    """日本語フォントを探して登録する（FONT_REGISTRATION_LOCK を取得して呼ぶ）"""
+    # 待っている間に他のスレッドが登録した場合
+    if "Japanese" in pdfmetrics.getRegisteredFontNames():
+        return "Japanese"
+
     # Windowsフォント候補
     windows_fonts = [
         "C:/Windows/Fonts/msgothic.ttc",
@@ -257,7 +273,8 @@ def render_order_pdf(order_rows, order_number: str | None = None, notes: str = "
         fontName=font_name,
     )
     story.append(Paragraph("上記内容にて発注いたします。よろしくお願いいたします。", footer_style))
-    doc.build(story)
+    with timed(PDF_RENDER):
+        doc.build(story)
 
     pdf_bytes = pdf_buffer.getvalue()
     safe_order_number = sanitize_filename(order_number)
@@ -0,0 +1,230 @@
+"""消耗品のQRラベルシート（A4）作成ユーティリティ.
+
+QRコードの内容は消耗品コードだけ（正規形）にする。「管理番号：... 品名：...」のような
+複合形式を作らないため、読み取り側の normalize_qr_code_value は正規表現で解析せずに済む。
+
+QRコードはコードごとにPDFの描画命令（暗いモジュールを横方向に連結した矩形）へ変換して
+キャッシュする。キャッシュにないコードが多い場合はプロセスプールで並列に作る。
+"""
+
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+
+from reportlab.graphics.barcode.qrencoder import QRCode, QRErrorCorrectLevel
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfgen import canvas
+
+import config
+
+# QRコードの周囲に必要な余白（モジュール数）
+QUIET_ZONE_MODULES = 4
+# これ以上のQRコードを新しく作る場合にプロセスプールを使う（少ない場合はプロセス間の受け渡しの方が遅い）
+POOL_MIN_CODES = 200
+
+_qr_cache: OrderedDict[str, tuple[int, str]] = OrderedDict()
+_qr_cache_lock = threading.Lock()
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class LabelGrid:
+    """ラベルシートの面付け（A4縦、寸法はmm）"""
+
+    columns: int = 3
+    rows: int = 8
+    margin_mm: float = 10.0
+    gap_mm: float = 2.0
+
+    def validate(self) -> None:
+        if not 1 <= self.columns <= 8 or not 1 <= self.rows <= 20:
+            raise ValueError("columns は1〜8、rows は1〜20で指定してください")
+        if not 0 <= self.margin_mm <= 30 or not 0 <= self.gap_mm <= 20:
+            raise ValueError("margin_mm は0〜30、gap_mm は0〜20で指定してください")
+
+    @property
+    def labels_per_page(self) -> int:
+        return self.columns * self.rows
+
+
+def label_payload(code: str) -> str:
+    """QRコードに入れる内容（正規形: 前後の空白を除いた消耗品コードのみ）"""
+    return str(code).strip()
+
+
+def qr_drawing_ops(payload: str) -> tuple[int, str]:
+    """
+    QRコードを (モジュール数, PDFの描画命令) に変換する.
+
+    描画命令は1モジュールを1単位とした座標（原点は左下）で、描画時に拡大する。
+    プロセスプールから呼び出すため、モジュールの最上位に置く。
+    """
+    qr = QRCode(None, QRErrorCorrectLevel.M)
+    qr.addData(payload)
+    qr.make()
+    count = qr.getModuleCount()
+
+    ops = []
+    for row in range(count):
+        y = count - row - 1
+        col = 0
+        while col < count:
+            if not qr.isDark(row, col):
+                col += 1
+                continue
+            start = col
+            while col < count and qr.isDark(row, col):
+                col += 1
+            ops.append(f"{start} {y} {col - start} 1 re")
+    ops.append("f")
+    return count, "\n".join(ops)
+
+
+def _pool_workers() -> int:
+    return config.QR_LABEL_WORKERS or min(os.cpu_count() or 1, 4)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """QRコード作成用のプロセスプール（初回に作成し、ワーカープロセスの終了まで使い回す）"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # スレッドを持つプロセス（gunicorn の gthread ワーカー）を直接 fork しない
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _pool = ProcessPoolExecutor(max_workers=_pool_workers(), mp_context=context)
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+
+def get_qr_drawing_ops(payloads: list[str]) -> dict[str, tuple[int, str]]:
+    """複数のQRコードの描画命令を返す（キャッシュにないものだけ作る）"""
+    result: dict[str, tuple[int, str]] = {}
+    missing = []
+    with _qr_cache_lock:
+        for payload in dict.fromkeys(payloads):
+            ops = _qr_cache.get(payload)
+            if ops is None:
+                missing.append(payload)
+            else:
+                _qr_cache.move_to_end(payload)
+                result[payload] = ops
+
+    if not missing:
+        return result
+
+    workers = _pool_workers()
+    if len(missing) >= POOL_MIN_CODES and workers > 1:
+        chunksize = max(len(missing) // (workers * 4), 1)
+        generated = list(_get_pool().map(qr_drawing_ops, missing, chunksize=chunksize))
+    else:
+        generated = [qr_drawing_ops(payload) for payload in missing]
+
+    with _qr_cache_lock:
+        for payload, ops in zip(missing, generated):
+            _qr_cache[payload] = ops
+            result[payload] = ops
+        while len(_qr_cache) > config.QR_LABEL_CACHE_SIZE:
+            _qr_cache.popitem(last=False)
+    return result
+
+
+def _fit_text(text: str, font_name: str, font_size: float, max_width: float) -> str:
+    """幅に収まらない文字列を末尾を「…」にして切り詰める"""
+    if pdfmetrics.stringWidth(text, font_name, font_size) <= max_width:
+        return text
+    # 収まる最長の長さを二分探索する（1文字ずつ削ると長い品名で計測回数が増える）
+    low, high = 0, len(text) - 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        if pdfmetrics.stringWidth(text[:middle] + "…", font_name, font_size) <= max_width:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low] + "…"
+
+
+def render_label_sheets(labels: list[dict], grid: LabelGrid) -> bytes:
+    """
+    QRラベルシートのPDFを作成する.
+
+    Args:
+        labels: 消耗品の辞書のリスト（code・name・storage_location）
+        grid: 面付け
+
+    Returns:
+        bytes: PDFの内容
+    """
+    # 日本語フォントの登録と計測は注文書PDFと共用する（Flask / SQLAlchemy を読み込むため、プロセスプールでは読み込まない）
+    from utils.metrics import PDF_RENDER, timed
+    from utils.pdf_utils import register_japanese_fonts
+
+    font_name = register_japanese_fonts()
+    qr_ops = get_qr_drawing_ops([label_payload(label["code"]) for label in labels])
+
+    page_width, page_height = A4
+    margin = grid.margin_mm * mm
+    gap = grid.gap_mm * mm
+    cell_width = (page_width - 2 * margin - (grid.columns - 1) * gap) / grid.columns
+    cell_height = (page_height - 2 * margin - (grid.rows - 1) * gap) / grid.rows
+    padding = min(cell_width, cell_height) * 0.06
+    # QRコードはラベルの左側に正方形で置き、右側に文字を書く（幅の狭いラベルでは幅の半分まで）
+    qr_size = min(cell_height, cell_width / 2) - 2 * padding
+    text_x_offset = padding + qr_size + padding
+    text_width = cell_width - text_x_offset - padding
+    code_font_size = max(min(qr_size * 0.16, 12), 5)
+    name_font_size = max(code_font_size * 0.75, 4)
+
+    buffer = BytesIO()
+    with timed(PDF_RENDER):
+        c = canvas.Canvas(buffer, pagesize=A4, pageCompression=1)
+        c.setTitle("QRラベル")
+        for index, label in enumerate(labels):
+            position = index % grid.labels_per_page
+            if index and position == 0:
+                c.showPage()
+            column, row = position % grid.columns, position // grid.columns
+            x = margin + column * (cell_width + gap)
+            y = page_height - margin - (row + 1) * cell_height - row * gap
+
+            # 切り取り線
+            c.setStrokeGray(0.8)
+            c.setLineWidth(0.3)
+            c.rect(x, y, cell_width, cell_height, stroke=1, fill=0)
+
+            payload = label_payload(label["code"])
+            module_count, ops = qr_ops[payload]
+            module = qr_size / (module_count + 2 * QUIET_ZONE_MODULES)
+            c.saveState()
+            c.setFillGray(0)
+            c.transform(module, 0, 0, module, x + padding, y + (cell_height - qr_size) / 2)
+            c.translate(QUIET_ZONE_MODULES, QUIET_ZONE_MODULES)
+            c.addLiteral(ops)
+            c.restoreState()
+
+            if text_width <= 0:
+                continue
+            text_x = x + text_x_offset
+            text_y = y + cell_height / 2 + code_font_size * 0.6
+            c.setFillGray(0)
+            c.setFont(font_name, code_font_size)
+            c.drawString(text_x, text_y, _fit_text(payload, font_name, code_font_size, text_width))
+            c.setFont(font_name, name_font_size)
+            name = _fit_text(str(label.get("name") or ""), font_name, name_font_size, text_width)
+            c.drawString(text_x, text_y - code_font_size * 1.3, name)
+            location = label.get("storage_location")
+            if location:
+                location = _fit_text(f"保管場所: {location}", font_name, name_font_size, text_width)
+                c.drawString(text_x, text_y - code_font_size * 1.3 - name_font_size * 1.3, location)
+        c.save()
+    return buffer.getvalue()
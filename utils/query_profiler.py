@@ -0,0 +1,332 @@
+"""SQLのフィンガープリント別プロファイラー・スロークエリログユーティリティ.
+
+QUERY_PROFILER_ENABLED=true のとき DatabaseManager のエンジンに組み込む。
+SQLはバインドパラメーター・リテラル・IN (...) の要素数を取り除いた形（フィンガープリント）に
+まとめ、件数・合計時間・最大時間・p95・エラー件数を集計する。
+QUERY_SLOW_MS を超えたSQLは EXPLAIN の結果と一緒にログへ出力する。
+
+集計はワーカープロセスごとに持ち、QUERY_PROFILE_DIR に query_profile_<pid>.json として
+定期的に書き出す。全ワーカーの集計は /api/admin/query-profile または
+scripts/maintenance/query_profile_report.py で確認する。
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from sqlalchemy import event
+
+import config
+
+# p95 の計算に使う直近の実行時間の件数（フィンガープリントごと）
+SAMPLES_PER_FINGERPRINT = 200
+# レポートに残すスロークエリの件数
+SLOW_LOG_MAX_ENTRIES = 50
+MAX_STATEMENT_LENGTH = 2000
+MAX_PARAMS_LENGTH = 500
+
+# EXPLAIN で実行計画を取得できるSQL（EXPLAIN はSQL自体を実行しない）
+EXPLAINABLE_PREFIXES = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_BIND_PARAM = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\?")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"\)(?:\s*,\s*\((?:\s*\?\s*,?)+\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+_lock = threading.Lock()
+_stats: dict[str, dict] = {}
+_slow_log: deque = deque(maxlen=SLOW_LOG_MAX_ENTRIES)
+_local = threading.local()
+_last_dump = 0.0
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """
+    SQLをパラメーターの値によらない形にまとめる.
+
+    Example:
+        "SELECT * FROM t WHERE id IN (%(id0)s, %(id1)s) AND code = 'A-1'"
+        -> "SELECT * FROM t WHERE id IN (?+) AND code = ?"
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _BIND_PARAM.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    # ルートで要素数に合わせて作る IN (:id0, :id1, ...) と複数行の VALUES を1つにまとめる
+    normalized = _IN_LIST.sub("IN (?+)", normalized)
+    normalized = _VALUES_LIST.sub(")", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def _truncate(value, limit: int) -> str:
+    text = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _percentile(samples, ratio: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(math.ceil(ratio * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def _record(statement: str, elapsed_ms: float, error: bool = False) -> None:
+    key = fingerprint(statement)
+    with _lock:
+        entry = _stats.get(key)
+        if entry is None:
+            entry = _stats[key] = {
+                "count": 0,
+                "errors": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "samples": deque(maxlen=SAMPLES_PER_FINGERPRINT),
+                "example": _truncate(statement.strip(), MAX_STATEMENT_LENGTH),
+            }
+        entry["count"] += 1
+        if error:
+            entry["errors"] += 1
+            return
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["samples"].append(elapsed_ms)
+
+
+def _explain(engine, statement: str, parameters) -> list[dict] | str:
+    """別の接続で EXPLAIN を実行する（結果を読み終えていない元の接続は使わない）"""
+    _local.explaining = True
+    try:
+        with engine.connect() as conn:
+            if parameters:
+                result = conn.exec_driver_sql("EXPLAIN " + statement, parameters)
+            else:
+                result = conn.exec_driver_sql("EXPLAIN " + statement)
+            return [dict(row) for row in result.mappings()]
+    except Exception as e:
+        return f"EXPLAIN に失敗しました: {e}"
+    finally:
+        _local.explaining = False
+
+
+def _log_slow_query(engine, statement: str, parameters, elapsed_ms: float, executemany: bool) -> None:
+    explain = None
+    if config.QUERY_PROFILE_EXPLAIN and not executemany:
+        if statement.lstrip().upper().startswith(EXPLAINABLE_PREFIXES):
+            explain = _explain(engine, statement, parameters)
+
+    entry = {
+        "at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "duration_ms": round(elapsed_ms, 1),
+        "fingerprint": fingerprint(statement),
+        "statement": _truncate(statement.strip(), MAX_STATEMENT_LENGTH),
+        "params": _truncate(parameters, MAX_PARAMS_LENGTH),
+        "explain": explain,
+    }
+    with _lock:
+        _slow_log.append(entry)
+
+    try:
+        print(f"Slow query ({elapsed_ms:.1f} ms): {entry['statement']}")
+        print(f"Params: {entry['params']}")
+        if explain is not None:
+            print(f"Explain: {json.dumps(explain, ensure_ascii=False, default=str)}")
+    except Exception:
+        pass  # エンコーディングエラーを無視
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_local, "explaining", False):
+        return
+    conn.info.setdefault("query_profiler_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_local, "explaining", False):
+        return
+    started_list = conn.info.get("query_profiler_started")
+    if not started_list:
+        return
+    elapsed_ms = (time.perf_counter() - started_list.pop()) * 1000
+    _record(statement, elapsed_ms)
+
+    if elapsed_ms >= config.QUERY_SLOW_MS:
+        _log_slow_query(conn.engine, statement, parameters, elapsed_ms, executemany)
+    _dump_if_due()
+
+
+def _handle_error(exception_context):
+    if getattr(_local, "explaining", False) or not exception_context.statement:
+        return
+    conn = exception_context.connection
+    if conn is not None:
+        started_list = conn.info.get("query_profiler_started")
+        if started_list:
+            started_list.pop()
+    _record(exception_context.statement, 0.0, error=True)
+
+
+def snapshot() -> dict:
+    """このワーカーの集計を返す（フィンガープリントごとの実行時間のサンプルを含む）"""
+    with _lock:
+        queries = {
+            key: {**entry, "samples": list(entry["samples"])}
+            for key, entry in _stats.items()
+        }
+        slow = list(_slow_log)
+    return {
+        "pid": os.getpid(),
+        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "queries": queries,
+        "slow": slow,
+    }
+
+
+def reset() -> None:
+    """このワーカーの集計を消す"""
+    with _lock:
+        _stats.clear()
+        _slow_log.clear()
+
+
+def dump_report(directory: Path | str | None = None) -> Path:
+    """このワーカーの集計を query_profile_<pid>.json に書き出す"""
+    directory = Path(directory or config.QUERY_PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"query_profile_{os.getpid()}.json"
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, ensure_ascii=False, default=str)
+    # 読み込み中のレポートが途中までの内容にならないよう置き換える
+    os.replace(tmp_path, path)
+    return path
+
+
+def _dump_if_due() -> None:
+    global _last_dump
+    interval = config.QUERY_PROFILE_DUMP_SECONDS
+    if interval <= 0:
+        return
+    now = time.monotonic()
+    with _lock:
+        if now - _last_dump < interval:
+            return
+        _last_dump = now
+    try:
+        dump_report()
+    except OSError as e:
+        print(f"Query profile dump error: {e}")
+
+
+def load_snapshots(directory: Path | str | None = None) -> list[dict]:
+    """書き出された全ワーカーの集計を読み込む"""
+    directory = Path(directory or config.QUERY_PROFILE_DIR)
+    snapshots = []
+    for path in sorted(directory.glob("query_profile_*.json")):
+        try:
+            with open(path, encoding="utf-8") as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Query profile load error: {path}: {e}")
+    return snapshots
+
+
+def clear_dumps(directory: Path | str | None = None) -> int:
+    """書き出した全ワーカーの集計を消し、消したファイルの数を返す（サーバーの起動時に前回の集計を引き継がない）"""
+    directory = Path(directory or config.QUERY_PROFILE_DIR)
+    paths = list(directory.glob("query_profile_*.json"))
+    for path in paths:
+        path.unlink(missing_ok=True)
+    return len(paths)
+
+
+def build_report(snapshots: list[dict], sort: str = "total_ms", top: int = 50) -> dict:
+    """
+    ワーカーごとの集計をまとめてレポートにする.
+
+    同じPIDの集計は新しいもの（このワーカーのメモリ上の集計など）を優先する。
+    p95 は各ワーカーの直近のサンプルを合わせて計算する。
+    """
+    latest: dict[int, dict] = {}
+    for item in snapshots:
+        current = latest.get(item["pid"])
+        if current is None or item["generated_at"] >= current["generated_at"]:
+            latest[item["pid"]] = item
+
+    merged: dict[str, dict] = {}
+    slow = []
+    for item in latest.values():
+        slow.extend(item.get("slow", []))
+        for key, entry in item.get("queries", {}).items():
+            target = merged.setdefault(
+                key,
+                {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "samples": [], "example": entry.get("example")},
+            )
+            target["count"] += entry["count"]
+            target["errors"] += entry["errors"]
+            target["total_ms"] += entry["total_ms"]
+            target["max_ms"] = max(target["max_ms"], entry["max_ms"])
+            target["samples"].extend(entry["samples"])
+
+    queries = []
+    for key, entry in merged.items():
+        succeeded = entry["count"] - entry["errors"]
+        queries.append(
+            {
+                "fingerprint": key,
+                "count": entry["count"],
+                "errors": entry["errors"],
+                "total_ms": round(entry["total_ms"], 1),
+                "avg_ms": round(entry["total_ms"] / succeeded, 2) if succeeded else 0.0,
+                "p95_ms": round(_percentile(entry["samples"], 0.95), 2),
+                "max_ms": round(entry["max_ms"], 2),
+                "example": entry["example"],
+            }
+        )
+    queries.sort(key=lambda row: row.get(sort, 0), reverse=True)
+    slow.sort(key=lambda row: row["at"], reverse=True)
+
+    return {
+        "workers": sorted(latest),
+        "slow_threshold_ms": config.QUERY_SLOW_MS,
+        "fingerprints": len(queries),
+        "queries": queries[:top] if top else queries,
+        "slow": slow[:SLOW_LOG_MAX_ENTRIES],
+    }
+
+
+_installed_engines: set[int] = set()
+
+
+def install_query_profiler(engine) -> None:
+    """エンジンにプロファイラーを組み込む（QUERY_PROFILER_ENABLED が無効なら何もしない）"""
+    if not config.QUERY_PROFILER_ENABLED or id(engine) in _installed_engines:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    _installed_engines.add(id(engine))
+
+    # ワーカーの終了時（max_requests による入れ替えを含む）に最後の集計を書き出す
+    if len(_installed_engines) == 1 and config.QUERY_PROFILE_DUMP_SECONDS > 0:
+        atexit.register(_dump_at_exit)
+
+
+def _dump_at_exit() -> None:
+    if _stats:
+        try:
+            dump_report()
+        except OSError:
+            pass
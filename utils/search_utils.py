@@ -0,0 +1,66 @@
+"""
+全文検索ユーティリティ
+MySQL FULLTEXT インデックス（ngramパーサー）を使った検索条件を組み立てる
+"""
+from __future__ import annotations
+
+from config import FULLTEXT_MIN_QUERY_LENGTH, FULLTEXT_SEARCH_ENABLED
+
+
+def _split_terms(search_text: str) -> list[str]:
+    """検索文字列を空白区切りの語に分割（フレーズ区切りの " は除去）"""
+    cleaned = (search_text or "").replace('"', " ")
+    return [term for term in cleaned.split() if term]
+
+
+def build_boolean_query(search_text: str) -> str:
+    """
+    BOOLEAN MODE 用の検索式を組み立てる
+
+    各語をフレーズ（"..."）として必須指定することで、
+    ngramの連続一致＝従来の部分一致（LIKE '%...%'）に近い結果にする。
+    """
+    return " ".join(f'+"{term}"' for term in _split_terms(search_text))
+
+
+def can_use_fulltext(search_text: str) -> bool:
+    """全文検索が使えるか判定（ngram_token_size 未満の語があればLIKEに切り替え）"""
+    if not FULLTEXT_SEARCH_ENABLED:
+        return False
+    terms = _split_terms(search_text)
+    if not terms:
+        return False
+    return all(len(term) >= FULLTEXT_MIN_QUERY_LENGTH for term in terms)
+
+
+def build_text_search(
+    columns: list[str],
+    search_text: str,
+    param_name: str = "search_text",
+) -> tuple[str, dict, str | None]:
+    """
+    名称検索の条件句を組み立てる
+
+    Args:
+        columns: 検索対象カラム（FULLTEXTインデックスのカラム構成と同じ順序）
+        search_text: 入力された検索文字列
+        param_name: バインドパラメータ名
+
+    Returns:
+        (WHERE句に追加する条件, パラメータ, 関連度の式 or None)
+        関連度の式はFULLTEXT使用時のみ返す（ORDER BY に使用）
+    """
+    if can_use_fulltext(search_text):
+        match_expr = f"MATCH({', '.join(columns)}) AGAINST(:{param_name} IN BOOLEAN MODE)"
+        return match_expr, {param_name: build_boolean_query(search_text)}, match_expr
+
+    # 短い検索語はngramで引けないため従来のLIKE検索にフォールバック
+    # （FULLTEXT と同じく語ごとに部分一致を求め、入力の途中で結果の条件が変わらないようにする）
+    terms = _split_terms(search_text) or [""]
+    clauses = []
+    params = {}
+    for i, term in enumerate(terms):
+        name = f"{param_name}{i}"
+        clauses.append("(" + " OR ".join(f"{column} LIKE :{name}" for column in columns) + ")")
+        params[name] = f"%{term}%"
+    return f"({' AND '.join(clauses)})", params, None
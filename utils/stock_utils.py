@@ -34,3 +34,29 @@ def calculate_shortage_status(stock_quantity, safety_stock) -> str:
     if stock <= safety:
         return "要注意"
     return "在庫あり"
+
+
+def calculate_needs_reorder(stock_quantity, safety_stock, reorder_point=None) -> bool:
+    """
+    発注が必要か判定する.
+
+    消費予測の発注点があればそれを、なければ安全在庫を基準とする。
+    """
+    threshold = _to_int(reorder_point) if reorder_point is not None else _to_int(safety_stock)
+    return _to_int(stock_quantity) <= threshold
+
+
+# UPDATE consumables SET ... で needs_reorder を再計算するSQL式
+# （MySQLのSETは左から順に評価されるため、stock_quantity / safety_stock の更新より後ろに置く）
+NEEDS_REORDER_SQL = (
+    "(stock_quantity <= COALESCE("
+    "(SELECT f.reorder_point FROM consumable_forecasts f WHERE f.consumable_id = consumables.id), "
+    "safety_stock))"
+)
+
+# 全消耗品の needs_reorder を一括で再計算するSQL（予測の更新後・一括取り込み後に実行）
+REFRESH_NEEDS_REORDER_SQL = """
+    UPDATE consumables c
+    LEFT JOIN consumable_forecasts f ON f.consumable_id = c.id
+    SET c.needs_reorder = (c.stock_quantity <= COALESCE(f.reorder_point, c.safety_stock))
+"""
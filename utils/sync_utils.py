@@ -0,0 +1,85 @@
+"""在庫一覧の差分同期（同期トークン・削除記録）ユーティリティ."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import config
+
+SYNC_TOKEN_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 同期トークン以降に変更があった消耗品ID（本体・購入先・注文依頼・入出庫履歴・注文依頼の削除）
+CHANGED_CONSUMABLE_IDS_SQL = """
+    SELECT id AS consumable_id FROM consumables WHERE updated_at >= :since
+    UNION
+    SELECT c.id FROM consumables c JOIN suppliers s ON c.supplier_id = s.id WHERE s.updated_at >= :since
+    UNION
+    SELECT consumable_id FROM orders WHERE updated_at >= :since
+    UNION
+    SELECT consumable_id FROM inbound_history WHERE updated_at >= :since
+    UNION
+    SELECT consumable_id FROM outbound_history WHERE updated_at >= :since
+    UNION
+    SELECT consumable_id FROM deleted_records
+    WHERE table_name = 'orders' AND deleted_at >= :since AND consumable_id IS NOT NULL
+"""
+
+
+def parse_sync_token(value: str) -> datetime:
+    """同期トークンを日時に変換（不正な値は ValueError）"""
+    try:
+        return datetime.strptime(value.strip(), SYNC_TOKEN_FORMAT)
+    except (AttributeError, ValueError) as exc:
+        raise ValueError(f"同期トークンが不正です: {value}") from exc
+
+
+def current_sync_token(db) -> str:
+    """
+    次回の差分取得に使う同期トークン（DBの現在時刻）.
+
+    取得中にコミットされた更新を取りこぼさないよう INVENTORY_SYNC_OVERLAP_SECONDS だけ巻き戻す。
+    重複して届いた行はクライアント側で上書きされるだけなので問題ない。
+    """
+    df = db.execute_query("SELECT NOW() AS now")
+    now = df.iloc[0]["now"] if not df.empty else datetime.utcnow()
+    return (pd.Timestamp(now) - timedelta(seconds=config.INVENTORY_SYNC_OVERLAP_SECONDS)).strftime(SYNC_TOKEN_FORMAT)
+
+
+def is_sync_token_expired(since: datetime) -> bool:
+    """削除記録の保持期間より古いトークンか（その場合は全件を返す）"""
+    return since < datetime.utcnow() - timedelta(days=config.INVENTORY_SYNC_TOMBSTONE_DAYS)
+
+
+def changed_consumable_ids(db, since: datetime) -> list[int]:
+    """同期トークン以降に一覧の表示内容が変わった消耗品ID"""
+    df = db.execute_query(CHANGED_CONSUMABLE_IDS_SQL, {"since": since})
+    if df.empty:
+        return []
+    return sorted({int(cid) for cid in df["consumable_id"].dropna().tolist()})
+
+
+def deleted_consumable_ids(db, since: datetime) -> list[int]:
+    """同期トークン以降に削除された消耗品ID"""
+    df = db.execute_query(
+        """
+        SELECT DISTINCT record_id
+        FROM deleted_records
+        WHERE table_name = 'consumables' AND deleted_at >= :since
+        """,
+        {"since": since},
+    )
+    return [int(rid) for rid in df["record_id"].tolist()] if not df.empty else []
+
+
+def record_deletion(db, table_name: str, record_id: int, consumable_id: int | None = None) -> None:
+    """削除した行を deleted_records に記録する（差分同期のトゥームストーン）"""
+    db.execute_update(
+        """
+        INSERT INTO deleted_records (table_name, record_id, consumable_id)
+        VALUES (:table_name, :record_id, :consumable_id)
+        """,
+        {"table_name": table_name, "record_id": int(record_id), "consumable_id": consumable_id},
+    )
+